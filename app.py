@@ -6,6 +6,11 @@ load_dotenv()
 
 from init import create_app
 from routes import register_routes
+from commands import register_commands
+from utils.ingest_worker import start_ingest_workers
+from utils.goal_sweeper import start_goal_sweeper
+from utils.logging_utils import configure_logging
+from utils.exercise_catalog import load_exercise_catalog
 from seed.seed import seed_test_data
 from config import CONFIG_MAP
 
@@ -17,11 +22,22 @@ if not config_class:
     raise ValueError(f"Unknown ENV '{env}' in .env")
 
 app = create_app(config_class)
+configure_logging(app)
 register_routes(app)
+register_commands(app)
 
 if env == "testing":
     with app.app_context():
         seed_test_data()
 
+with app.app_context():
+    load_exercise_catalog()
+
 if __name__ == "__main__":
-    app.run(debug=app.config.get("DEBUG", False))
+    # The dev server runs the ingest workers and goal sweeper in-process; deployments run `flask ingest-worker`.
+    # With the reloader only its child process serves, so only it starts them.
+    debug = app.config.get("DEBUG", False)
+    if not debug or os.getenv("WERKZEUG_RUN_MAIN") == "true":
+        start_ingest_workers(app)
+        start_goal_sweeper(app)
+    app.run(debug=debug)
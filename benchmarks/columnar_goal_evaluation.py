@@ -0,0 +1,131 @@
+"""
+Goal totals and 1RM trend: ORM object graph vs NumPy columns.
+
+Fills a throwaway SQLite database with N sessions (same shape as pr_tracking_latency),
+then times the two ways of answering the same questions for one exercise:
+total reps of sets at or above a weight floor, and the best estimated 1RM per session.
+The ORM path loads WorkoutSession -> WorkoutEntry -> StrengthEntry and loops over it;
+the columnar path runs one query into arrays and reduces them. Peak Python memory of
+each path is reported from tracemalloc.
+
+    python -m benchmarks.columnar_goal_evaluation
+    python -m benchmarks.columnar_goal_evaluation --history 1000 10000 --repeats 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy.orm import selectinload
+
+from benchmarks.pr_tracking_latency import make_entries, add_session
+from config import BaseConfig
+from init import create_app, db
+from models import User, WorkoutSession, WorkoutEntry
+from utils.columnar import (
+    CARDIO_COLUMNS, empty_columns, strength_set_query, load_strength_columns, strength_mask, metric_total, session_max_1rm,
+)
+from utils.exercise_catalog import reset_exercise_catalog, resolve_exercise
+from utils.exercise_data_utils import estimate_1rm
+
+EXERCISE = "bench press"
+MIN_WEIGHT = 185
+BODYWEIGHT = 180
+
+
+def orm_path(user_id, exercise_id):
+    sessions = (
+        WorkoutSession.query.filter_by(user_id=user_id)
+        .options(selectinload(WorkoutSession.entries).selectinload(WorkoutEntry.strength_entries))
+        .order_by(WorkoutSession.date, WorkoutSession.id)
+        .all()
+    )
+    total_reps = 0
+    best_per_session = {}
+    for session in sessions:
+        for entry in session.entries:
+            if entry.type != "strength" or entry.exercise_id != exercise_id:
+                continue
+            for s in entry.strength_entries:
+                if s.weight >= MIN_WEIGHT:
+                    total_reps += s.reps
+                estimate = estimate_1rm(s.reps or 1, s.weight if s.weight and s.weight > 0 else BODYWEIGHT)
+                if estimate:
+                    best_per_session[session.id] = max(best_per_session.get(session.id, 0), estimate)
+    return total_reps, len(best_per_session)
+
+
+def columnar_path(user_id, exercise_id):
+    columns = load_strength_columns(strength_set_query(user_id, WorkoutEntry.exercise_id == exercise_id))
+    total_reps = metric_total(columns, empty_columns(CARDIO_COLUMNS), "reps", strength_mask(columns, MIN_WEIGHT))
+    session_ids, _, _ = session_max_1rm(columns, BODYWEIGHT)
+    return int(total_reps), len(session_ids)
+
+
+def measure(fn, *args, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak / 1024
+
+
+def run(history, repeats, seed=0):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(BaseConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            INGEST_WORKERS = 0
+
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            reset_exercise_catalog()
+            user = User(email="bench@example.com", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+
+            start_day = date(2015, 1, 1)
+            for i in range(history):
+                add_session(user.id, start_day + timedelta(days=i), make_entries(rng))
+                if i % 500 == 0:
+                    db.session.commit()
+            db.session.commit()
+
+            user_id = user.id
+            exercise_id = resolve_exercise(EXERCISE, "strength")
+            orm_result, orm_ms, orm_kb = measure(orm_path, user_id, exercise_id, repeats=repeats)
+            columnar_result, columnar_ms, columnar_kb = measure(columnar_path, user_id, exercise_id, repeats=repeats)
+            assert orm_result == columnar_result, (orm_result, columnar_result)
+
+            db.session.remove()
+            db.engine.dispose()
+
+    return orm_ms, orm_kb, columnar_ms, columnar_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'history':>8}{'orm ms':>10}{'orm KiB':>10}{'numpy ms':>10}{'numpy KiB':>11}{'speedup':>9}")
+    for history in args.history:
+        orm_ms, orm_kb, columnar_ms, columnar_kb = run(history, max(1, args.repeats))
+        print(f"{history:>8}{orm_ms:>10.2f}{orm_kb:>10.0f}{columnar_ms:>10.2f}{columnar_kb:>11.0f}{orm_ms / columnar_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+PR detection latency against training history length.
+
+Builds a throwaway SQLite database per history size, fills it with N past sessions
+of a few exercises, then times track_prs_for_session for freshly logged sessions.
+With pr_bests the per-session cost should stay flat as N grows.
+
+    python -m benchmarks.pr_tracking_latency
+    python -m benchmarks.pr_tracking_latency --history 100 1000 10000 --samples 50
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from config import BaseConfig
+from init import create_app, db
+from models import User, WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry
+from utils.exercise_catalog import reset_exercise_catalog, resolve_exercise
+from utils.pr_utils import track_prs_for_session
+
+STRENGTH_EXERCISES = ["bench press", "squat", "deadlift", "overhead press"]
+
+
+def make_entries(rng):
+    entries = [
+        {
+            "type": "strength",
+            "exercise": exercise,
+            "sets_details": [
+                {"set_number": n, "reps": rng.randint(3, 10), "weight": rng.randrange(95, 315, 5)}
+                for n in range(1, 4)
+            ],
+        }
+        for exercise in STRENGTH_EXERCISES
+    ]
+    distance = round(rng.uniform(2, 8), 2)
+    duration = round(distance * rng.uniform(8, 11), 1)
+    entries.append({"type": "cardio", "exercise": "running", "distance": distance, "duration": duration,
+                    "pace": round(duration / distance, 2)})
+    return entries
+
+
+def add_session(user_id, day, entries):
+    session = WorkoutSession(user_id=user_id, date=day, raw_text="benchmark", notes="")
+    db.session.add(session)
+    db.session.flush()
+    for item in entries:
+        entry = WorkoutEntry(session_id=session.id, type=item["type"], exercise=item["exercise"],
+                             exercise_id=resolve_exercise(item["exercise"], item["type"]))
+        db.session.add(entry)
+        db.session.flush()
+        if item["type"] == "strength":
+            for s in item["sets_details"]:
+                db.session.add(StrengthEntry(entry_id=entry.id, set_number=s["set_number"], reps=s["reps"], weight=s["weight"]))
+        else:
+            db.session.add(CardioEntry(entry_id=entry.id, distance=item["distance"], duration=item["duration"], pace=item["pace"]))
+    return session
+
+
+def run(history, samples, seed=0):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(BaseConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            INGEST_WORKERS = 0
+
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            reset_exercise_catalog()
+            user = User(email="bench@example.com", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+
+            start_day = date(2015, 1, 1)
+            for i in range(history):
+                add_session(user.id, start_day + timedelta(days=i), make_entries(rng))
+                if i % 500 == 0:
+                    db.session.commit()
+            db.session.commit()
+
+            timings = []
+            for i in range(samples):
+                entries = make_entries(rng)
+                session = add_session(user.id, start_day + timedelta(days=history + i), entries)
+                db.session.commit()
+
+                started = time.perf_counter()
+                track_prs_for_session(session, entries)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            db.session.remove()
+            db.engine.dispose()
+
+    # The first sample seeds pr_bests from history; report it separately
+    return timings[0], statistics.median(timings[1:]), max(timings[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--samples", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'history':>8}{'first ms':>10}{'median ms':>11}{'max ms':>9}")
+    for history in args.history:
+        first, median, worst = run(history, max(2, args.samples))
+        print(f"{history:>8}{first:>10.2f}{median:>11.2f}{worst:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Prompt size of the AI-insights recommendation prompts against training history length.
+
+Compares the old verbatim history listing (every set ever logged) with the
+summarized history built by utils.history_summary. Token counts use tiktoken
+when it is installed and fall back to a chars/4 estimate otherwise.
+
+    python -m benchmarks.recommendation_prompt_size
+    python -m benchmarks.recommendation_prompt_size --sessions 10 100 1000 5000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from utils.openai_utils import build_followup_set_prompt, build_followup_cardio_prompt
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+except ImportError:
+    def count_tokens(text):
+        return len(text) // 4
+
+
+def synthetic_strength_history(sessions, seed=0):
+    rng = random.Random(seed)
+    start = date(2020, 1, 6)
+    sets = []
+    for i in range(sessions):
+        day = start + timedelta(days=i * 3)
+        # Slow progression with a deload every 60 sessions
+        weight = 135 + 5 * ((i // 4) % 15)
+        for set_number in range(1, rng.randint(3, 5) + 1):
+            sets.append({
+                "session_id": i + 1,
+                "set_number": set_number,
+                "reps": rng.randint(5, 10),
+                "weight": weight,
+                "date": day.isoformat(),
+            })
+    return sets
+
+
+def synthetic_cardio_history(sessions, seed=0):
+    rng = random.Random(seed)
+    start = date(2020, 1, 6)
+    data = []
+    for i in range(sessions):
+        distance = round(rng.uniform(2, 8), 2)
+        duration = round(distance * rng.uniform(8, 11), 1)
+        data.append({
+            "session_id": i + 1,
+            "distance": distance,
+            "duration": duration,
+            "pace": round(duration / distance, 2),
+            "date": (start + timedelta(days=i * 2)).isoformat(),
+        })
+    return data
+
+
+def verbatim_strength_listing(sets):
+    # The history section as it was formatted before summarization
+    return "\n".join(
+        f"- Set {s['set_number']} (Session {s['session_id']}): {s['reps']} reps at {s['weight']} lbs"
+        for s in sets
+    )
+
+
+def verbatim_cardio_listing(data):
+    return "\n".join(
+        f"- Session {s['session_id']} on {s['date']}: {s['distance']} miles, {s['duration']} min, {s['pace']} min/mile"
+        for s in data
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[5, 25, 100, 500, 2000])
+    args = parser.parse_args()
+
+    print(f"{'kind':<9}{'sessions':>9}{'verbatim tok':>14}{'summary tok':>13}{'build ms':>10}")
+    for kind, make_history, build_prompt, verbatim in (
+        ("strength", synthetic_strength_history, build_followup_set_prompt, verbatim_strength_listing),
+        ("cardio", synthetic_cardio_history, build_followup_cardio_prompt, verbatim_cardio_listing),
+    ):
+        for sessions in args.sessions:
+            history = make_history(sessions)
+
+            start = time.perf_counter()
+            prompt = build_prompt("bench press" if kind == "strength" else "running", history)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            # Old prompt size: the summarized prompt with its history section swapped for the full listing
+            history_tokens = count_tokens(verbatim(history))
+            summary_tokens = count_tokens(prompt)
+            print(f"{kind:<9}{sessions:>9}{history_tokens + summary_tokens:>14}{summary_tokens:>13}{build_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Goal evaluation cost after years of weekly goals: a fresh goal every week vs one recurring goal.
+
+Builds a throwaway SQLite database per history length with three runs a week and one
+"run 10 miles" goal per week, stored either as a new one-off goal each week (what the
+parser produced before repeat_interval) or as a single weekly goal with one period row
+per week. It then times logging a new session: restating the goal through
+process_goals_for_session and evaluating the goals it affects. The recurring goal only
+reads the current week, so its cost should stay flat as the years add up.
+
+    python -m benchmarks.recurring_goal_evaluation
+    python -m benchmarks.recurring_goal_evaluation --years 1 5 10 --samples 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.pr_tracking_latency import add_session
+from config import BaseConfig
+from init import create_app, db
+from models import User, Goal, GoalTarget, GoalProgress, GoalPeriod, GoalTypeEnum, ExerciseTypeEnum, MetricEnum, RepeatIntervalEnum
+from utils.exercise_catalog import reset_exercise_catalog
+from utils.log_entry_utils import process_goals_for_session, evaluate_user_goals
+
+WEEKLY_MILES = 10
+RUNS_PER_WEEK = (0, 2, 4)  # Monday, Wednesday, Friday
+
+
+def run_entries(rng):
+    distance = round(rng.uniform(2, 6), 2)
+    duration = round(distance * rng.uniform(8, 11), 1)
+    return [{"type": "cardio", "exercise": "running", "distance": distance, "duration": duration,
+             "pace": round(duration / distance, 2)}]
+
+
+def goal_dict(week_start, recurring):
+    goal = {
+        "name": "Run 10 miles a week",
+        "start_date": week_start.isoformat(),
+        "goal_type": "aggregate",
+        "exercise_type": "cardio",
+        "exercise_name": "running",
+        "targets": [{"target_metric": "distance", "target_value": WEEKLY_MILES}],
+    }
+    if recurring:
+        goal["repeat_interval"] = "weekly"
+    else:
+        goal["end_date"] = (week_start + timedelta(days=6)).isoformat()
+    return goal
+
+
+def add_goal(user_id, session_id, start, end, repeat_interval=None):
+    goal = Goal(user_id=user_id, session_id=session_id, name="Run 10 miles a week", start_date=start, end_date=end,
+                goal_type=GoalTypeEnum.aggregate, repeat_interval=repeat_interval,
+                exercise_type=ExerciseTypeEnum.cardio, exercise_name="running")
+    goal.targets.append(GoalTarget(metric=MetricEnum.distance, value=WEEKLY_MILES))
+    db.session.add(goal)
+    db.session.flush()
+    return goal
+
+
+def fill_history(user_id, first_week, weeks, recurring, rng):
+    # Goals are declared in the week's first logged session, as the parser would store them
+    series = None
+    for w in range(weeks):
+        week_start = first_week + timedelta(weeks=w)
+        week_end = week_start + timedelta(days=6)
+        sessions = [add_session(user_id, week_start + timedelta(days=offset), run_entries(rng)) for offset in RUNS_PER_WEEK]
+
+        if recurring:
+            series = series or add_goal(user_id, sessions[0].id, first_week, None, RepeatIntervalEnum.weekly)
+            goal = series
+        else:
+            goal = add_goal(user_id, sessions[0].id, week_start, week_end)
+        db.session.add(GoalProgress(goal_id=goal.id, metric=MetricEnum.distance, value_achieved=WEEKLY_MILES,
+                                    achieved_on=week_end, is_complete=True))
+        if recurring:
+            db.session.add(GoalPeriod(goal_id=goal.id, period_start=week_start, period_end=week_end,
+                                      is_complete=True, completed_on=week_end))
+        if w % 50 == 0:
+            db.session.commit()
+    db.session.commit()
+
+
+def run(years, samples, recurring, seed=0):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(BaseConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            INGEST_WORKERS = 0
+
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            reset_exercise_catalog()
+            user = User(email="bench@example.com", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+            first_week = date(2015, 1, 5)  # a Monday
+            weeks = years * 52
+            fill_history(user_id, first_week, weeks, recurring, rng)
+
+            timings = []
+            for i in range(samples):
+                day = first_week + timedelta(weeks=weeks, days=i)
+                week_start = day - timedelta(days=day.weekday())
+                session = add_session(user_id, day, run_entries(rng))
+                db.session.commit()
+
+                started = time.perf_counter()
+                added, _ = process_goals_for_session([goal_dict(week_start, recurring)], user_id, session)
+                evaluate_user_goals(user_id, session, goal_ids=[g["id"] for g in added])
+                timings.append((time.perf_counter() - started) * 1000)
+
+            goal_rows = db.session.query(Goal).filter_by(user_id=user_id).count()
+            db.session.remove()
+            db.engine.dispose()
+
+    return statistics.median(timings), goal_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3, 10])
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'years':>6}{'one-off goals':>15}{'ms/log':>9}{'recurring goals':>17}{'ms/log':>9}")
+    for years in args.years:
+        one_off_ms, one_off_goals = run(years, max(1, args.samples), recurring=False)
+        recurring_ms, recurring_goals = run(years, max(1, args.samples), recurring=True)
+        print(f"{years:>6}{one_off_goals:>15}{one_off_ms:>9.2f}{recurring_goals:>17}{recurring_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from .ingest_commands import ingest_worker_command
+from .exercise_commands import backfill_exercise_ids_command, prune_exercise_aliases_command
+from .reparse_commands import reparse_pending_command
+from .pr_commands import rebuild_prs_command
+from .goal_commands import (
+    repair_goal_accumulators_command, rollover_goal_periods_command, backfill_goal_fingerprints_command,
+    sweep_expired_goals_command, rebuild_goal_status_command, compact_goal_progress_command,
+    reevaluate_goals_command,
+)
+
+
+def register_commands(app):
+    app.cli.add_command(ingest_worker_command)
+    app.cli.add_command(backfill_exercise_ids_command)
+    app.cli.add_command(prune_exercise_aliases_command)
+    app.cli.add_command(reparse_pending_command)
+    app.cli.add_command(rebuild_prs_command)
+    app.cli.add_command(repair_goal_accumulators_command)
+    app.cli.add_command(rollover_goal_periods_command)
+    app.cli.add_command(backfill_goal_fingerprints_command)
+    app.cli.add_command(sweep_expired_goals_command)
+    app.cli.add_command(rebuild_goal_status_command)
+    app.cli.add_command(compact_goal_progress_command)
+    app.cli.add_command(reevaluate_goals_command)
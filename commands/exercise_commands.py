@@ -0,0 +1,29 @@
+import click
+from flask.cli import with_appcontext
+
+from utils.exercise_catalog import backfill_exercise_ids, load_exercise_catalog, prune_merged_aliases
+
+
+@click.command("backfill-exercise-ids")
+@with_appcontext
+def backfill_exercise_ids_command():
+    """Links legacy entries, PRs and goals to the exercises catalog by name."""
+    load_exercise_catalog()
+    updated = backfill_exercise_ids()
+    for table, count in updated.items():
+        click.echo(f"{table}: {count} row(s) updated")
+
+
+@click.command("prune-exercise-aliases")
+@click.option("--dry-run", is_flag=True, help="List the aliases without removing them.")
+@with_appcontext
+def prune_exercise_aliases_command(dry_run):
+    """Splits exercises that fuzzy matching merged, relinking their entries, PRs and goals by name."""
+    load_exercise_catalog()
+    pruned = prune_merged_aliases(dry_run)
+    for alias, name in pruned:
+        click.echo(f"{alias} -> {name}")
+    action = "Found" if dry_run else "Pruned"
+    click.echo(f"{action} {len(pruned)} merged alias(es).")
+    if pruned and not dry_run:
+        click.echo("Run `flask rebuild-prs` to rebuild PRs and rep maxes for the split exercises.")
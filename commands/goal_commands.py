@@ -0,0 +1,162 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from commands.pool import map_in_pool
+from init import db
+from models import User
+from utils.goal_utils import (
+    verify_goal_accumulators, close_goal_periods, backfill_goal_fingerprints, rebuild_goal_status, reevaluate_user_goals,
+)
+from utils.goal_sweeper import sweep_goals, compact_progress
+
+
+@click.command("repair-goal-accumulators")
+@click.option("--user-id", default=None, type=int, help="Only check this user's goals.")
+@click.option("--dry-run", is_flag=True, help="Report drifted totals without fixing them.")
+@with_appcontext
+def repair_goal_accumulators_command(user_id, dry_run):
+    """Rebuilds aggregate goal running totals from raw sessions and reports any that had drifted."""
+    drifted = verify_goal_accumulators(user_id, repair=not dry_run)
+    for goal_id, metric, stored, rebuilt in drifted:
+        click.echo(f"Goal {goal_id} {metric}: stored {stored}, rebuilt {rebuilt}")
+    action = "Found" if dry_run else "Repaired"
+    click.echo(f"{action} {len(drifted)} drifted total(s).")
+
+
+@click.command("rollover-goal-periods")
+@click.option("--date", "today", default=None, help="Close periods that ended before this day (YYYY-MM-DD, default today).")
+@with_appcontext
+def rollover_goal_periods_command(today):
+    """Closes every recurring goal period that has ended. Meant to run daily from cron."""
+    today = datetime.strptime(today, "%Y-%m-%d").date() if today else None
+    closed = close_goal_periods(today)
+    click.echo(f"Closed {closed} goal period(s).")
+
+
+@click.command("backfill-goal-fingerprints")
+@click.option("--batch-size", default=500, show_default=True, help="Goals fingerprinted per commit.")
+@with_appcontext
+def backfill_goal_fingerprints_command(batch_size):
+    """Fingerprints goals created before duplicate detection moved to the fingerprint index."""
+    updated = backfill_goal_fingerprints(batch_size)
+    click.echo(f"Fingerprinted {updated} goal(s).")
+
+
+@click.command("sweep-expired-goals")
+@click.option("--date", "today", default=None, help="Expire goals that ended before this day (YYYY-MM-DD, default today).")
+@with_appcontext
+def sweep_expired_goals_command(today):
+    """Runs one goal sweeper pass: expires ended goals and closes ended recurring periods."""
+    today = datetime.strptime(today, "%Y-%m-%d").date() if today else None
+    expired, closed = sweep_goals(today)
+    click.echo(f"Expired {expired} goal(s), closed {closed} goal period(s).")
+
+
+@click.command("rebuild-goal-status")
+@click.option("--user-id", default=None, type=int, help="Only rebuild this user's goals.")
+@click.option("--batch-size", default=500, show_default=True, help="Goals rebuilt per commit.")
+@with_appcontext
+def rebuild_goal_status_command(user_id, batch_size):
+    """Recomputes stored goal status and latest progress from the progress history."""
+    processed = rebuild_goal_status(user_id, batch_size)
+    click.echo(f"Rebuilt status for {processed} goal(s).")
+
+
+@click.command("compact-goal-progress")
+@click.option("--date", "today", default=None, help="Age progress rows relative to this day (YYYY-MM-DD, default today).")
+@with_appcontext
+def compact_goal_progress_command(today):
+    """Collapses goal progress history into daily and weekly checkpoints and trims finished goals."""
+    today = datetime.strptime(today, "%Y-%m-%d").date() if today else None
+    deleted = compact_progress(current_app, today)
+    click.echo(f"Removed {deleted} progress row(s).")
+
+
+def _reevaluate_chunk(user_ids):
+    """Re-evaluates a chunk of users in one transaction, each inside a savepoint so one failure only drops that user."""
+    goals = sessions = 0
+    failed = []
+    for user_id in user_ids:
+        try:
+            with db.session.begin_nested():
+                user_goals, user_sessions = reevaluate_user_goals(user_id)
+            goals += user_goals
+            sessions += user_sessions
+        except Exception as e:
+            failed.append((user_id, str(e)))
+    db.session.commit()
+    db.session.expunge_all()
+    return user_ids[-1], len(user_ids), goals, sessions, failed
+
+
+def _read_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get("last_user_id", 0)
+
+
+def _write_checkpoint(path, last_user_id):
+    # Replace atomically so a crash mid-write never leaves a truncated checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_user_id": last_user_id, "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+@click.command("reevaluate-goals")
+@click.option("--user-id", default=None, type=int, help="Only re-evaluate this user's goals.")
+@click.option("--processes", default=None, type=int, help="Worker processes (defaults to the CPU count).")
+@click.option("--chunk-size", default=50, show_default=True, help="Users per task and per commit.")
+@click.option("--checkpoint", default=None, type=click.Path(dir_okay=False), help="File recording the last finished user; an interrupted run resumes from it.")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint and start from the first user.")
+@with_appcontext
+def reevaluate_goals_command(user_id, processes, chunk_size, checkpoint, restart):
+    """Re-evaluates every user's unfinished goals from their sessions, a chunk of users per task across a process pool. Meant to run nightly."""
+    resume_after = 0 if restart else _read_checkpoint(checkpoint)
+    if user_id:
+        user_ids = [user_id]
+    else:
+        rows = User.query.with_entities(User.id).filter(User.id > resume_after).order_by(User.id).all()
+        user_ids = [row.id for row in rows]
+    if resume_after and not user_id:
+        click.echo(f"Resuming after user {resume_after}.")
+
+    chunk_size = max(1, chunk_size)
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    processes = min(processes or os.cpu_count() or 1, len(chunks)) or 1
+
+    started = time.perf_counter()
+    users = goals = sessions = 0
+    failed = []
+
+    def record(result):
+        nonlocal users, goals, sessions
+        last_user_id, chunk_users, chunk_goals, chunk_sessions, chunk_failed = result
+        users += chunk_users
+        goals += chunk_goals
+        sessions += chunk_sessions
+        failed.extend(chunk_failed)
+        # Results arrive in user order, so everything up to last_user_id is done
+        if checkpoint and not user_id:
+            _write_checkpoint(checkpoint, last_user_id)
+
+    for result in map_in_pool(_reevaluate_chunk, chunks, processes):
+        record(result)
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    click.echo(
+        f"Re-evaluated {goals} goal(s) for {users} user(s) over {sessions} session(s) in {elapsed:.1f}s "
+        f"({users / elapsed:.1f} users/s, {sessions / elapsed:.1f} sessions/s)."
+    )
+    for uid, error in failed:
+        click.echo(f"User {uid} failed: {error}")
+
+    if checkpoint and not user_id and os.path.exists(checkpoint):
+        os.remove(checkpoint)  # Finished; the next run starts from the first user again
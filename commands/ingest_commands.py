@@ -0,0 +1,27 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from utils.goal_sweeper import start_goal_sweeper, stop_goal_sweeper
+from utils.ingest_worker import start_ingest_workers, stop_ingest_workers
+
+
+@click.command("ingest-worker")
+@click.option("--threads", default=None, type=int, help="Worker threads (defaults to INGEST_WORKERS).")
+@with_appcontext
+def ingest_worker_command(threads):
+    """Runs a standalone worker pool for queued /api/log-workout jobs, plus the goal sweeper."""
+    app = current_app._get_current_object()
+    threads = threads or app.config.get("INGEST_WORKERS") or 1
+
+    click.echo(f"Starting {threads} ingest worker thread(s)...")
+    workers = start_ingest_workers(app, threads)
+    start_goal_sweeper(app)
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        click.echo("Stopping ingest workers.")
+        stop_ingest_workers()
+        stop_goal_sweeper()
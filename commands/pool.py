@@ -0,0 +1,45 @@
+import os
+from functools import partial
+from multiprocessing import Pool
+
+from init import db
+
+_worker_app = None
+
+
+def _init_worker(env):
+    # Each worker process gets its own app and connection pool
+    global _worker_app
+    from config import CONFIG_MAP
+    from init import create_app
+    from utils.exercise_catalog import load_exercise_catalog
+
+    _worker_app = create_app(CONFIG_MAP[env])
+    with _worker_app.app_context():
+        load_exercise_catalog()
+
+
+def _call_in_worker(func, item):
+    with _worker_app.app_context():
+        try:
+            return func(item)
+        finally:
+            db.session.remove()
+
+
+def map_in_pool(func, items, processes):
+    """
+    Yields func(item) for every item, in order. With more than one process the items are spread
+    over a pool whose workers each build their own app; otherwise they run here, in the current
+    app context. `func` must be a module-level function so it can be pickled.
+    """
+    if processes <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    # Connections inherited from this process must not be shared with the workers
+    db.engine.dispose()
+    env = os.getenv("ENV", "standard").lower()
+    with Pool(processes, initializer=_init_worker, initargs=(env,)) as pool:
+        yield from pool.imap(partial(_call_in_worker, func), items)
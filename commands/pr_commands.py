@@ -0,0 +1,34 @@
+import os
+
+import click
+from flask.cli import with_appcontext
+
+from commands.pool import map_in_pool
+from init import db
+from models import User
+from utils.pr_utils import rebuild_prs_for_user
+
+
+def _rebuild_user(user_id):
+    try:
+        return user_id, rebuild_prs_for_user(user_id), None
+    except Exception as e:
+        db.session.rollback()
+        return user_id, 0, str(e)
+
+
+@click.command("rebuild-prs")
+@click.option("--user-id", default=None, type=int, help="Only rebuild this user's PRs.")
+@click.option("--processes", default=None, type=int, help="Worker processes (defaults to the CPU count).")
+@with_appcontext
+def rebuild_prs_command(user_id, processes):
+    """Drops and replays every PR chain and pr_bests row, one user per task across a process pool."""
+    user_ids = [user_id] if user_id else [u.id for u in User.query.with_entities(User.id).order_by(User.id).all()]
+    processes = min(processes or os.cpu_count() or 1, len(user_ids)) or 1
+
+    results = list(map_in_pool(_rebuild_user, user_ids, processes))
+
+    failed = [(uid, error) for uid, _, error in results if error]
+    click.echo(f"Rebuilt PRs for {len(results) - len(failed)} user(s): {sum(count for _, count, _ in results)} PR(s) on record.")
+    for uid, error in failed:
+        click.echo(f"User {uid} failed: {error}")
@@ -0,0 +1,15 @@
+import click
+from flask.cli import with_appcontext
+
+from utils.log_entry_utils import reparse_pending_sessions
+
+
+@click.command("reparse-pending")
+@click.option("--limit", default=None, type=int, help="Maximum number of sessions to re-parse.")
+@with_appcontext
+def reparse_pending_command(limit):
+    """Re-parses sessions that were stored raw while the LLM was unavailable."""
+    reparsed, failed = reparse_pending_sessions(limit)
+    click.echo(f"Re-parsed {len(reparsed)} session(s).")
+    if failed:
+        click.echo(f"Failed to re-parse session(s): {', '.join(str(i) for i in failed)}")
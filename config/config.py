@@ -5,12 +5,72 @@ from datetime import timedelta
 class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+    # LLM backend: "openai" (default) or "stub" for the local chat-completions stand-in
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+    LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+    LLM_STUB_URL = os.getenv("LLM_STUB_URL", "http://127.0.0.1:8001/v1")
+
+    # LLM resilience: per-call deadline, optional hedged second request, circuit breaker
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 20))
+    LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", 0))  # 0 disables hedging
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+    LLM_BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", 60))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
     SEED_DATA_FILE_PATH = os.getenv("SEED_DATA_FILE_PATH", "sample_sessions.json")
     SECRET_KEY = os.getenv("SECRET_KEY")
 
     # Default JWT token expiration: 1 day
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
 
+    # Parse cache: repeat logs of the same text are served from the parse_cache table
+    PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+    PARSE_CACHE_TTL_SECONDS = int(os.getenv("PARSE_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+    PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", 10000))
+
+    # Recommendation cache: AI insights are reused until the user's history for the exercise changes
+    RECOMMENDATION_CACHE_ENABLED = os.getenv("RECOMMENDATION_CACHE_ENABLED", "true").lower() == "true"
+    RECOMMENDATION_CACHE_TTL_SECONDS = int(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+    # Rep-max ladder: best weight for at least 1..N reps per exercise, kept up to date on every log
+    REP_MAX_LADDER_SIZE = int(os.getenv("REP_MAX_LADDER_SIZE", 12))
+
+    # Local shorthand parser: skip the LLM when the rule-based parse covers the whole entry
+    LOCAL_PARSER_ENABLED = os.getenv("LOCAL_PARSER_ENABLED", "true").lower() == "true"
+    LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv("LOCAL_PARSER_MIN_CONFIDENCE", 0.95))
+
+    # Async log ingestion: worker threads polling the ingest_jobs table. They run in `flask ingest-worker`
+    # (the Procfile worker) or in app.py's dev server, never in web or CLI processes on import
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+    INGEST_REQUEUE_INTERVAL_SECONDS = int(os.getenv("INGEST_REQUEUE_INTERVAL_SECONDS", 60))
+    INGEST_POLL_INTERVAL_SECONDS = float(os.getenv("INGEST_POLL_INTERVAL_SECONDS", 1.0))
+    INGEST_JOB_TIMEOUT_SECONDS = int(os.getenv("INGEST_JOB_TIMEOUT_SECONDS", 600))
+    INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", 3))
+
+    # Goal sweeper, run alongside the ingest workers: seconds between passes that expire ended goals
+    # and close ended periods (0 disables)
+    GOAL_SWEEP_INTERVAL_SECONDS = int(os.getenv("GOAL_SWEEP_INTERVAL_SECONDS", 3600))
+
+    # Goal progress compaction (run daily by the sweeper): daily checkpoints for this many days,
+    # weekly after that, and only the final value once a finished goal is past retention
+    GOAL_PROGRESS_DAILY_DAYS = int(os.getenv("GOAL_PROGRESS_DAILY_DAYS", 30))
+    GOAL_PROGRESS_RETENTION_DAYS = int(os.getenv("GOAL_PROGRESS_RETENTION_DAYS", 90))
+
+    # Logging: root level, per-module overrides ("utils.goal_utils=DEBUG,routes=WARNING"),
+    # "text" or "json" output, and the share of requests whose DEBUG lines are kept
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    # Bulk historical import
+    IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", 4))
+    IMPORT_MAX_CONCURRENCY = int(os.getenv("IMPORT_MAX_CONCURRENCY", 16))
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 50))
+    IMPORT_MAX_ITEMS = int(os.getenv("IMPORT_MAX_ITEMS", 1000))
+
 class StandardConfig(BaseConfig):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv("STANDARD_DATABASE_URL", "sqlite:///database.db")
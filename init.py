@@ -1,13 +1,87 @@
 # init.py
+import logging
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from sqlalchemy import Enum, inspect, literal, text
 
 
 db = SQLAlchemy()
 jwt = JWTManager()  # Step 1: Create the JWTManager instance
 
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables whose values on old rows come from a backfill command
+BACKFILL_COMMANDS = {
+    "workout_entry.exercise_id": "flask backfill-exercise-ids",
+    "personal_records.exercise_id": "flask backfill-exercise-ids",
+    "goals.exercise_id": "flask backfill-exercise-ids",
+    "goals.fingerprint": "flask backfill-goal-fingerprints",
+    "goals.status": "flask rebuild-goal-status",
+    "goals.completed_at": "flask rebuild-goal-status",
+    "goals.latest_progress": "flask rebuild-goal-status",
+}
+
+
+def _default_sql(column, dialect):
+    default = column.default
+    if default is None or not default.is_scalar:
+        return None
+    return str(literal(default.arg, column.type).compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def upgrade_schema():
+    """
+    Brings an existing database up to the models: create_all only creates missing tables, so
+    columns, indexes and enum values added to old tables are applied here. Returns the added
+    columns as "table.column".
+    """
+    engine = db.engine
+    dialect = engine.dialect
+    preparer = dialect.identifier_preparer
+    inspector = inspect(engine)
+    added = []
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if isinstance(column.type, Enum) and dialect.name == "postgresql":
+                    # Native enum types: create new ones, and add members introduced since
+                    column.type.create(conn, checkfirst=True)
+                    for value in column.type.enums:
+                        conn.execute(text(f"ALTER TYPE {preparer.format_type(column.type)} ADD VALUE IF NOT EXISTS '{value}'"))
+                if column.name in existing:
+                    continue
+
+                # Old rows get the column default; without one the column stays nullable
+                ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect)}"
+                default = _default_sql(column, dialect)
+                if default is not None:
+                    ddl += f" DEFAULT {default}" + ("" if column.nullable else " NOT NULL")
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+
+            indexes = {i["name"]: i["column_names"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if indexes.get(index.name) == [c.name for c in index.columns]:
+                    continue
+                if index.name in indexes:
+                    index.drop(conn)  # same name, older column list
+                index.create(conn)
+
+    if added:
+        commands = sorted({BACKFILL_COMMANDS[c] for c in added if c in BACKFILL_COMMANDS})
+        logger.warning("Added columns %s to the existing database; backfill them with: %s",
+                       ", ".join(added), "; ".join(commands) or "nothing to backfill")
+    return added
+
+
 def create_app(config_class):
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -19,5 +93,6 @@ def create_app(config_class):
 
     with app.app_context():
         db.create_all()
+        upgrade_schema()
 
     return app
@@ -0,0 +1,217 @@
+"""
+Local stand-in for the OpenAI chat-completions API, for load testing without network or spend.
+
+    python -m llm_stub.server --port 8001 --latency-dist lognormal --latency-ms 1500 --jitter-ms 600
+
+Point the app at it with LLM_BACKEND=stub (and LLM_STUB_URL if not on the default port).
+Responses are rule-generated from the prompt (the local shorthand parser for workout
+parsing, simple progressions for recommendations) unless a canned response matches.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+from utils.local_parser import parse_shorthand
+
+STRENGTH_SET_PATTERN = re.compile(r"(\d+) reps(?: at ([\d.]+) lbs)?")
+CARDIO_DISTANCE_PATTERN = re.compile(r"([\d.]+) miles")
+CARDIO_DURATION_PATTERN = re.compile(r"([\d.]+) min(?!/)")
+CARDIO_PACE_PATTERN = re.compile(r"([\d.]+) min/mile")
+
+
+class LatencyModel:
+    def __init__(self, distribution="constant", latency_ms=0.0, jitter_ms=0.0, seed=None):
+        self.distribution = distribution
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.random = random.Random(seed)
+
+    def sample_seconds(self):
+        mean, jitter = self.latency_ms, self.jitter_ms
+
+        if self.distribution == "uniform":
+            value = self.random.uniform(mean - jitter, mean + jitter)
+        elif self.distribution == "normal":
+            value = self.random.gauss(mean, jitter)
+        elif self.distribution == "lognormal":
+            # latency_ms is the median; jitter_ms controls the spread of the tail
+            sigma = jitter / mean if mean > 0 else 0
+            value = self.random.lognormvariate(math.log(mean), sigma) if mean > 0 else 0
+        elif self.distribution == "exponential":
+            value = self.random.expovariate(1 / mean) if mean > 0 else 0
+        else:
+            value = mean
+
+        return max(0.0, value) / 1000
+
+
+def extract_user_prompt(messages):
+    return "\n".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+
+
+def generate_parse_response(prompt):
+    raw_text = prompt.split("### Input:", 1)[1].strip()
+    structured_response, _ = parse_shorthand(raw_text)
+    return structured_response or {"entries": [], "notes": raw_text, "goals": []}
+
+
+def generate_strength_recommendation(prompt):
+    sets = [(int(reps), float(weight) if weight else None) for reps, weight in STRENGTH_SET_PATTERN.findall(prompt)]
+    recent = sets[-3:] or [(8, None)]
+
+    recommended = []
+    for i, (reps, weight) in enumerate(recent, start=1):
+        if weight:
+            recommended.append({"set_number": i, "reps": reps, "weight": int(round(weight / 5) * 5 + 5)})
+        else:
+            recommended.append({"set_number": i, "reps": reps + 1})
+
+    return {"recommended_sets": recommended, "rationale": "Stub: small progression over the most recent sets."}
+
+
+def generate_cardio_recommendation(prompt):
+    recommendations = []
+
+    distances = CARDIO_DISTANCE_PATTERN.findall(prompt)
+    if distances:
+        recommendations.append({
+            "improved_metric": "distance",
+            "recommended_session": {"distance_miles": round(float(distances[-1]) * 1.03, 2)},
+            "rationale": "Stub: ~3% more distance."
+        })
+
+    durations = CARDIO_DURATION_PATTERN.findall(prompt)
+    if durations:
+        recommendations.append({
+            "improved_metric": "duration",
+            "recommended_session": {"duration_minutes": round(float(durations[-1]) * 1.03, 1)},
+            "rationale": "Stub: ~3% longer session."
+        })
+
+    paces = CARDIO_PACE_PATTERN.findall(prompt)
+    if paces:
+        recommendations.append({
+            "improved_metric": "pace",
+            "recommended_session": {"target_pace_min_per_mile": round(float(paces[-1]) * 0.98, 2)},
+            "rationale": "Stub: ~2% faster pace."
+        })
+
+    return {"recommendations": recommendations}
+
+
+def generate_content(prompt, canned):
+    for rule in canned:
+        if rule["match"] in prompt:
+            return json.dumps(rule["response"])
+
+    if "### Input:" in prompt:
+        return json.dumps(generate_parse_response(prompt))
+    if "strength training coach" in prompt:
+        return json.dumps(generate_strength_recommendation(prompt))
+    if "cardio coach" in prompt:
+        return json.dumps(generate_cardio_recommendation(prompt))
+    return json.dumps({})
+
+
+def create_stub_app(latency, canned=None, error_rate=0.0, chunk_size=24):
+    app = Flask(__name__)
+    canned = canned or []
+
+    @app.route("/v1/models", methods=["GET"])
+    def list_models():
+        return jsonify({"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]})
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        body = request.get_json(force=True)
+        model = body.get("model", "stub")
+        prompt = extract_user_prompt(body.get("messages", []))
+        delay = latency.sample_seconds()
+
+        if error_rate and latency.random.random() < error_rate:
+            time.sleep(delay)
+            return jsonify({"error": {"message": "Stub injected failure", "type": "server_error"}}), 500
+
+        content = generate_content(prompt, canned)
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+
+        if not body.get("stream"):
+            time.sleep(delay)
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+        def generate():
+            pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+            # Spend a third of the latency before the first token, the rest spread across chunks
+            time.sleep(delay / 3)
+            per_chunk = (delay * 2 / 3) / len(pieces)
+
+            def chunk(delta, finish_reason=None):
+                return "data: " + json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                }) + "\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                time.sleep(per_chunk)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local chat-completions stub for offline benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-dist", default="constant",
+                        choices=["constant", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean (median for lognormal) latency.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Spread around the mean.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--canned", help="JSON file with a list of {\"match\": substring, \"response\": {...}} rules.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    canned = []
+    if args.canned:
+        with open(args.canned) as f:
+            canned = json.load(f)
+
+    latency = LatencyModel(args.latency_dist, args.latency_ms, args.jitter_ms, seed=args.seed)
+    app = create_stub_app(latency, canned=canned, error_rate=args.error_rate)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 # __init__.py
-from .workout_session import WorkoutSession
+from .exercise import Exercise, ExerciseAlias
+from .workout_session import WorkoutSession, ParseStatusEnum
 from .workout_entry import WorkoutEntry
 from .strength_entry import StrengthEntry
 from .cardio_entry import CardioEntry
 from .personal_record import PersonalRecord
+from .pr_best import PRBest
+from .rep_max import RepMax, EstimatedOneRepMax
+from .activity_bitmap import ActivityBitmap
 from .user import User
-from .goal import Goal, GoalProgress, GoalTarget, GoalTypeEnum, ExerciseTypeEnum, MetricEnum, RepeatIntervalEnum
+from .goal import Goal, GoalProgress, GoalTarget, GoalAccumulator, GoalPeriod, GoalTypeEnum, GoalStatusEnum, ExerciseTypeEnum, MetricEnum, RepeatIntervalEnum
+from .parse_cache import ParseCacheEntry
+from .ingest_job import IngestJob, JobStatusEnum
+from .recommendation_cache import RecommendationCacheEntry
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from init import db
+
+
+class ActivityBitmap(db.Model):
+    """
+    One bit per day a user trained, per exercise type ("strength", "cardio", or "any").
+    Bit i is day `origin + i`; `bits` holds the integer little-endian.
+    """
+    __tablename__ = "activity_bitmaps"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "exercise_type", name="uq_activity_bitmaps_type"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    exercise_type = db.Column(db.String, nullable=False)
+
+    origin = db.Column(db.Date, nullable=False)
+    bits = db.Column(db.LargeBinary, nullable=False, default=b"")
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from init import db
+
+
+class Exercise(db.Model):
+    __tablename__ = "exercises"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, unique=True, nullable=False, index=True)  # canonical, normalized name
+    type = db.Column(db.String, nullable=True)  # "strength" or "cardio" when first seen
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    aliases = db.relationship("ExerciseAlias", back_populates="exercise", cascade="all, delete-orphan")
+
+
+class ExerciseAlias(db.Model):
+    __tablename__ = "exercise_aliases"
+
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String, unique=True, nullable=False, index=True)  # normalized spelling that maps to exercise_id
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=False, index=True)
+
+    exercise = db.relationship("Exercise", back_populates="aliases")
@@ -27,6 +27,7 @@ class MetricEnum(enum.Enum):
     weight = 'weight'
     sessions = 'sessions'
     pace = 'pace'
+    days = 'days'  # consecutive active days, for streak goals
 
 
 class RepeatIntervalEnum(enum.Enum):
@@ -35,17 +36,32 @@ class RepeatIntervalEnum(enum.Enum):
     monthly = 'monthly'
     yearly = 'yearly'
 
+class GoalStatusEnum(enum.Enum):
+    active = 'active'
+    completed = 'completed'  # set by goal evaluation; recurring goals complete per period instead
+    expired = 'expired'      # set in bulk by the goal sweeper once end_date has passed
+
 class GoalTypeEnum(enum.Enum):
     single_session = 'single_session'
     aggregate = 'aggregate'
+    streak = 'streak'
     # These are reserved for expansion later
-    # streak = 'streak'
     # progress = 'progress'
     # pr = 'pr'
     # compound = 'compound'
 
 class Goal(db.Model):
     __tablename__ = 'goals'
+    __table_args__ = (
+        # Goal scope lookups: which of a user's goals can a session on a given date for a given exercise affect
+        db.Index("ix_goals_scope", "user_id", "exercise_id", "start_date", "end_date"),
+        db.Index("ix_goals_type_scope", "user_id", "exercise_type", "start_date", "end_date"),
+        # Duplicate detection: one probe per parsed goal
+        db.Index("ix_goals_fingerprint", "fingerprint"),
+        # Dashboard listings by status, and the expiry sweep over active goals past their end date
+        db.Index("ix_goals_user_status", "user_id", "status"),
+        db.Index("ix_goals_status_end", "status", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -58,9 +74,19 @@ class Goal(db.Model):
     end_date = Column(Date)
 
     goal_type = Column(Enum(GoalTypeEnum), nullable=False)
+    repeat_interval = Column(Enum(RepeatIntervalEnum), nullable=True)  # Recurring goals restart every interval between start_date and end_date
 
     exercise_type = Column(Enum(ExerciseTypeEnum), nullable=True)
     exercise_name = Column(String, nullable=True)
+    exercise_id = Column(Integer, ForeignKey('exercises.id'), nullable=True, index=True)
+
+    # Hash of the goal's definition (see goal_utils.goal_fingerprint); equal fingerprints are duplicates
+    fingerprint = Column(String(64), nullable=True)
+
+    # Denormalized from GoalProgress by goal evaluation so listings never load progress rows
+    status = Column(Enum(GoalStatusEnum), nullable=False, default=GoalStatusEnum.active)
+    completed_at = Column(DateTime, nullable=True)
+    latest_progress = Column(Text, nullable=True)  # JSON {metric: latest value_achieved}
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
@@ -68,6 +94,8 @@ class Goal(db.Model):
     # Relationships
     targets = relationship("GoalTarget", back_populates="goal", cascade="all, delete-orphan")
     progress = relationship("GoalProgress", back_populates="goal", cascade="all, delete-orphan")
+    accumulators = relationship("GoalAccumulator", back_populates="goal", cascade="all, delete-orphan")
+    periods = relationship("GoalPeriod", back_populates="goal", cascade="all, delete-orphan")
 
     @hybrid_property
     def is_complete(self):
@@ -118,6 +146,10 @@ class GoalTarget(db.Model):
 
 class GoalProgress(db.Model):
     __tablename__ = 'goal_progress'
+    __table_args__ = (
+        # Latest value per metric during evaluation, and the per-goal scan done by compaction
+        db.Index("ix_goal_progress_goal_metric_date", "goal_id", "metric", "achieved_on"),
+    )
 
     id = Column(Integer, primary_key=True)
     goal_id = Column(Integer, ForeignKey('goals.id'), nullable=False)
@@ -132,3 +164,43 @@ class GoalProgress(db.Model):
 
     goal = relationship("Goal", back_populates="progress")
 
+
+class GoalAccumulator(db.Model):
+    """Running total of one additive metric for an aggregate goal, kept current by per-session deltas."""
+    __tablename__ = 'goal_accumulators'
+    __table_args__ = (
+        db.UniqueConstraint('goal_id', 'metric', name='uq_goal_accumulators_metric'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    goal_id = Column(Integer, ForeignKey('goals.id'), nullable=False)
+    metric = Column(Enum(MetricEnum), nullable=False)
+
+    value = Column(Float, nullable=False, default=0)
+    recorded_value = Column(Float, nullable=True)  # value of the latest GoalProgress row written from this total
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    goal = relationship("Goal", back_populates="accumulators")
+
+
+class GoalPeriod(db.Model):
+    """One interval of a recurring goal, materialized the first time a session is evaluated inside it."""
+    __tablename__ = 'goal_periods'
+    __table_args__ = (
+        db.UniqueConstraint('goal_id', 'period_start', name='uq_goal_periods_start'),
+        # Rollover: open periods that have ended
+        db.Index('ix_goal_periods_open', 'closed_at', 'period_end'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    goal_id = Column(Integer, ForeignKey('goals.id'), nullable=False)
+
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+
+    is_complete = Column(Boolean, nullable=False, default=False)
+    completed_on = Column(Date, nullable=True)
+    closed_at = Column(DateTime, nullable=True)  # set by rollover once the period has ended; closed periods are final
+
+    goal = relationship("Goal", back_populates="periods")
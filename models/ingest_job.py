@@ -0,0 +1,32 @@
+import enum
+from datetime import datetime
+
+from init import db
+
+
+class JobStatusEnum(enum.Enum):
+    queued = 'queued'
+    running = 'running'
+    succeeded = 'succeeded'
+    failed = 'failed'
+
+
+class IngestJob(db.Model):
+    __tablename__ = "ingest_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+
+    raw_text = db.Column(db.Text, nullable=False)
+    reference_date = db.Column(db.Date, nullable=False)   # user's local "today" at submission
+    session_time = db.Column(db.Time, nullable=True)      # time the entry was submitted
+
+    status = db.Column(db.Enum(JobStatusEnum), nullable=False, default=JobStatusEnum.queued, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.Text, nullable=True)            # JSON body that /api/log-workout would have returned
+    status_code = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
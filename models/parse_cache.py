@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from init import db
+
+
+class ParseCacheEntry(db.Model):
+    __tablename__ = "parse_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # sha256 of version + date + text
+
+    prompt_version = db.Column(db.Integer, nullable=False)
+    reference_date = db.Column(db.String(10), nullable=False)  # the "today" value used in the prompt
+    normalized_text = db.Column(db.Text, nullable=False)
+    response = db.Column(db.Text, nullable=False)  # JSON returned by parse_workout_and_goals
+
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -3,11 +3,16 @@ from datetime import datetime
 
 class PersonalRecord(db.Model):
     __tablename__ = "personal_records"
+    __table_args__ = (
+        # One PR chain per (user, exercise, type, field), walked in time order
+        db.Index("ix_personal_records_chain", "user_id", "exercise_id", "type", "field", "datetime"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
     exercise = db.Column(db.String, nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=True, index=True)
     type = db.Column(db.String, nullable=False)  # "strength" or "cardio"
     field = db.Column(db.String, nullable=False)  # "weight", "reps", "volume", "distance", "duration", "pace"
     value = db.Column(db.Float, nullable=False)
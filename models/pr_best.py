@@ -0,0 +1,24 @@
+from datetime import datetime as dt  # `datetime` is also a column name below
+
+from init import db
+
+
+class PRBest(db.Model):
+    """Current best value per (user, exercise, type, field); the row PR detection compares against."""
+    __tablename__ = "pr_bests"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "exercise_id", "type", "field", name="uq_pr_bests_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=False)
+    type = db.Column(db.String, nullable=False)  # "strength" or "cardio"
+    field = db.Column(db.String, nullable=False)  # "weight", "reps", "distance", "duration", "pace"
+
+    value = db.Column(db.Float, nullable=False)
+    units = db.Column(db.String, nullable=False)
+    session_id = db.Column(db.Integer, db.ForeignKey("workout_session.id"), nullable=False, index=True)
+    datetime = db.Column(db.DateTime, nullable=False)  # when the holding session took place
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=dt.utcnow, onupdate=dt.utcnow)
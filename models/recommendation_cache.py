@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from init import db
+
+
+class RecommendationCacheEntry(db.Model):
+    __tablename__ = "recommendation_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # sha256 of request + data fingerprint
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=True, index=True)
+    kind = db.Column(db.String, nullable=False)  # "strength" or "cardio"
+    response = db.Column(db.Text, nullable=False)  # JSON returned by recommend_followup_set / recommend_followup_cardio
+
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,63 @@
+from datetime import datetime as dt  # `datetime` is also a column name below
+
+from init import db
+
+
+class RepMax(db.Model):
+    """Heaviest weight lifted for at least `reps` reps per (user, exercise): one rung of the rep-max ladder."""
+    __tablename__ = "rep_maxes"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "exercise_id", "reps", name="uq_rep_maxes_rung"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=False)
+    reps = db.Column(db.Integer, nullable=False)  # rung: 1 for 1RM, 5 for 5RM, ...
+
+    weight = db.Column(db.Float, nullable=False)
+    set_reps = db.Column(db.Integer, nullable=False)  # reps actually done in the holding set (>= reps)
+    session_id = db.Column(db.Integer, db.ForeignKey("workout_session.id"), nullable=False, index=True)
+    datetime = db.Column(db.DateTime, nullable=False)
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=dt.utcnow, onupdate=dt.utcnow)
+
+    def to_dict(self):
+        return {
+            "reps": self.reps,
+            "weight": self.weight,
+            "set_reps": self.set_reps,
+            "session_id": self.session_id,
+            "datetime": self.datetime.isoformat(),
+        }
+
+
+class EstimatedOneRepMax(db.Model):
+    """Best estimated 1RM per (user, exercise, formula) and the set it was estimated from."""
+    __tablename__ = "estimated_one_rep_maxes"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "exercise_id", "formula", name="uq_estimated_one_rep_maxes_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=False)
+    formula = db.Column(db.String, nullable=False)  # see utils.exercise_data_utils.ONE_RM_FORMULAS
+
+    value = db.Column(db.Float, nullable=False)
+    reps = db.Column(db.Integer, nullable=False)
+    weight = db.Column(db.Float, nullable=False)
+    session_id = db.Column(db.Integer, db.ForeignKey("workout_session.id"), nullable=False, index=True)
+    datetime = db.Column(db.DateTime, nullable=False)
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=dt.utcnow, onupdate=dt.utcnow)
+
+    def to_dict(self):
+        return {
+            "formula": self.formula,
+            "value": round(self.value, 2),
+            "reps": self.reps,
+            "weight": self.weight,
+            "session_id": self.session_id,
+            "datetime": self.datetime.isoformat(),
+        }
@@ -7,6 +7,7 @@ class WorkoutEntry(db.Model):
     session_id = db.Column(db.Integer, db.ForeignKey('workout_session.id'), nullable=False)
     type = db.Column(db.String, nullable=False)
     exercise = db.Column(db.String, nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=True, index=True)
     notes = db.Column(db.Text, nullable=True)
 
     strength_entries = db.relationship('StrengthEntry', backref='entry', lazy=True)
@@ -15,10 +16,14 @@ class WorkoutEntry(db.Model):
     @staticmethod
     def from_dict(data, session_id):
         from models import StrengthEntry, CardioEntry
+        from utils.exercise_catalog import resolve_exercise, get_exercise_name
+
+        exercise_id = resolve_exercise(data["exercise"], data["type"])
         entry = WorkoutEntry(
             session_id=session_id,
             type=data["type"],
-            exercise=data["exercise"],
+            exercise=get_exercise_name(exercise_id) or data["exercise"],
+            exercise_id=exercise_id,
             notes=data.get("notes")
         )
         db.session.add(entry)
@@ -1,8 +1,20 @@
+import enum
+
 from init import db
 from datetime import time
 
+
+class ParseStatusEnum(enum.Enum):
+    parsed = 'parsed'
+    pending = 'pending'  # stored raw while the LLM was unavailable; filled in by `flask reparse-pending`
+
+
 class WorkoutSession(db.Model):
     __tablename__ = "workout_session"
+    __table_args__ = (
+        # Range scans from a date forward (PR chain replays) and keyset pages of /api/sessions on (date, id)
+        db.Index("ix_workout_session_user_date", "user_id", "date", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -12,6 +24,7 @@ class WorkoutSession(db.Model):
 
     raw_text = db.Column(db.Text, nullable=False)
     notes = db.Column(db.Text, nullable=True)
+    parse_status = db.Column(db.Enum(ParseStatusEnum), nullable=False, default=ParseStatusEnum.parsed, index=True)
 
     entries = db.relationship('WorkoutEntry', backref='session', lazy=True)
     user = db.relationship('User', backref='workout_sessions')
@@ -24,5 +37,6 @@ class WorkoutSession(db.Model):
             "time": self.time.strftime("%H:%M:%S") if self.time else None,  # Add time to output
             "raw_text": self.raw_text,
             "notes": self.notes,
+            "parse_status": self.parse_status.value if self.parse_status else None,
             "entries": [entry.to_dict() for entry in self.entries]
         }
@@ -8,6 +8,8 @@ from .summary_routes import summary_bp
 from .auth_routes import auth_bp
 from .personal_record_routes import personal_record_bp
 from .goal_routes import goal_bp
+from .metrics_routes import metrics_bp
+from .import_routes import import_bp
 
 def register_routes(app):
     app.register_blueprint(log_entry_bp)
@@ -18,5 +20,7 @@ def register_routes(app):
     app.register_blueprint(auth_bp)
     app.register_blueprint(personal_record_bp)
     app.register_blueprint(goal_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(import_bp)
 
 
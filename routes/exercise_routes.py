@@ -1,12 +1,21 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from init import db
-from models import WorkoutSession, WorkoutEntry, User, StrengthEntry, CardioEntry
-from utils import estimate_1rm, apply_date_filters
+from models import WorkoutSession, WorkoutEntry, User, StrengthEntry, CardioEntry, EstimatedOneRepMax
+from utils import apply_date_filters
+from utils.exercise_data_utils import ONE_RM_FORMULAS
 from utils.openai_utils import recommend_followup_set, recommend_followup_cardio
+from utils.exercise_catalog import entry_exercise_filter, get_matcher, lookup_exercise_id
+from utils.llm_resilience import LLMUnavailableError
+from utils.recommendation_cache import cached_recommendation
+from utils.rep_max_utils import get_rep_max_ladder
+from utils.columnar import (
+    strength_set_query, load_strength_columns, effective_sets, estimate_1rm_array, session_max_1rm, session_volume,
+)
 
 exercise_bp = Blueprint("exercise_bp", __name__)
 DEFAULT_REPS = 1
@@ -42,6 +51,13 @@ def get_exercises_by_type(exercise_type):
     )
 
     return jsonify([e[0] for e in exercises])
+
+@exercise_bp.route("/api/exercises/suggest")
+@jwt_required()
+def suggest_exercises():
+    prefix = request.args.get("q", "")
+    return jsonify(get_matcher().suggest(prefix))
+
 @exercise_bp.route("/api/exercise-data/strength/1rm-trend/<string:exercise>")
 @jwt_required()
 def strength_1rm_trend(exercise):
@@ -52,41 +68,36 @@ def strength_1rm_trend(exercise):
     if not user or not user.bodyweight:
         return jsonify({"error": "User bodyweight not available"}), 400
 
-    query = db.session.query(WorkoutSession).filter(
-        WorkoutSession.user_id == user_id
-    ).options(
-        joinedload(WorkoutSession.entries)
-        .joinedload(WorkoutEntry.strength_entries)
-    )
-
-    query, err_resp, status = apply_date_filters(query)
+    query, err_resp, status = apply_date_filters(strength_set_query(user_id, entry_exercise_filter(exercise)))
     if err_resp:
         return err_resp, status
 
-    sessions = query.order_by(WorkoutSession.date).all()
-    bodyweight = user.bodyweight
-    trend = []
-
-    for session in sessions:
-        max_1rm = None
-        for entry in session.entries:
-            if entry.type != "strength" or entry.exercise.lower() != exercise.lower():
-                continue
-            for s in entry.strength_entries:
-                reps = s.reps or DEFAULT_REPS
-                weight = s.weight if s.weight and s.weight > 0 else bodyweight
-                est_1rm = estimate_1rm(reps, weight, formula)
-                if est_1rm is not None:
-                    max_1rm = max(max_1rm or 0, est_1rm)
-        if max_1rm:
-            trend.append({
-                "session_id": session.id,
-                "date": session.date.isoformat(),
-                "estimated_1rm": round(max_1rm, 2)
-            })
+    session_ids, dates, max_1rms = session_max_1rm(load_strength_columns(query), user.bodyweight, formula)
+
+    trend = [
+        {
+            "session_id": session_id,
+            "date": str(date),
+            "estimated_1rm": round(max_1rm, 2)
+        }
+        for session_id, date, max_1rm in zip(session_ids.tolist(), dates, max_1rms.tolist())
+        if max_1rm == max_1rm and max_1rm  # skips NaN and 0
+    ]
 
     return jsonify(trend)
 
+@exercise_bp.route("/api/exercise-data/strength/rep-maxes/<string:exercise>")
+@jwt_required()
+def strength_rep_maxes(exercise):
+    user_id = get_jwt_identity()
+
+    exercise_id = lookup_exercise_id(exercise)
+    if exercise_id is None:
+        return jsonify({"exercise": exercise, "ladder": [], "estimated_1rm": {}})
+
+    # Maintained on write alongside PRs, so this never touches the sets themselves
+    return jsonify({"exercise": exercise, **get_rep_max_ladder(user_id, exercise_id)})
+
 @exercise_bp.route("/api/exercise-data/strength/volume-trend/<string:exercise>")
 @jwt_required()
 def strength_volume_trend(exercise):
@@ -96,35 +107,20 @@ def strength_volume_trend(exercise):
     if not user or not user.bodyweight:
         return jsonify({"error": "User bodyweight not available"}), 400
 
-    query = db.session.query(WorkoutSession).filter(
-        WorkoutSession.user_id == user_id
-    ).options(
-        joinedload(WorkoutSession.entries)
-        .joinedload(WorkoutEntry.strength_entries)
-    )
-
-    query, err_resp, status = apply_date_filters(query)
+    query, err_resp, status = apply_date_filters(strength_set_query(user_id, entry_exercise_filter(exercise)))
     if err_resp:
         return err_resp, status
 
-    sessions = query.order_by(WorkoutSession.date).all()
-    bodyweight = user.bodyweight
-    trend = []
-
-    for session in sessions:
-        total_volume = 0
-        for entry in session.entries:
-            if entry.type != "strength" or entry.exercise.lower() != exercise.lower():
-                continue
-            for s in entry.strength_entries:
-                reps = s.reps or DEFAULT_REPS
-                weight = s.weight if s.weight and s.weight > 0 else bodyweight
-                total_volume += reps * weight
-        if total_volume > 0:
-            trend.append({
-                "date": session.date.isoformat(),
-                "volume": round(total_volume, 2)
-            })
+    _, dates, volumes = session_volume(load_strength_columns(query), user.bodyweight)
+
+    trend = [
+        {
+            "date": str(date),
+            "volume": round(total_volume, 2)
+        }
+        for date, total_volume in zip(dates, volumes.tolist())
+        if total_volume > 0
+    ]
 
     return jsonify(trend)
 
@@ -138,73 +134,50 @@ def get_relative_intensity(exercise_name):
     if not user or not user.bodyweight:
         return jsonify({"error": "User bodyweight not available"}), 400
 
-    body_weight = user.bodyweight
-
-    # Base query
-    query = db.session.query(
-        StrengthEntry.reps,
-        StrengthEntry.weight,
-        StrengthEntry.set_number,
-        WorkoutSession.date
-    ).join(WorkoutEntry, StrengthEntry.entry_id == WorkoutEntry.id
-    ).join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id
-    ).filter(
-        WorkoutEntry.type == "strength",
-        WorkoutEntry.exercise.ilike(exercise_name),
-        WorkoutSession.user_id == user_id
-    )
-
-    # Apply date filters
-    query, err_resp, status = apply_date_filters(query)
+    query, err_resp, status = apply_date_filters(strength_set_query(user_id, entry_exercise_filter(exercise_name)))
     if err_resp:
         return err_resp, status
 
-    sets = query.order_by(WorkoutSession.date, StrengthEntry.set_number).all()
-
-    parsed_sets = []
-    all_1rms = []
-
-    # Step 1: Parse all sets and calculate per-set 1RMs
-    for reps, weight, set_number, date in sets:
-        reps = reps or DEFAULT_REPS
-        weight = weight if weight and weight > 0 else body_weight
-        est_1rm = estimate_1rm(reps, weight, formula=formula)
-        if est_1rm:
-            parsed_sets.append({
-                "set_number": set_number,
-                "reps": reps,
-                "weight": weight,
-                "date": date,
-                "estimated_1rm": est_1rm
-            })
-            all_1rms.append(est_1rm)
-
-    if not all_1rms:
+    # Step 1: Per-set 1RMs over the whole column at once
+    columns = load_strength_columns(query)
+    reps, weights = effective_sets(columns, user.bodyweight, DEFAULT_REPS)
+    estimates = estimate_1rm_array(reps, weights, formula)
+    keep = ~np.isnan(estimates) & (estimates > 0)
+    if not keep.any():
         return jsonify([])
 
-    # Step 2: Use the highest 1RM as the reference
-    reference_1rm = max(all_1rms)
+    # Step 2: Reference 1RM is the best estimate among the scored sets, computed from the same
+    # bodyweight-filled weights. Without a date range the stored all-time best is used when higher
+    # (it only covers loaded sets); with one, the range sets the reference as before.
+    reference_1rm = float(estimates[keep].max())
+    if not request.args.get("start_date") and not request.args.get("end_date"):
+        best = EstimatedOneRepMax.query.filter_by(
+            user_id=user_id,
+            exercise_id=lookup_exercise_id(exercise_name),
+            formula=formula if formula in ONE_RM_FORMULAS else "epley",
+        ).first()
+        if best:
+            reference_1rm = max(reference_1rm, best.value)
 
     # Step 3: Compute relative intensity and training zone
-    results = []
-    for s in parsed_sets:
-        relative_intensity = (s["weight"] / reference_1rm) * 100
-        if relative_intensity >= 85:
-            zone = "Strength"
-        elif 65 <= relative_intensity < 85:
-            zone = "Hypertrophy"
-        else:
-            zone = "Endurance"
-
-        results.append({
-            "set_number": s["set_number"],
-            "date": s["date"].isoformat(),
-            "weight": s["weight"],
-            "reps": s["reps"],
-            "estimated_1rm": round(s["estimated_1rm"], 1),
-            "relative_intensity": round(relative_intensity, 1),
+    intensities = weights[keep] / reference_1rm * 100
+    zones = np.select([intensities >= 85, intensities >= 65], ["Strength", "Hypertrophy"], "Endurance")
+
+    results = [
+        {
+            "set_number": int(set_number),
+            "date": str(date),
+            "weight": weight,
+            "reps": int(rep_count),
+            "estimated_1rm": round(estimate, 1),
+            "relative_intensity": round(intensity, 1),
             "zone": zone
-        })
+        }
+        for set_number, date, weight, rep_count, estimate, intensity, zone in zip(
+            columns["set_number"][keep].tolist(), columns["date"][keep], weights[keep].tolist(),
+            reps[keep].tolist(), estimates[keep].tolist(), intensities.tolist(), zones.tolist(),
+        )
+    ]
 
     return jsonify(results)
 
@@ -214,6 +187,8 @@ def suggest_next_set(exercise_name):
     user_id = get_jwt_identity()
     goal = request.args.get("goal", "increase 1RM slightly")
     formula = request.args.get("formula", "epley").lower()
+    if formula not in ONE_RM_FORMULAS:
+        formula = "epley"
 
     user = db.session.get(User, user_id)
     if not user:
@@ -229,7 +204,7 @@ def suggest_next_set(exercise_name):
     ).join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id
     ).filter(
         WorkoutEntry.type == "strength",
-        WorkoutEntry.exercise.ilike(exercise_name),
+        entry_exercise_filter(exercise_name),
         WorkoutSession.user_id == user_id
     )
 
@@ -255,11 +230,18 @@ def suggest_next_set(exercise_name):
             set_info["weight"] = weight  # only include weight if explicitly provided
         sets_details.append(set_info)
 
-    recommendation = recommend_followup_set(
-        exercise_name,
-        sets_details,
-        goal=goal,
-    )
+    try:
+        recommendation = cached_recommendation(
+            user_id, "strength", exercise_name, goal, sets_details,
+            lambda: recommend_followup_set(
+                exercise_name,
+                sets_details,
+                goal=goal,
+                formula=formula,
+            )
+        )
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
 
     return jsonify(recommendation)
 
@@ -284,7 +266,7 @@ def suggest_next_cardio_session(exercise_name):
     ).join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id
     ).filter(
         WorkoutEntry.type == "cardio",
-        WorkoutEntry.exercise.ilike(exercise_name),
+        entry_exercise_filter(exercise_name),
         WorkoutSession.user_id == user_id
     )
 
@@ -313,4 +295,10 @@ def suggest_next_cardio_session(exercise_name):
             "date": date.isoformat()
         })
 
-    return jsonify(recommend_followup_cardio(exercise_name, session_data, goal=goal))
+    try:
+        return jsonify(cached_recommendation(
+            user_id, "cardio", exercise_name, goal, session_data,
+            lambda: recommend_followup_cardio(exercise_name, session_data, goal=goal)
+        ))
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
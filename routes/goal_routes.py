@@ -1,14 +1,18 @@
 from flask import Blueprint, jsonify, request, render_template
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from models.goal import Goal, GoalTarget, GoalProgress, MetricEnum, GoalTypeEnum
+from models.goal import Goal, GoalTarget, GoalProgress, GoalPeriod, MetricEnum, GoalTypeEnum, GoalStatusEnum
 from init import db
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 
 from utils import serialize_goal, serialize_progress, serialize_target
+from utils.goal_utils import serialize_period
 
 goal_bp = Blueprint("goal", __name__)
 
+MAX_PROGRESS_ROWS = 500
+
 @goal_bp.route("/api/goals/dashboard")
 def goals_dashboard():
     return render_template("partials/goals.html")
@@ -22,12 +26,15 @@ def get_goals():
 
     goal_type = request.args.get("goal_type")
     exercise_type = request.args.get("exercise_type")
+    status = request.args.get("status")
     active_only = request.args.get("active") == "true"
 
     query = Goal.query.filter_by(user_id=user_id)
 
     if goal_type:
         query = query.filter(Goal.goal_type == GoalTypeEnum(goal_type))
+    if status:
+        query = query.filter(Goal.status == GoalStatusEnum(status))
     if exercise_type:
         query = query.filter(Goal.exercise_type == exercise_type)
     if active_only:
@@ -50,8 +57,30 @@ def get_goal_progress(goal_id):
     if metric:
         query = query.filter(GoalProgress.metric == MetricEnum(metric))
 
-    progress = query.order_by(GoalProgress.achieved_on.asc()).all()
-    return jsonify([serialize_progress(p) for p in progress])
+    # Most recent rows only; compaction keeps history short, this caps it between compaction runs
+    limit = min(request.args.get("limit", MAX_PROGRESS_ROWS, type=int), MAX_PROGRESS_ROWS)
+    progress = query.order_by(GoalProgress.achieved_on.desc(), GoalProgress.id.desc()).limit(limit).all()
+    return jsonify([serialize_progress(p) for p in reversed(progress)])
+
+
+# --- Get the Periods of a Recurring Goal (newest first) ---
+@goal_bp.route("/api/goals/<int:goal_id>/periods", methods=["GET"])
+@jwt_required()
+def get_goal_periods(goal_id):
+    user_id = get_jwt_identity()
+
+    goal = Goal.query.filter_by(id=goal_id, user_id=user_id).first()
+    if not goal:
+        return jsonify({"error": "Goal not found or unauthorized"}), 404
+
+    limit = request.args.get("limit", default=52, type=int)
+    periods = (
+        GoalPeriod.query.filter_by(goal_id=goal_id)
+        .order_by(GoalPeriod.period_start.desc())
+        .limit(max(1, min(limit, 520)))
+        .all()
+    )
+    return jsonify([serialize_period(p) for p in periods])
 
 
 # --- Get Goals + All Targets + Progress (Optionally Filtered by Exercise Name) ---
@@ -61,18 +90,15 @@ def get_goals_with_progress():
     user_id = get_jwt_identity()
     exercise_name = request.args.get("exercise")
 
-    # Fetch all goals for the user
-    goals = Goal.query.filter_by(user_id=user_id).all()
-    result = []
-
-    for g in goals:
-        # If filtering by exercise name, match against the goal's exercise_name
-        if exercise_name and g.exercise_name != exercise_name:
-            continue  # Skip goals not matching the exercise name
+    # Status and latest progress are columns on the goal; targets come in one batched query
+    query = Goal.query.filter_by(user_id=user_id).options(selectinload(Goal.targets))
+    if exercise_name:
+        query = query.filter(Goal.exercise_name == exercise_name)
 
+    result = []
+    for g in query.order_by(Goal.start_date.desc(), Goal.id.desc()).all():
         data = serialize_goal(g)
         data["targets"] = [serialize_target(t) for t in g.targets]
-        data["progress"] = [serialize_progress(p) for p in g.progress]
         result.append(data)
 
     return jsonify(result)
@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from utils.import_utils import read_import_items, import_workouts_for_user
+
+import_bp = Blueprint("import", __name__)
+
+
+@import_bp.route("/api/import-workouts", methods=["POST"])
+@jwt_required()
+def import_workouts():
+    user_id = int(get_jwt_identity())
+
+    try:
+        items = read_import_items(request)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    max_items = current_app.config.get("IMPORT_MAX_ITEMS", 1000)
+    if not items:
+        return jsonify({"success": False, "error": "No items provided."}), 400
+    if len(items) > max_items:
+        return jsonify({"success": False, "error": f"Too many items (max {max_items} per request)."}), 400
+
+    concurrency = request.args.get("concurrency", type=int)
+    report = import_workouts_for_user(user_id, items, concurrency=concurrency)
+
+    return jsonify(report), 201 if report["imported"] else 400
@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+
+from utils import metrics
+from utils.parse_cache import get_parse_cache_stats
+from utils.llm_resilience import get_llm_resilience_stats
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/api/metrics", methods=["GET"])
+@jwt_required()
+def get_metrics():
+    data = metrics.snapshot()
+    data["parse_cache"] = get_parse_cache_stats()
+    data["llm_breaker"] = get_llm_resilience_stats()
+    return jsonify(data)
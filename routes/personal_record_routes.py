@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 from collections import defaultdict
 
@@ -6,8 +7,10 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from models import PersonalRecord
 from init import db
+from utils.exercise_catalog import lookup_exercise_id
 
 personal_record_bp = Blueprint("personal_record_bp", __name__)
+logger = logging.getLogger(__name__)
 
 @personal_record_bp.route("/api/personal-records", methods=["GET"])
 @jwt_required()
@@ -40,7 +43,7 @@ def get_personal_records():
         }), 200
 
     except Exception as e:
-        print("Error fetching personal records:", e)
+        logger.exception("Error fetching personal records")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -58,9 +61,11 @@ def get_personal_records_by_exercise(exercise):
         if not exercise:
             return jsonify({"success": False, "error": "Exercise name is required."}), 400
 
+        exercise_id = lookup_exercise_id(exercise)
         query = db.session.query(PersonalRecord).filter(
             PersonalRecord.user_id == user_id,
-            PersonalRecord.exercise.ilike(exercise)
+            PersonalRecord.exercise_id == exercise_id if exercise_id is not None
+            else PersonalRecord.exercise.ilike(exercise)
         )
 
         if start_date_str:
@@ -105,7 +110,7 @@ def get_personal_records_by_exercise(exercise):
         }), 200
 
     except Exception as e:
-        print("Error fetching personal records by exercise:", e)
+        logger.exception("Error fetching personal records for %s", exercise)
         return jsonify({
             "success": False,
             "error": str(e)
@@ -1,11 +1,19 @@
-from datetime import datetime
+import base64
+from datetime import datetime, date, timedelta
 
 from flask import Blueprint, jsonify, render_template, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, load_only
 
-from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry, Goal, PersonalRecord
+from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry, Goal, GoalStatusEnum, PersonalRecord
 from init import db
+from utils.exercise_catalog import lookup_exercise_id
+from utils.recommendation_cache import invalidate_recommendations
+from utils.pr_utils import session_pr_keys, recompute_pr_chains, strength_exercise_ids
+from utils.rep_max_utils import rebuild_rep_maxes
+from utils.goal_utils import snapshot_goal_contributions, apply_goal_deltas, goal_status
+from utils.activity_utils import refresh_activity_days, activity_calendar, MAX_CALENDAR_DAYS
 
 session_bp = Blueprint('session', __name__)
 
@@ -15,21 +23,121 @@ def view_entries():
     return render_template("partials/sessions.html")
 
 
-# Endpoint to fetch all workout sessions for the user
+# Session listing fields; raw_text and notes are only read when asked for
+SESSION_FIELDS = {
+    "id": lambda s: s.id,
+    "date": lambda s: s.date,
+    "time": lambda s: s.time.strftime("%H:%M:%S") if s.time else None,
+    "parse_status": lambda s: s.parse_status.value if s.parse_status else None,
+    "raw_text": lambda s: s.raw_text,
+    "notes": lambda s: s.notes,
+}
+DEFAULT_SESSION_FIELDS = ("id", "date", "time", "parse_status")
+DEFAULT_SESSION_PAGE_SIZE = 50
+MAX_SESSION_PAGE_SIZE = 200
+
+
+def encode_session_cursor(session):
+    return base64.urlsafe_b64encode(f"{session.date.isoformat()}.{session.id}".encode()).decode()
+
+
+def decode_session_cursor(cursor):
+    """(date, id) of the last session on the previous page; raises ValueError on a malformed cursor."""
+    # binascii.Error and UnicodeDecodeError are ValueErrors too
+    day, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(".")
+    return datetime.strptime(day, "%Y-%m-%d").date(), int(session_id)
+
+
+# Endpoint to list the user's workout sessions, newest first, one keyset page at a time
 @session_bp.route('/api/sessions', methods=['GET'])
 @jwt_required()
 def get_all_sessions():
+    """
+    Query params: limit, cursor (next_cursor of the previous page), date or start/end (YYYY-MM-DD),
+    exercise, type (strength/cardio) and fields (comma separated, from SESSION_FIELDS).
+    Pages are served by the (user_id, date, id) index, so their cost does not grow with history.
+    """
     user_id = get_jwt_identity()
-    sessions = WorkoutSession.query.filter_by(user_id=user_id).all()
+    query = WorkoutSession.query.filter_by(user_id=user_id)
+
+    fields = request.args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_SESSION_FIELDS)
+    unknown = [f for f in fields if f not in SESSION_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    columns = {"id", "date"} | set(fields)
+    query = query.options(load_only(*[getattr(WorkoutSession, c) for c in sorted(columns)]))
+
+    limit = request.args.get("limit", DEFAULT_SESSION_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_SESSION_PAGE_SIZE))
+
+    # ?date=YYYY-MM-DD: only that day's sessions (the calendar asks per clicked day)
+    try:
+        day = request.args.get("date")
+        start = day or request.args.get("start")
+        end = day or request.args.get("end")
+        if start:
+            query = query.filter(WorkoutSession.date >= datetime.strptime(start, "%Y-%m-%d").date())
+        if end:
+            query = query.filter(WorkoutSession.date <= datetime.strptime(end, "%Y-%m-%d").date())
+    except ValueError:
+        return jsonify({'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+
+    entry_type = request.args.get("type")
+    if entry_type:
+        if entry_type not in ("strength", "cardio"):
+            return jsonify({'error': 'type must be strength or cardio'}), 400
+        query = query.filter(WorkoutSession.entries.any(WorkoutEntry.type == entry_type))
 
-    result = []
-    for session in sessions:
-        result.append({
-            'id': session.id,
-            'date': session.date,
-            'raw_text': session.raw_text
-        })
-    return jsonify(result)
+    exercise = request.args.get("exercise")
+    if exercise:
+        exercise_id = lookup_exercise_id(exercise)
+        if exercise_id is not None:
+            query = query.filter(WorkoutSession.entries.any(WorkoutEntry.exercise_id == exercise_id))
+        else:
+            query = query.filter(WorkoutSession.entries.any(WorkoutEntry.exercise == exercise))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            after_date, after_id = decode_session_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            WorkoutSession.date < after_date,
+            and_(WorkoutSession.date == after_date, WorkoutSession.id < after_id),
+        ))
+
+    # One extra row tells us whether another page exists
+    sessions = query.order_by(WorkoutSession.date.desc(), WorkoutSession.id.desc()).limit(limit + 1).all()
+    has_more = len(sessions) > limit
+    sessions = sessions[:limit]
+
+    return jsonify({
+        'sessions': [{f: SESSION_FIELDS[f](session) for f in fields} for session in sessions],
+        'next_cursor': encode_session_cursor(sessions[-1]) if has_more else None,
+    })
+
+
+# Active days and streaks for the calendar view, read from the activity bitmaps
+@session_bp.route('/api/activity/calendar', methods=['GET'])
+@jwt_required()
+def get_activity_calendar():
+    user_id = int(get_jwt_identity())
+    try:
+        end = datetime.strptime(request.args["end"], "%Y-%m-%d").date() if request.args.get("end") else date.today()
+        start = datetime.strptime(request.args["start"], "%Y-%m-%d").date() if request.args.get("start") else end - timedelta(days=41)
+    except ValueError:
+        return jsonify({'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+
+    if start > end:
+        return jsonify({'error': 'start must not be after end'}), 400
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        return jsonify({'error': f'Range must be under {MAX_CALENDAR_DAYS} days'}), 400
+
+    calendar = activity_calendar(user_id, start, end)
+    db.session.commit()  # keeps bitmaps built on first read
+    return jsonify(calendar)
 
 
 @session_bp.route('/api/session/<int:session_id>', methods=['GET'])
@@ -78,10 +186,11 @@ def get_session_details(session_id):
             "start_date": g.start_date.isoformat(),
             "end_date": g.end_date.isoformat() if g.end_date else None,
             "goal_type": g.goal_type.value,
+            "repeat_interval": g.repeat_interval.value if g.repeat_interval else None,
             "exercise_type": g.exercise_type.value if g.exercise_type else None,
             "exercise_name": g.exercise_name,
-            "is_complete": g.is_complete,
-            "is_expired": g.is_expired,
+            "is_complete": g.status == GoalStatusEnum.completed,
+            "is_expired": goal_status(g) == GoalStatusEnum.expired,
             "targets": [
                 {
                     "target_metric": t.metric.value,
@@ -112,9 +221,16 @@ def get_sessions_by_exercise():
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
 
-    # Base query for user's sessions
+    exercise_id = lookup_exercise_id(exercise)
+    if exercise_id is not None:
+        same_exercise = WorkoutEntry.exercise_id == exercise_id
+    else:
+        same_exercise = WorkoutEntry.exercise == exercise
+
+    # Base query for user's sessions that include the exercise
     query = db.session.query(WorkoutSession).filter(
-        WorkoutSession.user_id == user_id
+        WorkoutSession.user_id == user_id,
+        WorkoutSession.entries.any(same_exercise)
     ).options(
         joinedload(WorkoutSession.entries)
         .joinedload(WorkoutEntry.strength_entries),
@@ -148,7 +264,9 @@ def get_sessions_by_exercise():
         }
 
         for entry in session.entries:
-            if entry.exercise != exercise:
+            if exercise_id is not None and entry.exercise_id != exercise_id:
+                continue
+            if exercise_id is None and entry.exercise != exercise:
                 continue
 
             entry_data = {
@@ -191,8 +309,12 @@ def delete_session(session_id):
         return jsonify({"error": "Session not found"}), 404
 
     # Delete associated personal records (PRs) linked to this session
+    pr_keys = session_pr_keys(session.id)
     PersonalRecord.query.filter_by(session_id=session.id, user_id=user_id).delete()
 
+    invalidate_recommendations(user_id, [entry.exercise_id for entry in session.entries])
+    goal_contributions = snapshot_goal_contributions(user_id, session)
+
     # Delete associated workout entries and their children
     for entry in session.entries:
         if entry.type == "strength":
@@ -200,6 +322,14 @@ def delete_session(session_id):
         elif entry.type == "cardio":
             CardioEntry.query.filter_by(entry_id=entry.id).delete()
         db.session.delete(entry)
+    db.session.flush()
+
+    # Hand each record this session held back to the previous holder and re-check later sessions
+    recompute_pr_chains(user_id, pr_keys, session.date)
+    rebuild_rep_maxes(user_id, strength_exercise_ids(pr_keys))
+
+    # Take the session back out of the running totals of the goals it counted towards
+    apply_goal_deltas(user_id, session, goal_contributions, deleted=True)
 
     # Delete all goals associated with this session (and their progress/targets)
     goals = Goal.query.filter_by(session_id=session.id, user_id=user_id).all()
@@ -207,7 +337,12 @@ def delete_session(session_id):
         db.session.delete(goal)
 
     # Delete the session itself
+    session_date = session.date
     db.session.delete(session)
+    db.session.flush()
+
+    # The day stays active only if another session on it still has entries
+    refresh_activity_days(user_id, [session_date])
     db.session.commit()
 
     return jsonify({"message": f"Session {session_id} and all related data deleted successfully."}), 200
@@ -1,11 +1,14 @@
+import logging
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry, PersonalRecord
 from init import db
+from utils.logging_utils import debug_enabled
 
 summary_bp = Blueprint("summary", __name__)
+logger = logging.getLogger(__name__)
 
 @summary_bp.route("/api/summary/overview", methods=["GET"])
 @jwt_required()
@@ -107,14 +110,15 @@ def strength_summary():
     today = datetime.now().date()
     start_date = today - timedelta(days=days - 1)
 
-    print(f"User ID: {user_id}")
-    print(f"Start date: {start_date}")
-    print(
-        f"Workout sessions in range: {db.session.query(WorkoutSession).filter(WorkoutSession.user_id == user_id, WorkoutSession.date >= start_date).count()}")
-    print(
-        f"Workout entries: {db.session.query(WorkoutEntry).join(WorkoutSession).filter(WorkoutSession.user_id == user_id).count()}")
-    print(
-        f"Strength entries: {db.session.query(StrengthEntry).join(WorkoutEntry).join(WorkoutSession).filter(WorkoutSession.user_id == user_id, WorkoutSession.date >= start_date).count()}")
+    if debug_enabled(logger):
+        # Diagnostic counts only run when DEBUG is on for this module and the request is sampled
+        logger.debug(
+            "Strength summary for user %s since %s: %s sessions, %s entries, %s strength sets",
+            user_id, start_date,
+            db.session.query(WorkoutSession).filter(WorkoutSession.user_id == user_id, WorkoutSession.date >= start_date).count(),
+            db.session.query(WorkoutEntry).join(WorkoutSession).filter(WorkoutSession.user_id == user_id).count(),
+            db.session.query(StrengthEntry).join(WorkoutEntry).join(WorkoutSession).filter(WorkoutSession.user_id == user_id, WorkoutSession.date >= start_date).count(),
+        )
 
     results = (
         db.session.query(
@@ -136,7 +140,7 @@ def strength_summary():
         for row in results
     ]
 
-    print(summary)
+    logger.debug("Strength summary: %s", summary)
 
     return jsonify({
         "success": True,
@@ -62,7 +62,8 @@ def workout_trends(session_id):
                 .join(WorkoutEntry, WorkoutEntry.session_id == WorkoutSession.id)
                 .join(StrengthEntry, StrengthEntry.entry_id == WorkoutEntry.id)
                 .filter(
-                    WorkoutEntry.exercise == entry.exercise,
+                    (WorkoutEntry.exercise_id == entry.exercise_id) if entry.exercise_id
+                    else (WorkoutEntry.exercise == entry.exercise),
                     WorkoutEntry.type == 'strength',
                     WorkoutSession.user_id == user_id,
                     WorkoutSession.id != session_id
@@ -123,7 +124,8 @@ def workout_trends(session_id):
                     .join(WorkoutEntry, WorkoutEntry.session_id == WorkoutSession.id)
                     .join(CardioEntry, CardioEntry.entry_id == WorkoutEntry.id)
                     .filter(
-                        WorkoutEntry.exercise == entry.exercise,
+                        (WorkoutEntry.exercise_id == entry.exercise_id) if entry.exercise_id
+                        else (WorkoutEntry.exercise == entry.exercise),
                         WorkoutEntry.type == 'cardio',
                         WorkoutSession.user_id == user_id,
                         WorkoutSession.id != session_id
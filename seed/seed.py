@@ -5,6 +5,7 @@ from models import User, WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntr
 from werkzeug.security import generate_password_hash
 from dotenv import load_dotenv
 from flask import current_app
+from utils.exercise_catalog import reset_exercise_catalog, resolve_exercise
 
 # Load environment variables from .env file
 load_dotenv()
@@ -34,6 +35,7 @@ def seed_test_data():
         print("Dropping and creating the schema...")
         db.drop_all()
         db.create_all()
+        reset_exercise_catalog()
 
         print("Seeding test user...")
         test_user = User(
@@ -65,6 +67,7 @@ def seed_test_data():
                     session_id=session.id,
                     type=entry_data["type"],
                     exercise=entry_data["exercise"],
+                    exercise_id=resolve_exercise(entry_data["exercise"], entry_data["type"]),
                     notes=entry_data.get("notes")
                 )
                 db.session.add(entry)
@@ -3,11 +3,44 @@ import { renderSessionDetails } from './sessionRenderer.js';
 import { renderTrendCharts } from './renderTrendCharts.js';
 import { authFetch } from './auth/authFetch.js';
 import {renderGoalCard} from "./goalCard.js";
+import { postEventStream, describeStage } from './eventStream.js';
 
 let lastViewedSessionIds = [];
 let lastSessionDetails = [];
 let lastViewedGoals = [];
 
+const ACTIVITY_LABELS = { strength: 'Strength', cardio: 'Cardio' };
+
+function renderStreakSummary(activity) {
+  const summaryEl = document.getElementById('streak-summary');
+  if (!summaryEl) return;
+  summaryEl.textContent =
+    `🔥 Current streak: ${activity.current_streak} day${activity.current_streak === 1 ? '' : 's'}` +
+    ` · Longest: ${activity.longest_streak}` +
+    ` · Active this view: ${activity.days_active}`;
+}
+
+// {date: {pending}} for every day in [start, end) with a logged session, walking the session pages
+async function fetchSessionDays(start, end) {
+  const days = {};
+  const last = new Date(`${end}T00:00:00Z`);
+  last.setUTCDate(last.getUTCDate() - 1);
+  const params = new URLSearchParams({ start, end: last.toISOString().slice(0, 10), fields: 'id,date,parse_status', limit: 200 });
+
+  let cursor = null;
+  do {
+    if (cursor) params.set('cursor', cursor);
+    const page = await authFetch(`/api/sessions?${params}`).then(res => res.json());
+    for (const session of page.sessions) {
+      const date = new Date(session.date).toISOString().slice(0, 10);
+      const day = days[date] || (days[date] = { pending: true });
+      day.pending = day.pending && session.parse_status === 'pending';
+    }
+    cursor = page.next_cursor;
+  } while (cursor);
+  return days;
+}
+
 function showEditingWorkoutSummary() {
   console.log('[Modal] Showing loading workout summary modal...');
   const modalContent = `
@@ -16,7 +49,7 @@ function showEditingWorkoutSummary() {
         <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
         <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8v4a4 4 0 00-4 4H4z"></path>
       </svg>
-      <p class="text-gray-700 text-sm">Editing entry and re-generating session data...</p>
+      <p id="edit-progress-text" class="text-gray-700 text-sm">Editing entry and re-generating session data...</p>
     </div>
   `;
   openModal(modalContent, { title: 'Logging Workout...', size: 'xl' });
@@ -37,33 +70,33 @@ document.addEventListener('DOMContentLoaded', () => {
     },
     events: async function (fetchInfo, successCallback, failureCallback) {
       try {
-        const [sessionRes, goalsRes] = await Promise.all([
-          authFetch('/api/sessions'),
-          authFetch('/api/goals/with-progress')
+        // Every logged day gets an event, including notes-only and pending-parse sessions that are not
+        // training days; the activity bitmap only labels them and feeds the streak summary
+        const start = fetchInfo.startStr.slice(0, 10);
+        const end = fetchInfo.endStr.slice(0, 10);
+        const [activityRes, goalsRes, sessionDays] = await Promise.all([
+          authFetch(`/api/activity/calendar?start=${start}&end=${end}`),
+          authFetch('/api/goals/with-progress'),
+          fetchSessionDays(start, end)
         ]);
 
-        const [sessions, goals] = await Promise.all([
-          sessionRes.json(),
+        const [activity, goals] = await Promise.all([
+          activityRes.json(),
           goalsRes.json()
         ]);
 
-        // Group sessions by date
-        const sessionsByDate = {};
-        for (const session of sessions) {
-          const dateStr = new Date(session.date).toISOString().split('T')[0]; // force ISO string
-          if (!sessionsByDate[dateStr]) {
-            sessionsByDate[dateStr] = [];
-          }
-          sessionsByDate[dateStr].push(session.id);
-        }
+        renderStreakSummary(activity);
 
-        const sessionEvents = Object.entries(sessionsByDate).map(([date, sessionIds]) => ({
-          title: sessionIds.length === 1 ? 'View Log' : 'View Logs',
-          start: date,
-          allDay: true,
-          extendedProps: { sessionIds },
-          color: '#3b82f6'
-        }));
+        const sessionEvents = Object.entries(sessionDays).map(([date, { pending }]) => {
+          const types = (activity.days || {})[date] || [];
+          return {
+            title: types.length ? types.map(t => ACTIVITY_LABELS[t] || t).join(' + ') : (pending ? 'Pending Log' : 'View Log'),
+            start: date,
+            allDay: true,
+            extendedProps: { activityDate: date },
+            color: pending ? '#9ca3af' : '#3b82f6'
+          };
+        });
 
         // Group goals by end date
         const goalsByDate = {};
@@ -93,15 +126,17 @@ document.addEventListener('DOMContentLoaded', () => {
     },
 
     eventClick: async function (info) {
-      const sessionIds = info.event.extendedProps.sessionIds;
+      const activityDate = info.event.extendedProps.activityDate;
       const clickedGoals = info.event.extendedProps.goals;
 
 
       // Handle workout session modal
-      if (sessionIds) {
-        lastViewedSessionIds = sessionIds;
-
+      if (activityDate) {
         try {
+          const { sessions } = await authFetch(`/api/sessions?date=${activityDate}&fields=id&limit=200`).then(res => res.json());
+          const sessionIds = sessions.map(s => s.id);
+          lastViewedSessionIds = sessionIds;
+
           lastSessionDetails = await Promise.all(
             sessionIds.map(id =>
               authFetch(`/api/session/${id}`).then(res => res.json())
@@ -287,16 +322,14 @@ document.addEventListener('click', async (e) => {
     showEditingWorkoutSummary();
 
     try {
-      const res = await authFetch(`/api/edit-workout/${sessionId}`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ raw_text: newText })
+      const finalEvent = await postEventStream(`/api/edit-workout/${sessionId}/stream`, { raw_text: newText }, (name, data) => {
+        const message = describeStage(name, data);
+        const progressText = document.getElementById('edit-progress-text');
+        if (message && progressText) progressText.textContent = message;
       });
 
-      const data = await res.json();
-
-      if (!res.ok) {
-        const errorMsg = data?.error || 'Failed to update workout.';
+      if (finalEvent?.name !== 'done') {
+        const errorMsg = finalEvent?.data?.error || 'Failed to update workout.';
         throw new Error(errorMsg);
       }
 
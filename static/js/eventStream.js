@@ -0,0 +1,72 @@
+import { authFetch } from './auth/authFetch.js';
+
+function parseEvent(raw) {
+  let name = 'message';
+  const dataLines = [];
+
+  for (const line of raw.split('\n')) {
+    if (line.startsWith('event:')) name = line.slice(6).trim();
+    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+  }
+
+  if (!dataLines.length) return null;
+  return { name, data: JSON.parse(dataLines.join('\n')) };
+}
+
+// POSTs JSON to a Server-Sent Events endpoint and calls onEvent(name, data) as each event arrives.
+// Resolves with the final "done" or "error" event.
+export async function postEventStream(url, body, onEvent) {
+  const response = await authFetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(body)
+  });
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let finalEvent = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const event = parseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      if (!event) continue;
+
+      onEvent?.(event.name, event.data);
+      if (event.name === 'done' || event.name === 'error') finalEvent = event;
+    }
+  }
+
+  return finalEvent;
+}
+
+export function describeStage(name, data) {
+  switch (name) {
+    case 'parse_progress':
+      return `Reading your entry... (${data.characters} characters parsed)`;
+    case 'parsed':
+      if (data.parse_status === 'pending') {
+        return `Parsing is delayed; saving your entry as written${data.entries.length ? ` with ${data.entries.length} recognized exercise(s)` : ''}`;
+      }
+      return `Found ${data.entries.length} exercise(s)${data.goals?.length ? ` and ${data.goals.length} goal(s)` : ''}`;
+    case 'session':
+      return `Saved session for ${data.session_date}`;
+    case 'prs':
+      return data.new_prs.length
+        ? `🎉 ${data.new_prs.length} new personal record(s): ${data.new_prs.map(pr => `${pr.exercise} ${pr.field} ${pr.value} ${pr.units}`).join(', ')}`
+        : 'No new personal records';
+    case 'goals':
+      return `${data.goals_added} new goal(s) logged`;
+    case 'goal_evaluation':
+      return data.progress.length ? `Updated progress on ${data.progress.length} goal target(s)` : 'Goals checked';
+    default:
+      return null;
+  }
+}
@@ -1,3 +1,9 @@
+const GOAL_TYPE_LABELS = {
+  single_session: 'Single Session Goal',
+  aggregate: 'Aggregate Goal',
+  streak: 'Streak Goal',
+};
+
 export function renderGoalCard(goal, options = {}) {
   const { showDelete = false } = options;
 
@@ -23,7 +29,7 @@ export function renderGoalCard(goal, options = {}) {
           <h2 class="text-xl font-semibold mb-1">${goal.name}</h2>
           <p class="text-sm text-gray-500 mb-1">
             ${goal.exercise_name || goal.exercise_type} • 
-            <span class="italic text-xs">${goal.goal_type === 'single_session' ? 'Single Session Goal' : 'Aggregate Goal'}</span>
+            <span class="italic text-xs">${GOAL_TYPE_LABELS[goal.goal_type] || 'Goal'}</span>
           </p>
           ${renderAllProgress(goal)}
           <p class="text-xs text-gray-400 mt-2">
@@ -42,17 +48,12 @@ function renderAllProgress(goal) {
   const targetsByMetric = {};
   goal.targets.forEach(t => targetsByMetric[t.metric] = t.value);
 
-  const progressByMetric = {};
-  goal.progress.forEach(p => {
-    const m = p.metric;
-    if (!progressByMetric[m] || p.value_achieved > progressByMetric[m].total) {
-      progressByMetric[m] = { total: p.value_achieved };
-    }
-  });
+  // Latest recorded value per metric, kept on the goal by evaluation
+  const latestProgress = goal.latest_progress || {};
 
   let html = "";
   for (const metric in targetsByMetric) {
-    const { total = 0 } = progressByMetric[metric] || {};
+    const total = latestProgress[metric] ?? 0;
     const target = targetsByMetric[metric];
 
     const useCheckbox = goal.goal_type === "single_session" || metric === "pace" || metric === "weight";
@@ -1,6 +1,7 @@
 import { openModal, setupModalTriggers } from './modal.js';
 import { renderTrendCharts } from './renderTrendCharts.js';
 import { authFetch } from './auth/authFetch.js';
+import { postEventStream, describeStage } from './eventStream.js';
 
 function showLoadingWorkoutSummary() {
   console.log('[Modal] Showing loading workout summary modal...');
@@ -10,12 +11,31 @@ function showLoadingWorkoutSummary() {
         <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
         <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8v4a4 4 0 00-4 4H4z"></path>
       </svg>
-      <p class="text-gray-700 text-sm">Creating entry and generating session data...</p>
+      <p id="log-progress-text" class="text-gray-700 text-sm">Creating entry and generating session data...</p>
+      <ul id="log-progress-stages" class="text-left text-sm text-gray-600 space-y-1 max-w-md mx-auto"></ul>
     </div>
   `;
   openModal(modalContent, { title: 'Logging Workout...', size: 'xl' });
 }
 
+function showLogStage(name, data) {
+  const message = describeStage(name, data);
+  if (!message) return;
+
+  if (name === 'parse_progress') {
+    const progressText = document.getElementById('log-progress-text');
+    if (progressText) progressText.textContent = message;
+    return;
+  }
+
+  const stages = document.getElementById('log-progress-stages');
+  if (stages) {
+    const item = document.createElement('li');
+    item.textContent = `✓ ${message}`;
+    stages.appendChild(item);
+  }
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   console.log('[Init] DOM fully loaded, setting up modal triggers...');
   setupModalTriggers();
@@ -39,23 +59,18 @@ document.addEventListener('DOMContentLoaded', () => {
     showLoadingWorkoutSummary();
 
     try {
-      console.log('[API] Sending POST to /api/log-workout...');
-    const timeZone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+      console.log('[API] Streaming POST to /api/log-workout/stream...');
+      const timeZone = Intl.DateTimeFormat().resolvedOptions().timeZone;
 
-    const response = await authFetch('/api/log-workout', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
+      const finalEvent = await postEventStream('/api/log-workout/stream', {
         entry: entryText,
         timezone: timeZone  // e.g., "America/Los_Angeles"
-      })
-    });
-
+      }, showLogStage);
 
-      const result = await response.json();
-      console.log('[API] Received response from /api/log-workout:', result);
+      const result = finalEvent?.data || { success: false, error: 'No response from server' };
+      console.log('[API] Received final event from /api/log-workout/stream:', result);
 
-      if (response.ok && result.success) {
+      if (finalEvent?.name === 'done' && result.success) {
         document.getElementById('entryText').value = '';
         console.log('[Workout] Entry logged successfully.');
 
@@ -3,6 +3,7 @@ import { renderRmChart } from "./charts/strength/strengthRmChart.js";
 import { renderVolumeChart } from "./charts/strength/strengthVolumeChart.js";
 import { renderIntensityChart } from "./charts/strength/strengthIntensityChart.js";
 import { renderSessionTable } from "./tables/sessionTable.js";
+import { renderRepMaxTable } from "./tables/repMaxTable.js";
 import { renderStrengthDetailedSessionsChart } from "./charts/strength/strengthDetailedSessionsChart.js";
 import { renderStrengthPrChart } from "./charts/strength/renderStrengthPrChart.js";
 import { renderAiInsights, showLoadingAiInsights } from "./charts/strength/strengthAiInsights.js";
@@ -104,6 +105,7 @@ select.addEventListener("change", async () => {
       document.getElementById("latestPrHighlight").textContent = "Error loading PR data.";
     }
 
+    await renderRepMaxTable(exercise);
     await renderSessionTable(exercise, startDate, endDate);
     await renderStrengthDetailedSessionsChart(exercise, startDate, endDate);
 
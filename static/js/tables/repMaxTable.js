@@ -0,0 +1,73 @@
+import {authFetch} from "../auth/authFetch.js";
+
+const repMaxContainer = document.getElementById("repMaxContainer");
+
+const FORMULA_LABELS = {
+  epley: "Epley",
+  brzycki: "Brzycki",
+  lombardi: "Lombardi",
+  mayhew: "Mayhew",
+  oconner: "O'Conner",
+};
+
+
+export async function renderRepMaxTable(exercise) {
+  try {
+    const res = await authFetch(`/api/exercise-data/strength/rep-maxes/${encodeURIComponent(exercise)}`);
+    const data = await res.json();
+
+    if (!Array.isArray(data.ladder)) {
+      repMaxContainer.innerHTML = `<p class="text-red-600">Failed to load rep maxes.</p>`;
+      return;
+    }
+
+    if (data.ladder.length === 0) {
+      repMaxContainer.innerHTML = `<div class="text-gray-500 italic text-center">No weighted sets logged yet.</div>`;
+      return;
+    }
+
+    let ladderHtml = `
+      <table class="min-w-full divide-y divide-gray-200 text-sm text-left">
+        <thead class="bg-gray-50">
+          <tr>
+            <th class="px-4 py-2">Rep Max</th>
+            <th class="px-4 py-2">Weight</th>
+            <th class="px-4 py-2">Set</th>
+            <th class="px-4 py-2">Date</th>
+          </tr>
+        </thead>
+        <tbody class="bg-white divide-y divide-gray-100">
+    `;
+
+    for (const rung of data.ladder) {
+      ladderHtml += `
+        <tr>
+          <td class="px-4 py-2 font-medium">${rung.reps}RM</td>
+          <td class="px-4 py-2">${rung.weight} lbs</td>
+          <td class="px-4 py-2">${rung.set_reps} reps</td>
+          <td class="px-4 py-2">${new Date(rung.datetime).toLocaleDateString()}</td>
+        </tr>
+      `;
+    }
+    ladderHtml += `</tbody></table>`;
+
+    const estimates = Object.values(data.estimated_1rm)
+      .map(e => `
+        <div class="bg-gray-50 p-3 rounded-lg border border-gray-100">
+          <div class="text-xs text-gray-500">${FORMULA_LABELS[e.formula] || e.formula}</div>
+          <div class="text-lg font-semibold text-gray-800">${e.value} lbs</div>
+          <div class="text-xs text-gray-500">from ${e.reps} reps @ ${e.weight} lbs</div>
+        </div>
+      `)
+      .join("");
+
+    repMaxContainer.innerHTML = `
+      <div class="overflow-x-auto mb-4">${ladderHtml}</div>
+      <h3 class="text-lg font-medium text-gray-700 mb-2">Best Estimated 1RM</h3>
+      <div class="grid grid-cols-2 md:grid-cols-5 gap-3">${estimates}</div>
+    `;
+  } catch (err) {
+    console.error("[renderRepMaxTable] Failed:", err);
+    repMaxContainer.innerHTML = `<p class="text-red-600">Failed to load rep maxes.</p>`;
+  }
+}
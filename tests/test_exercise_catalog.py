@@ -0,0 +1,27 @@
+from utils.exercise_catalog import ExerciseMatcher
+
+
+def make_matcher(*names):
+    matcher = ExerciseMatcher()
+    for exercise_id, name in enumerate(names, start=1):
+        matcher.add(name, exercise_id, name)
+    matcher.loaded = True
+    return matcher
+
+
+def test_plural_resolves_to_the_same_exercise():
+    matcher = make_matcher("squat", "pull-up")
+    assert matcher.match("squats") == (1, "variant")
+    assert matcher.match("pull-ups") == (2, "variant")
+
+
+def test_close_spellings_of_different_lifts_are_not_merged():
+    matcher = make_matcher("back squat", "decline dumbbell press")
+    assert matcher.match("hack squat") == (None, None)
+    assert matcher.match("incline dumbbell press") == (None, None)
+
+
+def test_close_spellings_are_offered_as_suggestions():
+    matcher = make_matcher("back squat", "bench press")
+    assert "back squat" in matcher.suggest("hack squat")
+    assert matcher.suggest("ben") == ["bench press"]
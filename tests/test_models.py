@@ -0,0 +1,69 @@
+import sqlite3
+
+from sqlalchemy import inspect
+
+from config import BaseConfig
+from init import create_app, db
+import models
+
+
+class ModelTestConfig(BaseConfig):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SECRET_KEY = "test"
+    JWT_SECRET_KEY = "test"
+    INGEST_WORKERS = 0
+
+
+def test_models_import_and_create_tables():
+    app = create_app(ModelTestConfig)
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        assert {m.__tablename__ for m in db.Model.__subclasses__()} <= tables
+        assert {"pr_bests", "rep_maxes", "estimated_one_rep_maxes"} <= tables
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_pr_best_updated_at_defaults_to_now():
+    column = models.PRBest.__table__.c.updated_at
+    assert column.default is not None and column.onupdate is not None
+
+
+def test_rep_max_updated_at_defaults_to_now():
+    for model in (models.RepMax, models.EstimatedOneRepMax):
+        column = model.__table__.c.updated_at
+        assert column.default is not None and column.onupdate is not None
+
+
+def test_existing_database_gains_new_columns(tmp_path):
+    # Shape of the tables before exercise ids, parse status and goal status existed
+    path = tmp_path / "legacy.db"
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(120) NOT NULL UNIQUE, display_name VARCHAR(80),
+                            password_hash VARCHAR(512) NOT NULL, bodyweight FLOAT, height FLOAT);
+        CREATE TABLE workout_session (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, date DATE NOT NULL, time TIME,
+                                      raw_text TEXT NOT NULL, notes TEXT);
+        CREATE TABLE workout_entry (id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL, type VARCHAR NOT NULL,
+                                    exercise VARCHAR NOT NULL, notes TEXT);
+        CREATE TABLE goals (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, session_id INTEGER, name VARCHAR NOT NULL,
+                            description TEXT, start_date DATE NOT NULL, end_date DATE, goal_type VARCHAR(14) NOT NULL,
+                            exercise_type VARCHAR(8), exercise_name VARCHAR, created_at DATETIME, updated_at DATETIME);
+        INSERT INTO users (id, email, password_hash) VALUES (1, 'legacy@example.com', 'x');
+        INSERT INTO workout_session (id, user_id, date, raw_text) VALUES (1, 1, '2024-01-01', 'squat 5x5');
+        INSERT INTO goals (id, user_id, name, start_date, goal_type) VALUES (1, 1, 'Squat', '2024-01-01', 'aggregate');
+    """)
+    connection.close()
+
+    class LegacyConfig(ModelTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(LegacyConfig)
+    with app.app_context():
+        columns = {c["name"] for c in inspect(db.engine).get_columns("goals")}
+        assert {"status", "fingerprint", "repeat_interval", "latest_progress"} <= columns
+        assert models.Goal.query.one().status == models.GoalStatusEnum.active
+        assert models.WorkoutSession.query.one().parse_status == models.ParseStatusEnum.parsed
+        assert models.WorkoutEntry.query.filter(models.WorkoutEntry.exercise_id == None).count() == 0
+        db.session.remove()
+        db.engine.dispose()
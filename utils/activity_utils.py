@@ -0,0 +1,181 @@
+from datetime import date, timedelta
+
+from init import db
+from models import ActivityBitmap, WorkoutSession, WorkoutEntry
+
+# Streaks and "days active" are answered from per-user bitmaps instead of scanning sessions.
+# A day is active for a type when a session on that day has an entry of that type; "any"
+# marks days with at least one entry of any type, so goal-only or notes-only logs are not
+# training days. Bitmaps are built from history the first time they are read.
+ACTIVITY_TYPES = ("strength", "cardio")
+ANY_ACTIVITY = "any"
+
+# Longest range the calendar endpoint serves in one call
+MAX_CALENDAR_DAYS = 400
+
+
+def bits_of(bitmap):
+    return int.from_bytes(bitmap.bits or b"", "little")
+
+
+def store_bits(bitmap, value):
+    bitmap.bits = value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+def active_days_by_type(user_id, days=None):
+    """{exercise type: set of active days}, optionally only looking at `days`."""
+    query = (
+        db.session.query(WorkoutSession.date, WorkoutEntry.type)
+        .join(WorkoutEntry, WorkoutEntry.session_id == WorkoutSession.id)
+        .filter(WorkoutSession.user_id == user_id)
+        .distinct()
+    )
+    if days is not None:
+        query = query.filter(WorkoutSession.date.in_(days))
+
+    active = {activity_type: set() for activity_type in (*ACTIVITY_TYPES, ANY_ACTIVITY)}
+    for day, entry_type in query.all():
+        if entry_type in active:
+            active[entry_type].add(day)
+        active[ANY_ACTIVITY].add(day)
+    return active
+
+
+def rebuild_activity_bitmaps(user_id):
+    """Rebuilds all of a user's bitmaps from their sessions. Does not commit."""
+    ActivityBitmap.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+    bitmaps = {}
+    for activity_type, days in active_days_by_type(user_id).items():
+        origin = min(days) if days else date.today()
+        value = 0
+        for day in days:
+            value |= 1 << (day - origin).days
+        bitmap = ActivityBitmap(user_id=user_id, exercise_type=activity_type, origin=origin)
+        store_bits(bitmap, value)
+        db.session.add(bitmap)
+        bitmaps[activity_type] = bitmap
+    return bitmaps
+
+
+def load_activity_bitmaps(user_id, for_update=False):
+    """
+    {exercise type: ActivityBitmap}, built from history if the user has none yet. With for_update
+    the rows are locked until commit so concurrent writers cannot overwrite each other's bits.
+    """
+    query = ActivityBitmap.query.filter_by(user_id=user_id)
+    if for_update:
+        query = query.with_for_update().populate_existing()
+    bitmaps = {b.exercise_type: b for b in query.all()}
+    if len(bitmaps) < len(ACTIVITY_TYPES) + 1:
+        bitmaps = rebuild_activity_bitmaps(user_id)
+    return bitmaps
+
+
+def set_day(bitmap, day, active):
+    value = bits_of(bitmap)
+    index = (day - bitmap.origin).days
+    if index < 0:
+        if not active:
+            return
+        value <<= -index
+        bitmap.origin = day
+        index = 0
+    value = value | (1 << index) if active else value & ~(1 << index)
+    store_bits(bitmap, value)
+
+
+def refresh_activity_days(user_id, days):
+    """
+    Re-derives the bits of `days` from the sessions stored on them, so inserts, edits (old and
+    new date) and deletes all go through here once the change is flushed. Does not commit; the
+    bitmap rows stay locked until the caller does, since the bits are read and rewritten in Python.
+    """
+    days = {day for day in days if day}
+    if not days:
+        return
+    bitmaps = load_activity_bitmaps(user_id, for_update=True)
+    active = active_days_by_type(user_id, days)
+    for activity_type, bitmap in bitmaps.items():
+        for day in days:
+            set_day(bitmap, day, day in active[activity_type])
+
+
+# -----------------------------
+# Bit Queries
+# -----------------------------
+
+def window_bits(bitmap, start, end):
+    """(bits, length) of days start..end inclusive, bit 0 being `start`."""
+    length = (end - start).days + 1
+    if length <= 0:
+        return 0, 0
+    value = bits_of(bitmap)
+    offset = (start - bitmap.origin).days
+    value = value >> offset if offset >= 0 else value << -offset
+    return value & ((1 << length) - 1), length
+
+
+def days_active(bitmap, start, end):
+    value, _ = window_bits(bitmap, start, end)
+    return bin(value).count("1")
+
+
+def longest_streak(bitmap, start, end):
+    """Longest run of consecutive active days inside start..end: each x & (x >> 1) shortens every run by one."""
+    value, _ = window_bits(bitmap, start, end)
+    length = 0
+    while value:
+        value &= value >> 1
+        length += 1
+    return length
+
+
+def current_streak(bitmap, day):
+    """Consecutive active days ending on `day`, or on the day before while `day` has nothing logged yet."""
+    if day < bitmap.origin:
+        return 0
+    value, length = window_bits(bitmap, bitmap.origin, day)
+    if not value >> (length - 1) & 1:
+        value, length = value & ((1 << (length - 1)) - 1), length - 1
+    gaps = ~value & ((1 << length) - 1)
+    return length - gaps.bit_length()
+
+
+def active_dates(bitmap, start, end):
+    """Active days inside start..end, in order."""
+    value, _ = window_bits(bitmap, start, end)
+    days = []
+    while value:
+        lowest = value & -value
+        days.append(start + timedelta(days=lowest.bit_length() - 1))
+        value ^= lowest
+    return days
+
+
+def activity_type_for_goal(goal):
+    exercise_type = goal.exercise_type.value if goal.exercise_type else None
+    return exercise_type if exercise_type in ACTIVITY_TYPES else ANY_ACTIVITY
+
+
+def activity_calendar(user_id, start, end, today=None):
+    """Per-day activity types between start and end plus streak stats, as served to the calendar view."""
+    today = today or date.today()
+    bitmaps = load_activity_bitmaps(user_id)
+
+    days = {}
+    for activity_type in (*ACTIVITY_TYPES, ANY_ACTIVITY):
+        for day in active_dates(bitmaps[activity_type], start, end):
+            types = days.setdefault(day.isoformat(), [])
+            if activity_type != ANY_ACTIVITY:
+                types.append(activity_type)
+
+    overall = bitmaps[ANY_ACTIVITY]
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": days,
+        "days_active": days_active(overall, start, end),
+        "current_streak": current_streak(overall, today),
+        "longest_streak": longest_streak(overall, overall.origin, today),
+    }
@@ -0,0 +1,210 @@
+import numpy as np
+from sqlalchemy import and_, or_
+
+from init import db
+from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry
+from utils.exercise_data_utils import ONE_RM_FORMULAS
+
+# Sets and cardio rows are pulled with one query each into parallel arrays ordered by
+# (date, session, entry, set), so goal checks and trend endpoints reduce arrays instead of
+# walking WorkoutSession -> WorkoutEntry -> StrengthEntry object graphs.
+STRENGTH_COLUMNS = ("session_id", "entry_id", "date", "exercise_id", "set_number", "reps", "weight")
+CARDIO_COLUMNS = ("session_id", "entry_id", "date", "exercise_id", "distance", "duration", "pace")
+
+_DTYPES = {
+    "session_id": np.int64,
+    "entry_id": np.int64,
+    "date": "datetime64[D]",
+    "exercise_id": np.float64,  # NaN for entries not linked to the catalog
+    "set_number": np.float64,
+    "reps": np.float64,
+    "weight": np.float64,
+    "distance": np.float64,
+    "duration": np.float64,
+    "pace": np.float64,
+}
+
+
+def goal_exercise_filter(exercise_id, exercise_name):
+    """Same matching rule as goal_utils.get_entries_from_session, as a SQL filter."""
+    if exercise_id:
+        return or_(
+            WorkoutEntry.exercise_id == exercise_id,
+            and_(WorkoutEntry.exercise_id == None, WorkoutEntry.exercise == exercise_name),
+        )
+    if exercise_name:
+        return WorkoutEntry.exercise == exercise_name
+    return None
+
+
+def _base_query(columns, table, user_id, exercise_filter, session_id, start_date, end_date):
+    query = (
+        db.session.query(*columns)
+        .select_from(table)
+        .join(WorkoutEntry, table.entry_id == WorkoutEntry.id)
+        .join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id)
+        .filter(WorkoutSession.user_id == user_id)
+    )
+    if exercise_filter is not None:
+        query = query.filter(exercise_filter)
+    if session_id is not None:
+        query = query.filter(WorkoutSession.id == session_id)
+    if start_date is not None:
+        query = query.filter(WorkoutSession.date >= start_date)
+    if end_date is not None:
+        query = query.filter(WorkoutSession.date <= end_date)
+    return query
+
+
+def strength_set_query(user_id, exercise_filter=None, session_id=None, start_date=None, end_date=None):
+    """One row per strength set, in STRENGTH_COLUMNS order. Extra filters can be chained before loading."""
+    return _base_query(
+        (
+            WorkoutSession.id, WorkoutEntry.id, WorkoutSession.date, WorkoutEntry.exercise_id,
+            StrengthEntry.set_number, StrengthEntry.reps, StrengthEntry.weight,
+        ),
+        StrengthEntry, user_id, exercise_filter, session_id, start_date, end_date,
+    ).filter(WorkoutEntry.type == "strength")
+
+
+def cardio_query(user_id, exercise_filter=None, session_id=None, start_date=None, end_date=None):
+    """One row per cardio entry, in CARDIO_COLUMNS order."""
+    return _base_query(
+        (
+            WorkoutSession.id, WorkoutEntry.id, WorkoutSession.date, WorkoutEntry.exercise_id,
+            CardioEntry.distance, CardioEntry.duration, CardioEntry.pace,
+        ),
+        CardioEntry, user_id, exercise_filter, session_id, start_date, end_date,
+    ).filter(WorkoutEntry.type == "cardio")
+
+
+def load_columns(query, names):
+    """Runs the query once and returns {column: ndarray}; None becomes NaN in float columns."""
+    rows = query.all()
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    return {name: np.array(column, dtype=_DTYPES[name]) for name, column in zip(names, values)}
+
+
+def empty_columns(names):
+    return {name: np.array([], dtype=_DTYPES[name]) for name in names}
+
+
+def load_strength_columns(query):
+    ordered = query.order_by(WorkoutSession.date, WorkoutSession.id, WorkoutEntry.id, StrengthEntry.set_number)
+    return load_columns(ordered, STRENGTH_COLUMNS)
+
+
+def load_cardio_columns(query):
+    ordered = query.order_by(WorkoutSession.date, WorkoutSession.id, WorkoutEntry.id)
+    return load_columns(ordered, CARDIO_COLUMNS)
+
+
+# -----------------------------
+# Kernels
+# -----------------------------
+
+def group_starts(keys):
+    """Start index of each run of equal keys; keys must already be grouped (rows are ordered by session)."""
+    if not len(keys):
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def per_session(columns, values, ufunc):
+    """(session_ids, dates, ufunc.reduceat per session) over rows grouped by session."""
+    starts = group_starts(columns["session_id"])
+    if not len(starts):
+        return columns["session_id"][:0], columns["date"][:0], values[:0]
+    return columns["session_id"][starts], columns["date"][starts], ufunc.reduceat(values, starts)
+
+
+def split_by_session(columns):
+    """[(session_id, date, columns of that session's rows)] over rows grouped by session, in row order."""
+    starts = group_starts(columns["session_id"])
+    ends = np.r_[starts[1:], len(columns["session_id"])].astype(np.int64)
+    return [
+        (int(columns["session_id"][start]), columns["date"][start].astype(object),
+         {name: values[start:end] for name, values in columns.items()})
+        for start, end in zip(starts, ends)
+    ]
+
+
+def strength_mask(columns, min_weight=None):
+    """Sets that count towards a goal: all of them, or those at or above min_weight."""
+    if min_weight is None:
+        return np.ones(len(columns["weight"]), dtype=bool)
+    return columns["weight"] >= min_weight  # NaN compares False
+
+
+def cardio_mask(columns, max_pace=None, pace_tolerance=0.01):
+    """Cardio entries that count towards a goal: all of them, or those with a pace within max_pace."""
+    if max_pace is None:
+        return np.ones(len(columns["pace"]), dtype=bool)
+    return columns["pace"] <= max_pace + pace_tolerance  # NaN compares False
+
+
+def _last(values):
+    return float(values[-1]) if len(values) else 0
+
+
+def metric_total(strength, cardio, metric, strength_keep=None, cardio_keep=None):
+    """
+    Columnar equivalent of summing a goal metric over entries: reps, sets, distance and duration
+    add up; weight and pace take the last value in (date, session, entry, set) order.
+    """
+    strength_keep = strength_mask(strength) if strength_keep is None else strength_keep
+    cardio_keep = cardio_mask(cardio) if cardio_keep is None else cardio_keep
+
+    if metric == "reps":
+        return float(np.nansum(strength["reps"][strength_keep]))
+    if metric == "sets":
+        return int(np.count_nonzero(strength_keep))
+    if metric == "weight":
+        return _last(strength["weight"][strength_keep])
+    if metric in ("distance", "duration"):
+        return float(np.nansum(cardio[metric][cardio_keep]))
+    if metric == "pace":
+        return _last(np.nan_to_num(cardio["pace"][cardio_keep]))
+    return 0
+
+
+def estimate_1rm_array(reps, weight, formula="epley"):
+    """Vectorized estimate_1rm: NaN wherever the scalar version returns None."""
+    formula = formula.lower()
+    if formula not in ONE_RM_FORMULAS:
+        formula = "epley"
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if formula == "epley":
+            estimate = weight * (1 + reps / 30)
+        elif formula == "brzycki":
+            estimate = np.where(reps < 37, weight * (36 / (37 - reps)), np.nan)
+        elif formula == "lombardi":
+            estimate = weight * (reps ** 0.10)
+        elif formula == "mayhew":
+            estimate = (100 * weight) / (52.2 + 41.9 * (2.71828 ** (-0.055 * reps)))
+        else:
+            estimate = weight * (1 + 0.025 * reps)
+
+    return np.where((reps > 0) & (weight > 0), estimate, np.nan)
+
+
+def effective_sets(columns, bodyweight, default_reps=1):
+    """Reps and weight as the trend endpoints read them: missing reps count as default_reps, unloaded sets as bodyweight."""
+    reps = columns["reps"]
+    weight = columns["weight"]
+    reps = np.where(np.isnan(reps) | (reps == 0), default_reps, reps)
+    weight = np.where(np.isnan(weight) | (weight <= 0), bodyweight, weight)
+    return reps, weight
+
+
+def session_max_1rm(columns, bodyweight, formula="epley"):
+    """Best estimated 1RM per session as (session_ids, dates, values), sessions in date order."""
+    reps, weight = effective_sets(columns, bodyweight)
+    return per_session(columns, estimate_1rm_array(reps, weight, formula), np.fmax)
+
+
+def session_volume(columns, bodyweight):
+    """Total reps x weight per session as (session_ids, dates, volumes), sessions in date order."""
+    reps, weight = effective_sets(columns, bodyweight)
+    return per_session(columns, reps * weight, np.add)
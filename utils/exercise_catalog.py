@@ -0,0 +1,252 @@
+import difflib
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from init import db
+from models import Exercise, ExerciseAlias
+from utils.local_parser import normalize_exercise_name
+
+# Names are only merged automatically on an exact or singular/plural match ("squats" -> "squat").
+# Close spellings are offered as suggestions instead: "hack squat" vs "back squat" or "incline" vs
+# "decline" dumbbell press score as close as real typos but are different lifts.
+SUGGEST_CUTOFF = 0.8
+
+
+def plural_variants(key):
+    """Singular/plural spellings of key that are treated as the same exercise."""
+    return [v for v in (key + "s", key + "es", key[:-1] if key.endswith("s") else None) if v]
+
+
+class ExerciseMatcher:
+    """In-process alias index over the exercises catalog: exact and singular/plural lookups, a prefix trie and close-spelling suggestions."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.alias_to_id = {}
+        self.id_to_name = {}
+        self.trie = {}
+        self.loaded = False
+
+    def load(self):
+        with self.lock:
+            self.alias_to_id.clear()
+            self.id_to_name.clear()
+            self.trie.clear()
+
+            for exercise_id, name in db.session.query(Exercise.id, Exercise.name).all():
+                self.add(name, exercise_id, name)
+            for alias, exercise_id in db.session.query(ExerciseAlias.alias, ExerciseAlias.exercise_id).all():
+                self.add(alias, exercise_id)
+
+            self.loaded = True
+
+    def add(self, alias, exercise_id, name=None):
+        with self.lock:
+            self.alias_to_id[alias] = exercise_id
+            if name:
+                self.id_to_name[exercise_id] = name
+
+            node = self.trie
+            for char in alias:
+                node = node.setdefault(char, {})
+            node["$"] = exercise_id
+
+    def match(self, key):
+        """Returns (exercise_id, how) where how is "exact" or "variant"; (None, None) if unknown."""
+        with self.lock:
+            if key in self.alias_to_id:
+                return self.alias_to_id[key], "exact"
+
+            for variant in plural_variants(key):
+                if variant in self.alias_to_id:
+                    return self.alias_to_id[variant], "variant"
+
+        return None, None
+
+    def close_matches(self, name, limit=5):
+        """Canonical names spelled close to name, for the user to confirm; never resolved automatically."""
+        key = normalize_exercise_name(name) if name.strip() else ""
+        with self.lock:
+            close = difflib.get_close_matches(key, self.alias_to_id.keys(), n=limit * 2, cutoff=SUGGEST_CUTOFF)
+            found = []
+            for alias in close:
+                exercise_name = self.id_to_name.get(self.alias_to_id[alias])
+                if exercise_name and exercise_name not in found:
+                    found.append(exercise_name)
+        return found[:limit]
+
+    def suggest(self, prefix, limit=10):
+        """Canonical names of exercises with an alias starting with prefix, else ones spelled close to it."""
+        prefix = normalize_exercise_name(prefix) if prefix.strip() else ""
+        with self.lock:
+            node = self.trie
+            for char in prefix:
+                node = node.get(char)
+                if node is None:
+                    return self.close_matches(prefix, limit)
+
+            found = []
+            stack = [node]
+            while stack and len(found) < limit:
+                current = stack.pop()
+                if "$" in current and self.id_to_name.get(current["$"]) not in found:
+                    found.append(self.id_to_name.get(current["$"]))
+                stack.extend(child for char, child in current.items() if char != "$")
+
+        return [name for name in found if name]
+
+
+_matcher = ExerciseMatcher()
+
+
+def get_matcher():
+    if not _matcher.loaded:
+        _matcher.load()
+    return _matcher
+
+
+def load_exercise_catalog():
+    _matcher.load()
+
+
+def reset_exercise_catalog():
+    with _matcher.lock:
+        _matcher.loaded = False
+
+
+def get_exercise_name(exercise_id):
+    if exercise_id is None:
+        return None
+    name = get_matcher().id_to_name.get(exercise_id)
+    if name is None:
+        exercise = db.session.get(Exercise, exercise_id)
+        if exercise:
+            _matcher.add(exercise.name, exercise.id, exercise.name)
+            name = exercise.name
+    return name
+
+
+def remember_alias(key, exercise_id):
+    try:
+        with db.session.begin_nested():
+            db.session.add(ExerciseAlias(alias=key, exercise_id=exercise_id))
+    except IntegrityError:
+        pass
+    _matcher.add(key, exercise_id)
+
+
+def lookup_exercise_id(name):
+    """Read-path resolution: maps a user-supplied name to a catalog id without creating anything."""
+    key = normalize_exercise_name(name or "")
+    if not key:
+        return None
+
+    exercise_id, _ = get_matcher().match(key)
+    if exercise_id is None:
+        # Another process may have added it since this one loaded the catalog
+        exercise = Exercise.query.filter_by(name=key).first()
+        alias = None if exercise else ExerciseAlias.query.filter_by(alias=key).first()
+        exercise_id = exercise.id if exercise else (alias.exercise_id if alias else None)
+        if exercise:
+            _matcher.add(key, exercise.id, exercise.name)
+        elif alias:
+            _matcher.add(key, alias.exercise_id)
+    return exercise_id
+
+
+def resolve_exercise(name, exercise_type=None, create=True):
+    """Write-path resolution: returns the catalog id for name, creating the exercise if it is new."""
+    key = normalize_exercise_name(name or "")
+    if not key:
+        return None
+
+    exercise_id, how = get_matcher().match(key)
+    if exercise_id is not None:
+        if how != "exact":
+            remember_alias(key, exercise_id)
+        return exercise_id
+
+    exercise_id = lookup_exercise_id(key)
+    if exercise_id is not None or not create:
+        return exercise_id
+
+    try:
+        with db.session.begin_nested():
+            exercise = Exercise(name=key, type=exercise_type)
+            db.session.add(exercise)
+    except IntegrityError:
+        exercise = Exercise.query.filter_by(name=key).first()
+
+    _matcher.add(key, exercise.id, exercise.name)
+    return exercise.id
+
+
+def backfill_exercise_ids():
+    """Resolves exercise_id for legacy rows that only carry an exercise name. Returns rows updated per table."""
+    from models import WorkoutEntry, PersonalRecord, Goal
+
+    updated = {}
+    for model, name_column, type_column in (
+        (WorkoutEntry, WorkoutEntry.exercise, WorkoutEntry.type),
+        (PersonalRecord, PersonalRecord.exercise, PersonalRecord.type),
+        (Goal, Goal.exercise_name, None),
+    ):
+        columns = [name_column] + ([type_column] if type_column is not None else [])
+        pending = db.session.query(*columns).filter(model.exercise_id == None, name_column != None).distinct().all()
+
+        count = 0
+        for row in pending:
+            exercise_id = resolve_exercise(row[0], row[1] if len(row) > 1 else None)
+            count += model.query.filter(model.exercise_id == None, name_column == row[0]).update(
+                {model.exercise_id: exercise_id}, synchronize_session=False
+            )
+        updated[model.__tablename__] = count
+
+    db.session.commit()
+    return updated
+
+
+def prune_merged_aliases(dry_run=False):
+    """
+    Removes aliases that are not a singular/plural spelling of their exercise's name (left behind by
+    fuzzy matching, which merged lifts like "hack squat" into "back squat"), and relinks rows logged
+    under those names to their own exercise. Returns [(alias, exercise name)] of the pruned aliases.
+    """
+    from models import WorkoutEntry, PersonalRecord, Goal
+
+    rows = db.session.query(ExerciseAlias, Exercise.name).join(Exercise, Exercise.id == ExerciseAlias.exercise_id).all()
+    merged = [(alias, name) for alias, name in rows if alias.alias not in plural_variants(name)]
+    if dry_run or not merged:
+        return [(alias.alias, name) for alias, name in merged]
+
+    for alias, _ in merged:
+        db.session.delete(alias)
+    db.session.flush()
+    load_exercise_catalog()
+
+    for alias, _ in merged:
+        for model, name_column, type_column in (
+            (WorkoutEntry, WorkoutEntry.exercise, WorkoutEntry.type),
+            (PersonalRecord, PersonalRecord.exercise, PersonalRecord.type),
+            (Goal, Goal.exercise_name, None),
+        ):
+            stale = model.query.filter(model.exercise_id == alias.exercise_id, name_column == alias.alias)
+            first = stale.first()
+            if first is None:
+                continue
+            exercise_id = resolve_exercise(alias.alias, getattr(first, type_column.key) if type_column is not None else None)
+            stale.update({model.exercise_id: exercise_id}, synchronize_session=False)
+
+    db.session.commit()
+    return [(alias.alias, name) for alias, name in merged]
+
+
+def entry_exercise_filter(name):
+    """SQL filter matching WorkoutEntry rows for name; falls back to a name match if it isn't in the catalog."""
+    from models import WorkoutEntry
+
+    exercise_id = lookup_exercise_id(name)
+    if exercise_id is None:
+        return WorkoutEntry.exercise.ilike(name)
+    return WorkoutEntry.exercise_id == exercise_id
@@ -4,6 +4,8 @@ from flask import request, jsonify
 
 from models import WorkoutSession
 
+ONE_RM_FORMULAS = ("epley", "brzycki", "lombardi", "mayhew", "oconner")
+
 
 def estimate_1rm(reps, weight, formula="epley"):
     if reps <= 0 or weight <= 0:
@@ -14,7 +16,8 @@ def estimate_1rm(reps, weight, formula="epley"):
     if formula == "epley":
         return weight * (1 + reps / 30)
     elif formula == "brzycki":
-        return weight * (36 / (37 - reps))
+        # Undefined from 37 reps on
+        return weight * (36 / (37 - reps)) if reps < 37 else None
     elif formula == "lombardi":
         return weight * (reps ** 0.10)
     elif formula == "mayhew":
@@ -0,0 +1,78 @@
+import logging
+import threading
+from datetime import date
+
+from init import db
+from utils.goal_utils import sweep_expired_goals, close_goal_periods, compact_goal_progress
+from utils.logging_utils import bind_context, clear_context
+
+logger = logging.getLogger(__name__)
+
+# Goal expiry is a column now, so something has to flip it when end dates pass. One thread in the
+# worker process (`flask ingest-worker`, or app.py's dev server) runs the bulk UPDATEs; they only
+# touch rows that still need changing, so several workers sweeping at once is harmless.
+_stop_sweeper = threading.Event()
+_sweeper_threads = []
+
+
+def sweep_goals(today=None):
+    """One pass: expires ended goals and closes ended recurring periods. Returns (expired, closed)."""
+    today = today or date.today()
+    expired = sweep_expired_goals(today)
+    closed = close_goal_periods(today)
+    if expired or closed:
+        logger.info("Goal sweep expired %s goal(s) and closed %s period(s)", expired, closed)
+    return expired, closed
+
+
+def compact_progress(app, today=None):
+    """Compacts goal progress history with the configured checkpoint and retention windows."""
+    deleted = compact_goal_progress(
+        today=today,
+        daily_days=app.config.get("GOAL_PROGRESS_DAILY_DAYS", 30),
+        retention_days=app.config.get("GOAL_PROGRESS_RETENTION_DAYS", 90),
+    )
+    if deleted:
+        logger.info("Goal progress compaction removed %s row(s)", deleted)
+    return deleted
+
+
+def run_goal_sweeper(app, stop_event=None):
+    """Sweeper loop: sweeps every GOAL_SWEEP_INTERVAL_SECONDS and compacts progress once a day, until stop_event is set."""
+    stop_event = stop_event or _stop_sweeper
+    interval = app.config.get("GOAL_SWEEP_INTERVAL_SECONDS", 3600)
+    last_compacted = None
+
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                bind_context("goal-sweep")
+                sweep_goals()
+                if last_compacted != date.today():
+                    compact_progress(app)
+                    last_compacted = date.today()
+            except Exception:
+                logger.exception("Goal sweeper error")
+                db.session.rollback()
+            finally:
+                clear_context()
+                db.session.remove()
+        stop_event.wait(interval)
+
+
+def start_goal_sweeper(app):
+    """Starts the sweeper thread unless GOAL_SWEEP_INTERVAL_SECONDS is 0. Returns the started thread or None."""
+    if app.config.get("GOAL_SWEEP_INTERVAL_SECONDS", 0) <= 0:
+        return None
+    thread = threading.Thread(target=run_goal_sweeper, args=(app,), name="goal-sweeper", daemon=True)
+    thread.start()
+    _sweeper_threads.append(thread)
+    return thread
+
+
+def stop_goal_sweeper(timeout=None):
+    _stop_sweeper.set()
+    for thread in _sweeper_threads:
+        thread.join(timeout)
+    _sweeper_threads.clear()
+    _stop_sweeper.clear()
@@ -1,47 +1,96 @@
-from datetime import datetime, date
-
-from sqlalchemy import desc
-
-from models import Goal, GoalProgress, MetricEnum, GoalTypeEnum
+import hashlib
+import json
+import logging
+from collections import namedtuple
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import desc, and_, or_, func, distinct
+from sqlalchemy.orm import selectinload
+
+from models import (
+    Goal, GoalProgress, GoalAccumulator, GoalPeriod, MetricEnum, GoalTypeEnum, GoalStatusEnum, ExerciseTypeEnum, RepeatIntervalEnum,
+)
 from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry
 from init import db
+from utils.columnar import (
+    STRENGTH_COLUMNS, CARDIO_COLUMNS, empty_columns, goal_exercise_filter, strength_set_query, cardio_query,
+    load_strength_columns, load_cardio_columns, strength_mask, cardio_mask, metric_total, split_by_session,
+)
+from utils.logging_utils import debug_enabled
+from utils.activity_utils import load_activity_bitmaps, activity_type_for_goal, longest_streak
+
+logger = logging.getLogger(__name__)
+
+# Id and date of a session whose rows were already loaded as columns; enough for single-session checks
+SessionRef = namedtuple("SessionRef", "id date")
+
+# Metrics whose aggregate total is a plain sum over sessions, so it can be kept as a running total
+ADDITIVE_METRICS = {MetricEnum.reps, MetricEnum.sets, MetricEnum.distance, MetricEnum.duration, MetricEnum.sessions}
 
 # -----------------------------
 # Utility Functions
 # -----------------------------
 
-def get_entries_from_session(session, exercise_type, exercise_name=None):
+def get_entries_from_session(session, exercise_type, exercise_name=None, exercise_id=None):
     entries = []
     for entry in session.entries:
         if exercise_type and entry.type != exercise_type:
             continue
-        if exercise_name and entry.exercise != exercise_name:
+        if exercise_id and entry.exercise_id:
+            if entry.exercise_id != exercise_id:
+                continue
+        elif exercise_name and entry.exercise != exercise_name:
             continue
         entries.append(entry)
     return entries
 
 
-def extract_metric_from_entries(entries, metric):
-    total = 0
-    for entry in entries:
-        if entry.type == 'strength':
-            for set_data in entry.strength_entries:
-                if metric == MetricEnum.reps:
-                    total += set_data.reps
-                elif metric == MetricEnum.sets:
-                    total += 1
-                elif metric == MetricEnum.weight:
-                    total = set_data.weight
-        elif entry.type == 'cardio':
-            cardio = entry.cardio_detail
-            if cardio:
-                if metric == MetricEnum.distance:
-                    total += cardio.distance or 0
-                elif metric == MetricEnum.duration:
-                    total += cardio.duration or 0
-                elif metric == MetricEnum.pace:
-                    total = cardio.pace or 0
-    return total
+def goal_fingerprint(user_id, start_date, end_date, goal_type, repeat_interval, exercise_type, exercise_name, targets):
+    """
+    sha256 of a goal's canonical definition: owner, type, exercise and sorted (metric, value) targets,
+    plus its dates unless it recurs (restating a recurring goal matches the running series).
+    """
+    def value_of(member):
+        return member.value if hasattr(member, "value") else member
+
+    definition = {
+        "user_id": int(user_id),
+        "goal_type": value_of(goal_type),
+        "repeat_interval": value_of(repeat_interval),
+        "exercise_type": value_of(exercise_type),
+        "exercise_name": (exercise_name or "").strip().lower() or None,
+        "targets": sorted([value_of(metric), float(value)] for metric, value in targets),
+    }
+    if not repeat_interval:
+        definition["start_date"] = start_date.isoformat() if start_date else None
+        definition["end_date"] = end_date.isoformat() if end_date else None
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_of(goal):
+    return goal_fingerprint(
+        goal.user_id, goal.start_date, goal.end_date, goal.goal_type, goal.repeat_interval,
+        goal.exercise_type, goal.exercise_name, [(t.metric, t.value) for t in goal.targets],
+    )
+
+
+def backfill_goal_fingerprints(batch_size=500):
+    """Sets the fingerprint of goals stored before it existed. Returns how many were updated."""
+    updated = 0
+    while True:
+        goals = (
+            Goal.query.filter(Goal.fingerprint == None)
+            .options(selectinload(Goal.targets))
+            .order_by(Goal.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not goals:
+            return updated
+        for goal in goals:
+            goal.fingerprint = fingerprint_of(goal)
+        db.session.commit()
+        updated += len(goals)
 
 
 def to_date(d):
@@ -54,75 +103,67 @@ def to_date(d):
     raise ValueError(f"Unsupported date format: {d} (type: {type(d)})")
 
 
-def filter_sessions_by_type_and_date(sessions, exercise_type, start_date, end_date):
-    start_date = to_date(start_date)
-    end_date = to_date(end_date)
-
-    return [
-        s for s in sessions
-        if start_date <= to_date(s.date) <= end_date and (
-            exercise_type == 'general' or any(e.type == exercise_type for e in s.entries)
+def load_goal_columns(goal, session_id=None, start_date=None, end_date=None):
+    """The goal's sets and cardio rows as NumPy columns; only the goal's exercise type is queried."""
+    exercise_filter = goal_exercise_filter(goal.exercise_id, goal.exercise_name)
+    exercise_type = goal.exercise_type.value
+
+    strength = empty_columns(STRENGTH_COLUMNS)
+    cardio = empty_columns(CARDIO_COLUMNS)
+    if exercise_type == 'strength':
+        strength = load_strength_columns(strength_set_query(goal.user_id, exercise_filter, session_id, start_date, end_date))
+    elif exercise_type == 'cardio':
+        cardio = load_cardio_columns(cardio_query(goal.user_id, exercise_filter, session_id, start_date, end_date))
+    return strength, cardio
+
+
+def goal_condition_masks(goal, strength, cardio):
+    """Rows that satisfy the goal's weight floor and pace ceiling, if it has them."""
+    min_weight = next((t.value for t in goal.targets if t.metric == MetricEnum.weight), None)
+    max_pace = next((t.value for t in goal.targets if t.metric == MetricEnum.pace), None)
+    strength_keep = strength_mask(strength, min_weight)
+    cardio_keep = cardio_mask(cardio, max_pace)
+    if debug_enabled(logger):
+        logger.debug(
+            "%d sets and %d cardio entries meet min_weight=%s, max_pace=%s",
+            int(strength_keep.sum()), int(cardio_keep.sum()), min_weight, max_pace,
         )
-    ]
+    return strength_keep, cardio_keep
 
 
-def filter_entries_by_exercise(entries, exercise_type, exercise_name):
-    return [
-        e for e in entries
-        if e.type == exercise_type and (exercise_name is None or e.exercise_name == exercise_name)
-    ]
-
-
-def entries_meet_conditions(entries, targets, pace_tolerance=0.01):
-    min_weight = next((t.value for t in targets if t.metric == MetricEnum.weight), None)
-    max_pace = next((t.value for t in targets if t.metric == MetricEnum.pace), None)
-
-    print(f"[DEBUG] Checking {len(entries)} entries with min_weight={min_weight}, max_pace={max_pace}")
-
-    filtered_entries = []
-    for entry in entries:
-        if entry.type == 'strength':
-            valid_sets = []
-            for s in entry.strength_entries:
-                if min_weight is None or s.weight >= min_weight:
-                    valid_sets.append(s)
-                    print(f"[DEBUG] Strength set accepted: weight={s.weight} (min required: {min_weight})")
-                else:
-                    print(f"[DEBUG] Strength set rejected: weight={s.weight} < min required {min_weight}")
-            if valid_sets:
-                entry.strength_entries = valid_sets
-                filtered_entries.append(entry)
-                print(f"[INFO] Strength entry accepted with {len(valid_sets)} valid sets")
-            else:
-                print(f"[INFO] Strength entry rejected (no valid sets)")
-
-
-        elif entry.type == 'cardio' and entry.cardio_detail:
-            pace = entry.cardio_detail.pace
-            if max_pace is None:
-                filtered_entries.append(entry)
-                print(f"[INFO] Cardio entry accepted (no max pace defined)")
-            elif pace is not None and pace <= max_pace + pace_tolerance:
-                filtered_entries.append(entry)
-                print(
-                    f"[INFO] Cardio entry accepted: pace={pace:.2f} <= max pace {max_pace:.2f} (+ tolerance {pace_tolerance})")
-            else:
-                if pace is None:
-                    print(
-                        f"[INFO] Cardio entry rejected: pace is None (max pace {max_pace}, tolerance {pace_tolerance})")
-                else:
-                    print(
-                        f"[INFO] Cardio entry rejected: pace={pace:.2f} > max pace {max_pace:.2f} (+ tolerance {pace_tolerance})")
-
-    print(f"[RESULT] Total entries accepted: {len(filtered_entries)}")
-    return filtered_entries
+def count_goal_sessions(goal, start_date, end_date):
+    """Sessions in the window, or only those with an entry of the goal's type unless it is general."""
+    query = db.session.query(func.count(distinct(WorkoutSession.id))).filter(
+        WorkoutSession.user_id == goal.user_id,
+        WorkoutSession.date >= start_date,
+        WorkoutSession.date <= end_date,
+    )
+    if goal.exercise_type.value != 'general':
+        query = query.join(WorkoutEntry, WorkoutEntry.session_id == WorkoutSession.id).filter(
+            WorkoutEntry.type == goal.exercise_type.value
+        )
+    return query.scalar() or 0
 
 
 # -----------------------------
 # Evaluation Functions
 # -----------------------------
 
-def progress_has_changed(goal_id: int, metric: MetricEnum, new_value: float) -> bool:
+def record_progress(goal: Goal, progress: GoalProgress):
+    """Adds a progress row and keeps the goal's latest_progress and status in step with it. Does not commit."""
+    db.session.add(progress)
+
+    latest = json.loads(goal.latest_progress) if goal.latest_progress else {}
+    latest[MetricEnum(progress.metric).value] = progress.value_achieved
+    goal.latest_progress = json.dumps(latest)
+
+    # Same rule as the is_complete hybrid: any completed target completes a one-off goal
+    if progress.is_complete and not goal.repeat_interval and goal.status != GoalStatusEnum.completed:
+        goal.status = GoalStatusEnum.completed
+        goal.completed_at = datetime.utcnow()
+
+def progress_has_changed(goal_id: int, metric: MetricEnum, new_value: float, window=None) -> bool:
+    """Whether new_value differs from the latest recorded progress; recurring goals only compare within `window`."""
     from sqlalchemy import and_, desc
 
     if isinstance(metric, str):
@@ -131,62 +172,58 @@ def progress_has_changed(goal_id: int, metric: MetricEnum, new_value: float) ->
         except ValueError:
             raise ValueError(f"Invalid metric string: {metric}")
 
-    print(f"\n[progress_has_changed] START — goal_id={goal_id}, metric={metric.name}, new_value={new_value}")
-
     query = GoalProgress.query.filter(
         and_(
             GoalProgress.goal_id == goal_id,
             GoalProgress.metric == metric.value
         )
     ).order_by(desc(GoalProgress.achieved_on), desc(GoalProgress.id))
-
-    print(f"[progress_has_changed] Query: goal_id={goal_id}, metric={metric.value}")
+    if window is not None:
+        query = query.filter(GoalProgress.achieved_on >= window[0], GoalProgress.achieved_on <= window[1])
 
     previous_progress = query.first()
 
     if not previous_progress:
-        print("[progress_has_changed] No previous progress found. Returning True.")
+        logger.debug("Goal %s has no %s progress yet", goal_id, metric.value)
         return True
 
-    print(f"[progress_has_changed] Fetched GoalProgress row:")
-    print(f"  ID: {previous_progress.id}")
-    print(f"  Goal ID: {previous_progress.goal_id}")
-    print(f"  Metric: {previous_progress.metric}")
-    print(f"  Achieved On: {previous_progress.achieved_on}")
-    print(f"  Value Achieved: {previous_progress.value_achieved} (type={type(previous_progress.value_achieved)})")
-
     has_changed = previous_progress.value_achieved != new_value
-    print(f"[progress_has_changed] Value changed? {has_changed} (prev={previous_progress.value_achieved}, new={new_value})")
-
-    print(f"[progress_has_changed] END\n")
+    logger.debug(
+        "Goal %s %s progress changed=%s (progress %s on %s: %s -> %s)",
+        goal_id, metric.value, has_changed, previous_progress.id, previous_progress.achieved_on,
+        previous_progress.value_achieved, new_value,
+    )
     return has_changed
 
 
 
 
-def evaluate_single_session_goal(goal: Goal, session: WorkoutSession):
+def evaluate_single_session_goal(goal: Goal, session: WorkoutSession, window=None, columns=None):
+    """
+    Records progress if `session` meets every target inside the goal's window; returns whether it did.
+    `columns` are the session's (strength, cardio) rows when the caller already loaded them.
+    """
     session_date = to_date(session.date)
-    goal_end_date = to_date(goal.end_date or datetime.utcnow().date())
-    print(f"[DEBUG] Evaluating goal {goal.id} for session {session.id} on {session_date}")
+    window_start, window_end = window or goal_window(goal)
+    logger.debug("Evaluating goal %s for session %s on %s", goal.id, session.id, session_date)
 
-    if not (to_date(goal.start_date) <= session_date <= goal_end_date):
-        print(f"[INFO] Session date {session_date} is outside goal date range {goal.start_date} to {goal_end_date}")
-        return
+    if not (window_start <= session_date <= window_end):
+        logger.debug("Session date %s is outside goal date range %s to %s", session_date, window_start, window_end)
+        return False
 
-    entries = get_entries_from_session(session, goal.exercise_type.value, goal.exercise_name)
-    if not entries:
-        print(f"[INFO] No matching entries found in session {session.id} for goal exercise {goal.exercise_name}")
-        return
+    strength, cardio = columns or load_goal_columns(goal, session_id=session.id)
+    if not len(strength["session_id"]) and not len(cardio["session_id"]):
+        logger.debug("No matching entries found in session %s for goal exercise %s", session.id, goal.exercise_name)
+        return False
 
-    filtered_entries = entries_meet_conditions(entries, goal.targets)
-    print(f"[DEBUG] {len(filtered_entries)} entries remained after filtering for goal conditions")
+    strength_keep, cardio_keep = goal_condition_masks(goal, strength, cardio)
 
     all_targets_met = True
     progress_entries = []
 
     for target in goal.targets:
-        value = extract_metric_from_entries(filtered_entries, target.metric)
-        print(f"[DEBUG] Target check: metric={target.metric}, required={target.value}, achieved={value}")
+        value = metric_total(strength, cardio, target.metric.value, strength_keep, cardio_keep)
+        logger.debug("Target check: metric=%s, required=%s, achieved=%s", target.metric.value, target.value, value)
 
         if target.metric == MetricEnum.pace:
             condition_met = value <= target.value
@@ -194,7 +231,7 @@ def evaluate_single_session_goal(goal: Goal, session: WorkoutSession):
             condition_met = value >= target.value
 
         if condition_met:
-            if progress_has_changed(goal.id, target.metric, value):
+            if progress_has_changed(goal.id, target.metric, value, window if goal.repeat_interval else None):
                 progress_entries.append(GoalProgress(
                     goal_id=goal.id,
                     session_id=session.id,
@@ -204,32 +241,30 @@ def evaluate_single_session_goal(goal: Goal, session: WorkoutSession):
                     is_complete=True
                 ))
             else:
-                print(f"[INFO] No change in progress for {target.metric}, skipping entry.")
+                logger.debug("No change in progress for %s, skipping entry", target.metric.value)
         else:
-            print(f"[INFO] Target not met: {target.metric} required {target.value}, got {value}")
+            logger.debug("Target not met: %s required %s, got %s", target.metric.value, target.value, value)
             all_targets_met = False
             break
 
     if all_targets_met:
-        print(f"[SUCCESS] All targets met for goal {goal.id} in session {session.id}")
+        logger.info("All targets met for goal %s in session %s", goal.id, session.id)
         for p in progress_entries:
-            db.session.add(p)
+            record_progress(goal, p)
     else:
-        print(f"[INFO] Goal {goal.id} not completed in session {session.id}")
-
+        logger.debug("Goal %s not completed in session %s", goal.id, session.id)
+    return all_targets_met
 
-def evaluate_aggregate_goal(goal: Goal, sessions: list[WorkoutSession]):
-    relevant_sessions = filter_sessions_by_type_and_date(
-        sessions, goal.exercise_type.value, goal.start_date, goal.end_date or datetime.utcnow().date()
-    )
 
-    all_entries = []
-    for s in relevant_sessions:
-        session_entries = get_entries_from_session(s, goal.exercise_type.value, goal.exercise_name)
-        all_entries.extend(entries_meet_conditions(session_entries, goal.targets))
+def evaluate_aggregate_goal(goal: Goal, sessions: list[WorkoutSession], window=None):
+    """Records each target's total over the goal's window when it changed; returns whether all targets are met."""
+    window = window or goal_window(goal)
+    strength, cardio = load_goal_columns(goal, start_date=window[0], end_date=window[1])
+    strength_keep, cardio_keep = goal_condition_masks(goal, strength, cardio)
 
+    all_targets_met = True
     for target in goal.targets:
-        total = extract_metric_from_entries(all_entries, target.metric)
+        total = metric_total(strength, cardio, target.metric.value, strength_keep, cardio_keep)
 
         if target.metric == MetricEnum.pace:
             # Guard against invalid or missing pace values
@@ -239,48 +274,633 @@ def evaluate_aggregate_goal(goal: Goal, sessions: list[WorkoutSession]):
                 is_complete = False
         else:
             is_complete = total >= target.value
+        all_targets_met = all_targets_met and is_complete
 
-        if progress_has_changed(goal.id, target.metric, total):
-            db.session.add(GoalProgress(
+        if progress_has_changed(goal.id, target.metric, total, window if goal.repeat_interval else None):
+            record_progress(goal, GoalProgress(
                 goal_id=goal.id,
                 session_id=None,
                 metric=target.metric,
                 value_achieved=total,
-                achieved_on=datetime.utcnow().date(),
+                achieved_on=progress_date(goal, window),
                 is_complete=is_complete
             ))
         else:
-            print(f"[INFO] No change in aggregate progress for {target.metric}, skipping entry.")
+            logger.debug("No change in aggregate progress for %s, skipping entry", target.metric.value)
+    return all_targets_met
 
 
-def evaluate_general_aggregate_goal(goal: Goal, sessions: list[WorkoutSession]):
-    print(f"[DEBUG] Evaluating general aggregate goal {goal.id} for exercise {goal.exercise_name}")
+def evaluate_general_aggregate_goal(goal: Goal, sessions: list[WorkoutSession], window=None):
+    """Session-count goals; returns whether every sessions target is met."""
+    logger.debug("Evaluating general aggregate goal %s", goal.id)
 
-    filtered_sessions = filter_sessions_by_type_and_date(
-        sessions, goal.exercise_type.value, goal.start_date, goal.end_date or datetime.utcnow().date()
-    )
-    print(f"[DEBUG] Found {len(filtered_sessions)} relevant sessions for goal {goal.id} between {goal.start_date} and {goal.end_date or datetime.utcnow().date()}")
+    window = window or goal_window(goal)
+    start_date, end_date = window
+    count = count_goal_sessions(goal, start_date, end_date)
+    logger.debug("Found %s relevant sessions for goal %s between %s and %s", count, goal.id, start_date, end_date)
 
+    all_targets_met = True
     for target in goal.targets:
         if target.metric == MetricEnum.sessions:
-            count = len(filtered_sessions)
             is_complete = count >= target.value
+            all_targets_met = all_targets_met and is_complete
+            logger.debug("Target check: metric=sessions, required=%s, achieved=%s, is_complete=%s", target.value, count, is_complete)
 
-            print(f"[DEBUG] Target check: metric=sessions, required={target.value}, achieved={count}, is_complete={is_complete}")
-
-            if progress_has_changed(goal.id, 'sessions', count):
-                print(f"[SUCCESS] New session count progress for goal {goal.id}: {count} sessions. Creating GoalProgress.")
-                db.session.add(GoalProgress(
+            if progress_has_changed(goal.id, 'sessions', count, window if goal.repeat_interval else None):
+                record_progress(goal, GoalProgress(
                     goal_id=goal.id,
                     session_id=None,
                     metric=target.metric,
                     value_achieved=count,
-                    achieved_on=datetime.utcnow().date(),
+                    achieved_on=progress_date(goal, window),
                     is_complete=is_complete
                 ))
             else:
-                print(f"[INFO] No change in session count for goal {goal.id}, skipping GoalProgress entry.")
+                logger.debug("No change in session count for goal %s, skipping GoalProgress entry", goal.id)
+    return all_targets_met
+
+
+
+def evaluate_streak_goal(goal: Goal, window=None):
+    """Longest run of consecutive active days of the goal's exercise type inside its window, read from the activity bitmap."""
+    window = window or goal_window(goal)
+    bitmap = load_activity_bitmaps(goal.user_id)[activity_type_for_goal(goal)]
+    streak = longest_streak(bitmap, window[0], min(window[1], datetime.utcnow().date()))
+    logger.debug("Goal %s longest streak between %s and %s: %s days", goal.id, window[0], window[1], streak)
+
+    all_targets_met = True
+    for target in goal.targets:
+        if target.metric != MetricEnum.days:
+            continue
+        is_complete = streak >= target.value
+        all_targets_met = all_targets_met and is_complete
 
+        if progress_has_changed(goal.id, target.metric, streak, window if goal.repeat_interval else None):
+            record_progress(goal, GoalProgress(
+                goal_id=goal.id,
+                session_id=None,
+                metric=target.metric,
+                value_achieved=streak,
+                achieved_on=progress_date(goal, window),
+                is_complete=is_complete
+            ))
+    return all_targets_met
+
+
+# -----------------------------
+# Goal Scope
+# -----------------------------
+
+def session_goal_scope(session):
+    """What a stored session can count towards: its date and the exercise types, ids and names it contains."""
+    rows = db.session.query(WorkoutEntry.type, WorkoutEntry.exercise_id, WorkoutEntry.exercise).filter(
+        WorkoutEntry.session_id == session.id
+    ).all()
+    return {
+        "start": to_date(session.date),
+        "end": to_date(session.date),
+        "types": {type_ for type_, _, _ in rows},
+        "exercise_ids": {exercise_id for _, exercise_id, _ in rows if exercise_id},
+        "exercise_names": {name for _, _, name in rows},
+    }
+
+
+def merge_goal_scopes(scopes):
+    """One scope covering all of them: the overall date range and the union of exercises."""
+    scopes = [s for s in scopes if s]
+    if not scopes:
+        return None
+    return {
+        "start": min(s["start"] for s in scopes),
+        "end": max(s["end"] for s in scopes),
+        "types": set().union(*(s["types"] for s in scopes)),
+        "exercise_ids": set().union(*(s["exercise_ids"] for s in scopes)),
+        "exercise_names": set().union(*(s["exercise_names"] for s in scopes)),
+    }
+
+
+def find_affected_goals(user_id, scope, goal_ids=()):
+    """
+    Active goals whose (exercise, date window) intersects `scope`, plus any goal in `goal_ids`.
+    Served by the goals scope index; completed goals are skipped by their status column.
+    """
+    conditions = []
+    if scope:
+        types = [ExerciseTypeEnum(t) for t in scope["types"] if t in ExerciseTypeEnum.__members__]
+        conditions.append(and_(
+            Goal.start_date <= scope["end"],
+            or_(Goal.end_date == None, Goal.end_date >= scope["start"]),
+            or_(
+                Goal.exercise_type == ExerciseTypeEnum.general,
+                and_(Goal.exercise_name == None, Goal.exercise_type.in_(types)),
+                Goal.exercise_id.in_(scope["exercise_ids"]),
+                and_(Goal.exercise_id == None, Goal.exercise_name.in_(scope["exercise_names"])),
+            ),
+        ))
+    if goal_ids:
+        conditions.append(Goal.id.in_(goal_ids))
+    if not conditions:
+        return []
+
+    # Recurring goals complete per period and never reach the completed status
+    return Goal.query.filter(
+        Goal.user_id == user_id, Goal.status != GoalStatusEnum.completed, or_(*conditions)
+    ).all()
+
+
+def load_sessions_in_range(user_id, start, end):
+    return (
+        WorkoutSession.query.filter(
+            WorkoutSession.user_id == user_id,
+            WorkoutSession.date >= start,
+            WorkoutSession.date <= end,
+        )
+        .options(
+            selectinload(WorkoutSession.entries).selectinload(WorkoutEntry.strength_entries),
+            selectinload(WorkoutSession.entries).selectinload(WorkoutEntry.cardio_detail),
+        )
+        .all()
+    )
+
+
+def load_sessions_for_goals(user_id, goals):
+    """
+    Sessions inside the date windows of the accumulator-backed goals whose running totals
+    have not been built yet. Every other goal reads its own columns.
+    """
+    windows = [
+        (to_date(g.start_date), to_date(g.end_date or date.max))
+        for g in goals
+        if uses_accumulators(g) and not has_accumulators(g)
+    ]
+    if not windows:
+        return []
+    return load_sessions_in_range(user_id, min(start for start, _ in windows), max(end for _, end in windows))
+
+
+def sessions_in_goal_window(goal, sessions):
+    start = to_date(goal.start_date)
+    end = to_date(goal.end_date or datetime.utcnow().date())
+    return [s for s in sessions if start <= to_date(s.date) <= end]
+
+
+# -----------------------------
+# Aggregate Goal Accumulators
+# -----------------------------
+
+def uses_accumulators(goal):
+    # Recurring goals only ever read one period, which is already a bounded range scan
+    return goal.goal_type == GoalTypeEnum.aggregate and not goal.repeat_interval and bool(goal.targets) and all(
+        t.metric in ADDITIVE_METRICS for t in goal.targets
+    )
+
+
+def has_accumulators(goal):
+    if not uses_accumulators(goal):
+        return False
+    stored = {a.metric for a in goal.accumulators}
+    return all(t.metric in stored for t in goal.targets)
+
+
+def session_contribution(goal, session):
+    """{metric: amount} one session adds to an aggregate goal's running totals."""
+    day = to_date(session.date)
+    if day < to_date(goal.start_date) or (goal.end_date and day > to_date(goal.end_date)):
+        return {}
+
+    # Goals with weight or pace targets are not accumulator-backed, so no set or pace filters apply here
+    totals = dict.fromkeys(ADDITIVE_METRICS, 0)
+    if goal.exercise_name:
+        for entry in get_entries_from_session(session, goal.exercise_type.value, goal.exercise_name, goal.exercise_id):
+            if entry.type == 'strength':
+                totals[MetricEnum.reps] += sum(s.reps or 0 for s in entry.strength_entries)
+                totals[MetricEnum.sets] += len(entry.strength_entries)
+            elif entry.type == 'cardio' and entry.cardio_detail:
+                totals[MetricEnum.distance] += entry.cardio_detail.distance or 0
+                totals[MetricEnum.duration] += entry.cardio_detail.duration or 0
+    elif goal.exercise_type.value == 'general' or any(e.type == goal.exercise_type.value for e in session.entries):
+        totals[MetricEnum.sessions] = 1
+
+    return {t.metric: totals[t.metric] for t in goal.targets if t.metric in ADDITIVE_METRICS}
+
+
+def snapshot_goal_contributions(user_id, session):
+    """
+    What a stored session currently contributes to every active accumulator-backed goal it can
+    affect, as {(goal_id, metric): amount}. Taken before and after a change to derive deltas.
+    """
+    db.session.flush()
+    db.session.expire(session, ["entries"])
+    goals = [g for g in find_affected_goals(user_id, session_goal_scope(session)) if uses_accumulators(g)]
+    return {
+        (goal.id, metric): amount
+        for goal in goals
+        for metric, amount in session_contribution(goal, session).items()
+    }
+
+
+def apply_goal_deltas(user_id, session, before, deleted=False):
+    """
+    Adds (contribution now - `before`) to the goals' stored totals as signed in-place updates,
+    inside the caller's transaction. Goals without accumulator rows are skipped; they are built
+    from raw data the next time they are evaluated. Does not commit.
+    """
+    after = {} if deleted else snapshot_goal_contributions(user_id, session)
+    for goal_id, metric in before.keys() | after.keys():
+        delta = after.get((goal_id, metric), 0) - before.get((goal_id, metric), 0)
+        if delta:
+            GoalAccumulator.query.filter_by(goal_id=goal_id, metric=metric).update(
+                {GoalAccumulator.value: GoalAccumulator.value + delta}, synchronize_session=False
+            )
+
+
+def rebuild_goal_accumulators(goal, sessions=None):
+    """
+    Recomputes a goal's running totals from raw sessions and stores them.
+    Returns {metric: (stored_before, rebuilt)}; stored_before is None for new rows. Does not commit.
+    """
+    if sessions is None:
+        sessions = load_sessions_in_range(goal.user_id, to_date(goal.start_date), to_date(goal.end_date or date.max))
+
+    totals = {t.metric: 0 for t in goal.targets if t.metric in ADDITIVE_METRICS}
+    for session in sessions:
+        for metric, amount in session_contribution(goal, session).items():
+            totals[metric] += amount
+
+    stored = {a.metric: a for a in goal.accumulators}
+    changes = {}
+    for metric, total in totals.items():
+        accumulator = stored.get(metric)
+        if accumulator is None:
+            latest = (
+                GoalProgress.query.filter_by(goal_id=goal.id, metric=metric)
+                .order_by(desc(GoalProgress.achieved_on), desc(GoalProgress.id))
+                .first()
+            )
+            goal.accumulators.append(GoalAccumulator(
+                metric=metric, value=total, recorded_value=latest.value_achieved if latest else None
+            ))
+            changes[metric] = (None, total)
+        else:
+            changes[metric] = (accumulator.value, total)
+            accumulator.value = total
+    return changes
+
+
+def verify_goal_accumulators(user_id=None, repair=True):
+    """
+    Rebuilds the running totals of every accumulator-backed goal from raw sessions.
+    Returns [(goal_id, metric, stored, rebuilt)] for totals that had drifted; repairs them unless repair=False.
+    """
+    query = Goal.query.filter(Goal.goal_type == GoalTypeEnum.aggregate)
+    if user_id is not None:
+        query = query.filter(Goal.user_id == user_id)
+
+    drifted = []
+    for goal in query.order_by(Goal.id).all():
+        if not uses_accumulators(goal):
+            continue
+        for metric, (stored, rebuilt) in rebuild_goal_accumulators(goal).items():
+            if stored is not None and abs(stored - rebuilt) > 1e-9:
+                drifted.append((goal.id, metric.value, stored, rebuilt))
+
+    if repair:
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return drifted
+
+
+def evaluate_accumulated_goal(goal: Goal, sessions: list[WorkoutSession]):
+    """Aggregate goal evaluation against the stored running totals; raw sessions are only read to build them."""
+    if not has_accumulators(goal):
+        rebuild_goal_accumulators(goal, sessions)
+
+    accumulators = {a.metric: a for a in goal.accumulators}
+    for target in goal.targets:
+        # General goals only track their session count
+        if not goal.exercise_name and target.metric != MetricEnum.sessions:
+            continue
+
+        accumulator = accumulators[target.metric]
+        total = accumulator.value
+        if total == accumulator.recorded_value:
+            continue
+
+        record_progress(goal, GoalProgress(
+            goal_id=goal.id,
+            session_id=None,
+            metric=target.metric,
+            value_achieved=total,
+            achieved_on=datetime.utcnow().date(),
+            is_complete=total >= target.value
+        ))
+        accumulator.recorded_value = total
+
+
+# -----------------------------
+# Recurring Goals
+# -----------------------------
+
+def period_bounds(interval, day):
+    """Calendar day, Monday-based week, month or year containing `day`."""
+    if interval == RepeatIntervalEnum.daily:
+        return day, day
+    if interval == RepeatIntervalEnum.weekly:
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if interval == RepeatIntervalEnum.monthly:
+        start = day.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return date(day.year, 1, 1), date(day.year, 12, 31)
+
+
+def goal_window(goal, day=None):
+    """
+    Date range a goal is evaluated over: its own start and end (today if open-ended), or for a
+    recurring goal the period containing `day`, clipped to the goal's dates. None when a
+    recurring goal does not cover `day`.
+    """
+    start = to_date(goal.start_date)
+    if not goal.repeat_interval:
+        return start, to_date(goal.end_date or datetime.utcnow().date())
+
+    day = day or datetime.utcnow().date()
+    end = to_date(goal.end_date) if goal.end_date else None
+    if day < start or (end and day > end):
+        return None
+    period_start, period_end = period_bounds(goal.repeat_interval, day)
+    return max(period_start, start), min(period_end, end) if end else period_end
+
+
+def progress_date(goal, window):
+    """achieved_on for aggregate progress: today, kept inside the period for recurring goals."""
+    today = datetime.utcnow().date()
+    return min(today, window[1]) if goal.repeat_interval else today
+
+
+def get_goal_period(goal, window):
+    """The period row for `window`, created on first use. Does not commit."""
+    period = GoalPeriod.query.filter_by(goal_id=goal.id, period_start=window[0]).first()
+    if period is None:
+        period = GoalPeriod(goal_id=goal.id, period_start=window[0], period_end=window[1], is_complete=False)
+        db.session.add(period)
+    return period
+
+
+def evaluate_recurring_goal(goal: Goal, current_session: WorkoutSession = None):
+    """Evaluates only the period the session falls in (today's without one); closed or completed periods are left alone."""
+    day = to_date(current_session.date) if current_session else datetime.utcnow().date()
+    window = goal_window(goal, day)
+    if window is None:
+        return
+
+    period = get_goal_period(goal, window)
+    if period.is_complete or period.closed_at:
+        return
+
+    if goal.goal_type == GoalTypeEnum.single_session:
+        completed = bool(current_session) and evaluate_single_session_goal(goal, current_session, window)
+    elif goal.goal_type == GoalTypeEnum.streak:
+        completed = evaluate_streak_goal(goal, window)
+    elif goal.exercise_name:
+        completed = evaluate_aggregate_goal(goal, [], window)
+    else:
+        completed = evaluate_general_aggregate_goal(goal, [], window)
+
+    if completed:
+        period.is_complete = True
+        period.completed_on = day
+        logger.info("Goal %s completed for %s to %s", goal.id, window[0], window[1])
+
+
+def close_goal_periods(today=None):
+    """Rollover: closes every open period that ended before `today` in one statement. Returns how many were closed."""
+    today = today or datetime.utcnow().date()
+    closed = GoalPeriod.query.filter(GoalPeriod.closed_at == None, GoalPeriod.period_end < today).update(
+        {GoalPeriod.closed_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+    return closed
+
+
+# -----------------------------
+# Goal Status
+# -----------------------------
+
+def goal_status(goal, today=None):
+    """Stored status, except that an active goal past its end date reads as expired before the next sweep."""
+    today = today or date.today()
+    if goal.status == GoalStatusEnum.active and goal.end_date and to_date(goal.end_date) < today:
+        return GoalStatusEnum.expired
+    return goal.status
+
+
+def sweep_expired_goals(today=None):
+    """Marks every active goal whose end date has passed as expired in one UPDATE. Returns how many changed."""
+    today = today or date.today()
+    expired = Goal.query.filter(
+        Goal.status == GoalStatusEnum.active, Goal.end_date != None, Goal.end_date < today
+    ).update({Goal.status: GoalStatusEnum.expired}, synchronize_session=False)
+    db.session.commit()
+    return expired
+
+
+def rebuild_goal_status(user_id=None, batch_size=500, today=None):
+    """
+    Recomputes status, completed_at and latest_progress from GoalProgress, for goals stored
+    before the columns existed or after manual fixes. Returns how many goals were processed.
+    """
+    today = today or date.today()
+    query = Goal.query.options(selectinload(Goal.progress)).order_by(Goal.id)
+    if user_id is not None:
+        query = query.filter(Goal.user_id == user_id)
+
+    processed = 0
+    last_id = 0
+    while True:
+        goals = query.filter(Goal.id > last_id).limit(batch_size).all()
+        if not goals:
+            return processed
+        for goal in goals:
+            ordered = sorted(goal.progress, key=lambda p: (p.achieved_on, p.id))
+            latest = {}
+            for p in ordered:
+                latest[p.metric.value] = p.value_achieved
+            goal.latest_progress = json.dumps(latest) if latest else None
+
+            first_complete = next((p for p in ordered if p.is_complete), None)
+            goal.status = GoalStatusEnum.active
+            goal.completed_at = None
+            if first_complete and not goal.repeat_interval:
+                goal.status = GoalStatusEnum.completed
+                goal.completed_at = datetime.combine(first_complete.achieved_on, datetime.min.time())
+            elif goal.end_date and to_date(goal.end_date) < today:
+                goal.status = GoalStatusEnum.expired
+        db.session.commit()
+        processed += len(goals)
+        last_id = goals[-1].id
+
+
+# -----------------------------
+# Progress Compaction
+# -----------------------------
+
+def progress_checkpoint(goal, day, today, daily_days, retired):
+    """
+    Bucket a progress row on `day` collapses into; only the last row per (metric, bucket) survives.
+    Daily for the last `daily_days` days, then Monday-based weeks (never across a recurring period
+    boundary), and a single bucket once a finished goal is past retention.
+    """
+    if retired:
+        return None
+    if (today - day).days <= daily_days:
+        return day
+    week_start = day - timedelta(days=day.weekday())
+    if goal.repeat_interval:
+        return max(week_start, period_bounds(goal.repeat_interval, day)[0])
+    return week_start
+
+
+def is_retired(goal, today, retention_days):
+    """Completed or expired goals whose progress has been frozen for longer than retention_days."""
+    status = goal_status(goal, today)
+    if status == GoalStatusEnum.completed and goal.completed_at:
+        finished = goal.completed_at.date()
+    elif status == GoalStatusEnum.expired:
+        finished = to_date(goal.end_date)
+    else:
+        return False
+    return (today - finished).days > retention_days
+
+
+def progress_rows_to_drop(goal, rows, today, daily_days=30, retention_days=90):
+    """
+    Ids of the progress rows compaction removes from one goal. `rows` are (id, metric, achieved_on,
+    is_complete) ordered by metric, achieved_on, id. The latest row per metric always survives, as
+    does the first completing row of a one-off goal so completion stays on record.
+    """
+    retired = is_retired(goal, today, retention_days)
+    survivors = {}
+    first_complete = {}
+    for row_id, metric, achieved_on, is_complete in rows:
+        survivors[(metric, progress_checkpoint(goal, achieved_on, today, daily_days, retired))] = row_id
+        if is_complete and not goal.repeat_interval:
+            first_complete.setdefault(metric, row_id)
+
+    keep = set(survivors.values()) | set(first_complete.values())
+    return [row[0] for row in rows if row[0] not in keep]
+
+
+def compact_goal_progress(user_id=None, today=None, daily_days=30, retention_days=90, batch_size=500):
+    """
+    Collapses progress history into bounded checkpoints (see progress_checkpoint), a batch of goals
+    per commit. Safe to rerun: compacted goals have nothing left to drop. Returns how many rows were deleted.
+    """
+    today = today or date.today()
+    query = Goal.query.order_by(Goal.id)
+    if user_id is not None:
+        query = query.filter(Goal.user_id == user_id)
+
+    deleted = 0
+    last_id = 0
+    while True:
+        goals = query.filter(Goal.id > last_id).limit(batch_size).all()
+        if not goals:
+            return deleted
+
+        rows_by_goal = {}
+        rows = (
+            db.session.query(GoalProgress.goal_id, GoalProgress.id, GoalProgress.metric, GoalProgress.achieved_on, GoalProgress.is_complete)
+            .filter(GoalProgress.goal_id.in_([g.id for g in goals]))
+            .order_by(GoalProgress.goal_id, GoalProgress.metric, GoalProgress.achieved_on, GoalProgress.id)
+        )
+        for goal_id, *row in rows:
+            rows_by_goal.setdefault(goal_id, []).append(row)
+
+        drop = []
+        for goal in goals:
+            drop.extend(progress_rows_to_drop(goal, rows_by_goal.get(goal.id, []), today, daily_days, retention_days))
+        for start in range(0, len(drop), batch_size):
+            GoalProgress.query.filter(GoalProgress.id.in_(drop[start:start + batch_size])).delete(synchronize_session=False)
+        db.session.commit()
+
+        if drop:
+            logger.debug("Compacted %s progress row(s) across goals %s-%s", len(drop), goals[0].id, goals[-1].id)
+        deleted += len(drop)
+        last_id = goals[-1].id
+
+
+# -----------------------------
+# Batch Re-evaluation
+# -----------------------------
+
+def reevaluate_user_goals(user_id, today=None):
+    """
+    Re-evaluates every unfinished goal of one user from scratch, without waiting for a new log:
+    running totals are rebuilt, single-session goals are checked against each session in their
+    window, recurring goals evaluate their current period, and goals past their end date are
+    expired. The user's sessions are loaded once. Returns (goals, sessions) evaluated. Does not commit.
+    """
+    today = today or date.today()
+    goals = (
+        Goal.query.filter(Goal.user_id == user_id, Goal.status != GoalStatusEnum.completed, Goal.start_date <= today)
+        .options(selectinload(Goal.targets), selectinload(Goal.accumulators))
+        .order_by(Goal.id)
+        .all()
+    )
+
+    # Only running-total rebuilds read session objects; every other goal reads its own columns
+    needs_sessions = [g for g in goals if uses_accumulators(g)]
+    sessions = []
+    if needs_sessions:
+        start = min(to_date(g.start_date) for g in needs_sessions)
+        sessions = load_sessions_in_range(user_id, start, today)
+    seen = {s.id for s in sessions}
+
+    for goal in goals:
+        if goal.goal_type == GoalTypeEnum.single_session:
+            seen |= reevaluate_single_session_goal(goal, today)
+        elif goal.repeat_interval:
+            evaluate_recurring_goal(goal)
+        elif uses_accumulators(goal):
+            window_sessions = sessions_in_goal_window(goal, sessions)
+            rebuild_goal_accumulators(goal, window_sessions)
+            evaluate_accumulated_goal(goal, window_sessions)
+        else:
+            evaluate_goal(goal, [])
+
+        if goal_status(goal, today) == GoalStatusEnum.expired:
+            goal.status = GoalStatusEnum.expired
+
+    return len(goals), len(seen)
+
+
+def reevaluate_single_session_goal(goal, today):
+    """
+    Checks each session in the goal's window (its current period if recurring) in date order until
+    one meets every target. The window is read as columns once and split per session. Returns the
+    ids of the sessions read.
+    """
+    window = goal_window(goal, today) if goal.repeat_interval else goal_window(goal)
+    if window is None:
+        return set()
+    period = get_goal_period(goal, window) if goal.repeat_interval else None
+    if period is not None and (period.is_complete or period.closed_at):
+        return set()
+
+    strength, cardio = load_goal_columns(goal, start_date=window[0], end_date=window[1])
+    # A goal has one exercise type, so at most one of the two is non-empty
+    by_session = [(sid, day, cols, empty_columns(CARDIO_COLUMNS)) for sid, day, cols in split_by_session(strength)]
+    by_session += [(sid, day, empty_columns(STRENGTH_COLUMNS), cols) for sid, day, cols in split_by_session(cardio)]
+
+    for session_id, day, session_strength, session_cardio in by_session:
+        if evaluate_single_session_goal(goal, SessionRef(session_id, day), window, (session_strength, session_cardio)):
+            if period is not None:
+                period.is_complete = True
+                period.completed_on = day
+            break
+    return {session_id for session_id, *_ in by_session}
 
 
 # -----------------------------
@@ -288,14 +908,20 @@ def evaluate_general_aggregate_goal(goal: Goal, sessions: list[WorkoutSession]):
 # -----------------------------
 
 def evaluate_goal(goal: Goal, user_sessions: list[WorkoutSession], current_session: WorkoutSession = None):
-    # ✅ Check if any GoalProgress entry marks this goal as complete
-    completed_progress = next((p for p in sorted(goal.progress, key=lambda p: p.achieved_on, reverse=True) if p.is_complete), None)
-    if completed_progress:
+    if goal.repeat_interval:
+        evaluate_recurring_goal(goal, current_session)
+        return
+
+    if goal.status == GoalStatusEnum.completed:
         return  # Goal already completed; skip further evaluation
 
     if goal.goal_type == GoalTypeEnum.single_session:
         if current_session:
             evaluate_single_session_goal(goal, current_session)
+    elif goal.goal_type == GoalTypeEnum.streak:
+        evaluate_streak_goal(goal)
+    elif uses_accumulators(goal):
+        evaluate_accumulated_goal(goal, user_sessions)
     elif goal.goal_type == GoalTypeEnum.aggregate:
         if goal.exercise_name:
             evaluate_aggregate_goal(goal, user_sessions)
@@ -316,12 +942,16 @@ def serialize_goal(goal):
         "start_date": goal.start_date.isoformat(),
         "end_date": goal.end_date.isoformat() if goal.end_date else None,
         "goal_type": goal.goal_type.value,
+        "repeat_interval": goal.repeat_interval.value if goal.repeat_interval else None,
         "exercise_type": goal.exercise_type.value if goal.exercise_type else None,
         "exercise_name": goal.exercise_name,
         "created_at": goal.created_at.isoformat() if goal.created_at else None,
         "updated_at": goal.updated_at.isoformat() if goal.updated_at else None,
-        "is_complete": goal.is_complete,
-        "is_expired": goal.is_expired
+        "status": goal_status(goal).value,
+        "completed_at": goal.completed_at.isoformat() if goal.completed_at else None,
+        "latest_progress": json.loads(goal.latest_progress) if goal.latest_progress else {},
+        "is_complete": goal.status == GoalStatusEnum.completed,
+        "is_expired": goal_status(goal) == GoalStatusEnum.expired,
     }
 
 def serialize_target(target):
@@ -342,3 +972,14 @@ def serialize_progress(progress):
         "is_complete": progress.is_complete,
         "achieved_on": progress.achieved_on.isoformat(),
     }
+
+def serialize_period(period):
+    return {
+        "id": period.id,
+        "goal_id": period.goal_id,
+        "period_start": period.period_start.isoformat(),
+        "period_end": period.period_end.isoformat(),
+        "is_complete": period.is_complete,
+        "completed_on": period.completed_on.isoformat() if period.completed_on else None,
+        "closed": period.closed_at is not None,
+    }
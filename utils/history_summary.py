@@ -0,0 +1,197 @@
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from utils.exercise_data_utils import estimate_1rm
+
+# Prompt budget: everything below is fixed-size no matter how long the user has been training
+RECENT_SESSIONS = 5
+MAX_SETS_PER_SESSION = 10
+WEEKLY_BUCKETS = 8
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def slope(values):
+    """Least-squares slope of values against their index (per week); None with fewer than two points."""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / denominator
+
+
+def group_by_session(rows, key="session_id"):
+    """Groups rows into an OrderedDict of session_id -> rows, oldest session first."""
+    ordered = sorted(rows, key=lambda r: (to_date(r["date"]), r[key]))
+    sessions = OrderedDict()
+    for row in ordered:
+        sessions.setdefault(row[key], []).append(row)
+    return sessions
+
+
+def summarize_strength_history(sets_details, formula="epley", recent_sessions=RECENT_SESSIONS, weekly_buckets=WEEKLY_BUCKETS):
+    """
+    Compresses every historical set for one exercise into fixed-size features:
+    the last `recent_sessions` sessions verbatim, per-week aggregates for the last
+    `weekly_buckets` weeks that have data, best e1RM and the weekly volume trend.
+    e1RM uses the same `formula` as the 1RM endpoints (utils.exercise_data_utils.estimate_1rm).
+    """
+    valid_sets = [s for s in sets_details if "reps" in s and "set_number" in s and "session_id" in s and "date" in s]
+    has_weights = any(s.get("weight") and s["weight"] > 0 for s in valid_sets)
+    sessions = group_by_session(valid_sets)
+
+    def set_volume(s):
+        return s["reps"] * s["weight"] if has_weights and s.get("weight") else s["reps"]
+
+    best_e1rm = None
+    weeks = OrderedDict()
+    for session_id, sets in sessions.items():
+        day = to_date(sets[0]["date"])
+        bucket = weeks.setdefault(week_start(day), {"sessions": 0, "sets": 0, "reps": 0, "volume": 0, "best_e1rm": None})
+        bucket["sessions"] += 1
+        for s in sets:
+            bucket["sets"] += 1
+            bucket["reps"] += s["reps"]
+            bucket["volume"] += set_volume(s)
+            e1rm = estimate_1rm(s["reps"], s["weight"], formula) if has_weights and s.get("weight") else None
+            if e1rm:
+                bucket["best_e1rm"] = max(bucket["best_e1rm"] or 0, e1rm)
+                if best_e1rm is None or e1rm > best_e1rm["value"]:
+                    best_e1rm = {"value": round(e1rm, 1), "date": day.isoformat()}
+
+    recent = []
+    for session_id, sets in list(sessions.items())[-recent_sessions:]:
+        ordered_sets = sorted(sets, key=lambda s: s["set_number"])
+        recent.append({
+            "session_id": session_id,
+            "date": to_date(sets[0]["date"]).isoformat(),
+            "sets": [
+                {k: s[k] for k in ("set_number", "reps", "weight") if s.get(k) is not None}
+                for s in ordered_sets[:MAX_SETS_PER_SESSION]
+            ],
+            "omitted_sets": max(0, len(ordered_sets) - MAX_SETS_PER_SESSION),
+            "volume": round(sum(set_volume(s) for s in sets), 1),
+        })
+
+    weekly = [
+        {"week_start": start.isoformat(), **{k: round(v, 1) if isinstance(v, float) else v for k, v in bucket.items()}}
+        for start, bucket in list(weeks.items())[-weekly_buckets:]
+    ]
+
+    return {
+        "has_weights": has_weights,
+        "total_sessions": len(sessions),
+        "total_sets": len(valid_sets),
+        "first_date": to_date(next(iter(sessions.values()))[0]["date"]).isoformat() if sessions else None,
+        "recent_sessions": recent,
+        "avg_sets_per_session": round(sum(len(r["sets"]) + r["omitted_sets"] for r in recent) / len(recent)) if recent else 0,
+        "avg_session_volume": round(sum(r["volume"] for r in recent) / len(recent), 1) if recent else 0,
+        "best_e1rm": best_e1rm,
+        "weekly": weekly,
+        "volume_slope_per_week": round(slope([w["volume"] for w in weekly]), 2) if len(weekly) > 1 else None,
+    }
+
+
+def format_strength_summary(summary):
+    lines = [
+        f"History: {summary['total_sessions']} sessions, {summary['total_sets']} sets since {summary['first_date']}.",
+        f"Most recent {len(summary['recent_sessions'])} sessions:",
+    ]
+    for session in summary["recent_sessions"]:
+        sets = ", ".join(
+            f"{s['reps']}" + (f"@{s['weight']}" if summary["has_weights"] and s.get("weight") else "")
+            for s in session["sets"]
+        )
+        more = f" (+{session['omitted_sets']} more sets)" if session["omitted_sets"] else ""
+        lines.append(f"- {session['date']}: {sets}{more}")
+
+    if summary["weekly"]:
+        lines.append("Weekly totals (week of: sessions / sets / reps / volume" + (" / best e1RM" if summary["has_weights"] else "") + "):")
+        for week in summary["weekly"]:
+            line = f"- {week['week_start']}: {week['sessions']} / {week['sets']} / {week['reps']} / {week['volume']}"
+            if summary["has_weights"]:
+                line += f" / {week['best_e1rm'] or 'N/A'}"
+            lines.append(line)
+
+    if summary["best_e1rm"]:
+        lines.append(f"Best estimated 1RM: {summary['best_e1rm']['value']} lbs on {summary['best_e1rm']['date']}.")
+    if summary["volume_slope_per_week"] is not None:
+        lines.append(f"Weekly volume trend: {summary['volume_slope_per_week']:+} per week.")
+    return "\n".join(lines)
+
+
+def summarize_cardio_history(session_data, recent_sessions=RECENT_SESSIONS, weekly_buckets=WEEKLY_BUCKETS):
+    """Cardio counterpart of summarize_strength_history: recent sessions, weekly totals, bests and distance trend."""
+    ordered = sorted(session_data, key=lambda s: (to_date(s["date"]), s["session_id"]))
+
+    weeks = OrderedDict()
+    best = {"distance": None, "duration": None, "pace": None}
+    for s in ordered:
+        bucket = weeks.setdefault(week_start(to_date(s["date"])), {"sessions": 0, "distance": 0, "duration": 0, "best_pace": None})
+        bucket["sessions"] += 1
+        bucket["distance"] += s.get("distance") or 0
+        bucket["duration"] += s.get("duration") or 0
+        if s.get("pace"):
+            bucket["best_pace"] = min(bucket["best_pace"] or s["pace"], s["pace"])
+
+        for field in ("distance", "duration"):
+            if s.get(field) and (best[field] is None or s[field] > best[field]["value"]):
+                best[field] = {"value": s[field], "date": to_date(s["date"]).isoformat()}
+        if s.get("pace") and (best["pace"] is None or s["pace"] < best["pace"]["value"]):
+            best["pace"] = {"value": s["pace"], "date": to_date(s["date"]).isoformat()}
+
+    weekly = [
+        {"week_start": start.isoformat(), **{k: round(v, 2) if isinstance(v, float) else v for k, v in bucket.items()}}
+        for start, bucket in list(weeks.items())[-weekly_buckets:]
+    ]
+
+    return {
+        "total_sessions": len(ordered),
+        "first_date": to_date(ordered[0]["date"]).isoformat() if ordered else None,
+        "recent_sessions": [
+            {k: s.get(k) for k in ("session_id", "date", "distance", "duration", "pace")}
+            for s in ordered[-recent_sessions:]
+        ],
+        "weekly": weekly,
+        "best": best,
+        "distance_slope_per_week": round(slope([w["distance"] for w in weekly]), 3) if len(weekly) > 1 else None,
+    }
+
+
+def format_cardio_summary(summary, has_distance=True, has_duration=True, has_pace=True):
+    lines = [
+        f"History: {summary['total_sessions']} sessions since {summary['first_date']}.",
+        f"Most recent {len(summary['recent_sessions'])} sessions:",
+    ]
+    for s in summary["recent_sessions"]:
+        lines.append(
+            f"- {to_date(s['date']).isoformat()}:"
+            + (f" {s['distance']} miles" if has_distance and s.get("distance") else "")
+            + (f", {s['duration']} min" if has_duration and s.get("duration") else "")
+            + (f", {s['pace']} min/mile" if has_pace and s.get("pace") else "")
+        )
+
+    if summary["weekly"]:
+        lines.append("Weekly totals (week of: sessions / miles / minutes / best pace):")
+        for week in summary["weekly"]:
+            lines.append(f"- {week['week_start']}: {week['sessions']} / {week['distance']} / {week['duration']} / {week['best_pace'] or 'N/A'}")
+
+    labels = {"distance": "Longest distance", "duration": "Longest duration", "pace": "Best pace"}
+    for field, label in labels.items():
+        if summary["best"][field]:
+            lines.append(f"{label}: {summary['best'][field]['value']} on {summary['best'][field]['date']}.")
+    if summary["distance_slope_per_week"] is not None:
+        lines.append(f"Weekly distance trend: {summary['distance_slope_per_week']:+} miles per week.")
+    return "\n".join(lines)
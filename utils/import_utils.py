@@ -0,0 +1,220 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from init import db
+from models import WorkoutSession, WorkoutEntry
+from models.goal import GoalTypeEnum
+from utils import metrics
+from utils.goal_utils import (
+    evaluate_goal, session_goal_scope, merge_goal_scopes, find_affected_goals, load_sessions_for_goals,
+    sessions_in_goal_window, apply_goal_deltas,
+)
+from utils.log_entry_utils import process_goals_for_session
+from utils.openai_utils import clean_entries
+from utils.pr_utils import track_prs_for_session
+from utils.activity_utils import refresh_activity_days
+from utils.recommendation_cache import invalidate_recommendations
+from utils.workout_parser import parse_workout_text
+
+
+def read_import_items(request):
+    """Accepts {"items": [...]}, a bare JSON list, an NDJSON body or an uploaded NDJSON file."""
+    if "file" in request.files:
+        return parse_ndjson(request.files["file"].read().decode("utf-8"))
+
+    if request.mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonlines"):
+        return parse_ndjson(request.get_data(as_text=True))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of {date, raw_text} items.")
+    return data
+
+
+def parse_ndjson(text):
+    items = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError:
+            items.append({"_error": f"Line {line_number} is not valid JSON"})
+    return items
+
+
+def validate_import_item(item):
+    if not isinstance(item, dict):
+        raise ValueError("Item must be an object with 'date' and 'raw_text'.")
+    if item.get("_error"):
+        raise ValueError(item["_error"])
+
+    raw_text = (item.get("raw_text") or "").strip()
+    if not raw_text:
+        raise ValueError("Missing raw_text.")
+
+    try:
+        item_date = datetime.strptime(item.get("date") or "", "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Missing or invalid date (expected YYYY-MM-DD).")
+
+    item_time = None
+    if item.get("time"):
+        try:
+            item_time = datetime.strptime(item["time"], "%H:%M").time()
+        except ValueError:
+            raise ValueError("Invalid time (expected HH:MM).")
+
+    return raw_text, item_date, item_time
+
+
+def parse_items_concurrently(app, items, concurrency):
+    """Parses (index, raw_text, date) tuples with at most `concurrency` parses in flight."""
+
+    def parse_one(index, raw_text, item_date):
+        with app.app_context():
+            try:
+                # Resolve relative phrases ("yesterday") against the item's own date
+                return index, parse_workout_text(raw_text, today_override=item_date.isoformat()), None
+            except Exception as e:
+                return index, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(parse_one, index, raw_text, item_date) for index, raw_text, item_date in items]
+        return [future.result() for future in futures]
+
+
+def evaluate_goals_after_import(user_id, new_sessions, goal_ids=()):
+    """Single goal evaluation pass for the whole import, limited to goals the imported sessions can affect."""
+    scope = merge_goal_scopes([session_goal_scope(session) for session in new_sessions])
+    goals = find_affected_goals(user_id, scope, goal_ids)
+    sessions = load_sessions_for_goals(user_id, goals)
+
+    for goal in goals:
+        if goal.goal_type == GoalTypeEnum.single_session:
+            for session in new_sessions:
+                evaluate_goal(goal, sessions, session)
+        else:
+            evaluate_goal(goal, sessions_in_goal_window(goal, sessions))
+
+    db.session.commit()
+
+
+def import_workouts_for_user(user_id, items, concurrency=None, batch_size=None):
+    app = current_app._get_current_object()
+    concurrency = max(1, min(concurrency or app.config.get("IMPORT_CONCURRENCY", 4), app.config.get("IMPORT_MAX_CONCURRENCY", 16)))
+    batch_size = batch_size or app.config.get("IMPORT_BATCH_SIZE", 50)
+
+    started = time.perf_counter()
+    failures = []
+    to_parse = []
+    item_meta = {}
+
+    for index, item in enumerate(items):
+        try:
+            raw_text, item_date, item_time = validate_import_item(item)
+        except ValueError as e:
+            failures.append({"index": index, "error": str(e)})
+            continue
+        to_parse.append((index, raw_text, item_date))
+        item_meta[index] = (raw_text, item_date, item_time)
+
+    # Stage 1: bounded-concurrency parsing
+    parse_started = time.perf_counter()
+    parsed = parse_items_concurrently(app, to_parse, concurrency) if to_parse else []
+    parse_seconds = time.perf_counter() - parse_started
+
+    # Stage 2: batched inserts, one transaction per batch with a savepoint per item
+    insert_started = time.perf_counter()
+    new_sessions = []
+    session_entries = {}
+    added_goal_ids = []
+
+    ok_results = []
+    for index, structured_response, error in parsed:
+        if error:
+            failures.append({"index": index, "error": error})
+        else:
+            ok_results.append((index, structured_response))
+
+    for batch_start in range(0, len(ok_results), batch_size):
+        batch_days = set()
+        for index, structured_response in ok_results[batch_start:batch_start + batch_size]:
+            raw_text, item_date, item_time = item_meta[index]
+            try:
+                with db.session.begin_nested():
+                    date_str = structured_response.get("date")
+                    parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
+                    valid_entries = [e for e in clean_entries(structured_response.get("entries", [])) if "exercise" in e]
+
+                    session = WorkoutSession(
+                        user_id=user_id,
+                        date=parsed_date or item_date,
+                        time=item_time,
+                        raw_text=raw_text,
+                        notes=structured_response.get("notes", ""),
+                    )
+                    db.session.add(session)
+                    db.session.flush()
+
+                    for entry in valid_entries:
+                        WorkoutEntry.from_dict(entry, session.id)
+                    apply_goal_deltas(user_id, session, {})
+
+                    added_goals, _ = process_goals_for_session(structured_response.get("goals", []), user_id, session)
+            except Exception as e:
+                failures.append({"index": index, "error": str(e)})
+                continue
+
+            new_sessions.append(session)
+            batch_days.add(session.date)
+            session_entries[session.id] = valid_entries
+            added_goal_ids.extend(g["id"] for g in added_goals)
+
+        # One bitmap update per batch rather than per session
+        refresh_activity_days(user_id, batch_days)
+        db.session.commit()
+    insert_seconds = time.perf_counter() - insert_started
+
+    # Stage 3: PRs and goals once, in chronological order
+    evaluation_started = time.perf_counter()
+    new_sessions.sort(key=lambda s: (s.date, s.time or datetime.min.time(), s.id))
+    new_prs = []
+    for session in new_sessions:
+        if session_entries[session.id]:
+            new_prs.extend(track_prs_for_session(session, session_entries[session.id]))
+
+    if new_sessions:
+        invalidate_recommendations(user_id)
+        evaluate_goals_after_import(user_id, new_sessions, added_goal_ids)
+    evaluation_seconds = time.perf_counter() - evaluation_started
+
+    elapsed = time.perf_counter() - started
+    metrics.increment("import.items", len(items))
+    metrics.increment("import.failures", len(failures))
+    metrics.record_timing("import.total", elapsed)
+
+    return {
+        "success": bool(new_sessions),
+        "received": len(items),
+        "imported": len(new_sessions),
+        "failed": len(failures),
+        "failures": sorted(failures, key=lambda f: f["index"]),
+        "session_ids": [s.id for s in new_sessions],
+        "new_prs": new_prs,
+        "goals_added": len(added_goal_ids),
+        "concurrency": concurrency,
+        "timings": {
+            "parse_seconds": round(parse_seconds, 3),
+            "insert_seconds": round(insert_seconds, 3),
+            "evaluation_seconds": round(evaluation_seconds, 3),
+            "total_seconds": round(elapsed, 3),
+        },
+        "items_per_second": round(len(items) / elapsed, 2) if elapsed > 0 else None,
+    }
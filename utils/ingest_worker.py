@@ -0,0 +1,200 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, request
+
+from init import db
+from models import IngestJob, JobStatusEnum
+from utils import metrics
+from utils.log_entry_utils import log_workout_for_user
+from utils.logging_utils import bind_context, clear_context
+
+logger = logging.getLogger(__name__)
+
+# Set by enqueue_log_workout so idle workers in this process pick up new jobs without waiting a poll interval
+_job_available = threading.Event()
+_stop_workers = threading.Event()
+_worker_threads = []
+
+
+def is_async_request(data):
+    flag = data.get("async") if data else None
+    if flag is None:
+        flag = request.args.get("async")
+    return str(flag).lower() in ("1", "true", "yes")
+
+
+def enqueue_log_workout(user_id, raw_text, today_date, session_time):
+    job = IngestJob(
+        user_id=int(user_id),
+        raw_text=raw_text,
+        reference_date=today_date,
+        session_time=session_time,
+        status=JobStatusEnum.queued,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    metrics.increment("ingest.enqueued")
+    logger.info("Queued ingest job %s", job.id)  # ties the submitting request id to ingest-<job id>
+    _job_available.set()
+    return job
+
+
+def serialize_job(job):
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_code": job.status_code,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+    }
+
+
+def requeue_stale_jobs():
+    """Puts jobs back in the queue if the worker that claimed them died mid-run."""
+    timeout = current_app.config.get("INGEST_JOB_TIMEOUT_SECONDS", 600)
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    max_attempts = current_app.config.get("INGEST_MAX_ATTEMPTS", 3)
+
+    requeued = IngestJob.query.filter(
+        IngestJob.status == JobStatusEnum.running,
+        IngestJob.started_at < cutoff,
+        IngestJob.attempts < max_attempts,
+    ).update({IngestJob.status: JobStatusEnum.queued}, synchronize_session=False)
+
+    IngestJob.query.filter(
+        IngestJob.status == JobStatusEnum.running,
+        IngestJob.started_at < cutoff,
+    ).update({
+        IngestJob.status: JobStatusEnum.failed,
+        IngestJob.error: "Job timed out",
+        IngestJob.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+
+    db.session.commit()
+    return requeued
+
+
+def claim_next_job():
+    """
+    Claims the oldest queued job with a compare-and-set UPDATE, so several workers
+    (threads or processes) can poll the same table without a broker.
+    """
+    while True:
+        job_id = (
+            db.session.query(IngestJob.id)
+            .filter(IngestJob.status == JobStatusEnum.queued)
+            .order_by(IngestJob.id.asc())
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        claimed = IngestJob.query.filter(
+            IngestJob.id == job_id,
+            IngestJob.status == JobStatusEnum.queued,
+        ).update({
+            IngestJob.status: JobStatusEnum.running,
+            IngestJob.started_at: datetime.utcnow(),
+            IngestJob.attempts: IngestJob.attempts + 1,
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(IngestJob, job_id)
+
+
+def run_job(job):
+    job_id = job.id
+    queued_for = (datetime.utcnow() - job.created_at).total_seconds() if job.created_at else 0
+    metrics.record_timing("ingest.queue_wait", queued_for)
+
+    try:
+        with metrics.timed("ingest.run"):
+            # Relative dates ("yesterday") resolve against the day the job was submitted, not when it runs
+            body, status_code = log_workout_for_user(
+                job.user_id, job.raw_text, job.reference_date, job.session_time,
+                today_override=job.reference_date.isoformat(),
+            )
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(IngestJob, job_id)
+        job.status = JobStatusEnum.failed
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        metrics.increment("ingest.failed")
+        return job
+
+    job = db.session.get(IngestJob, job_id)
+    job.status = JobStatusEnum.succeeded if status_code < 400 else JobStatusEnum.failed
+    job.status_code = status_code
+    job.result = json.dumps(body)
+    job.error = body.get("error")
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+    metrics.increment(f"ingest.{job.status.value}")
+    return job
+
+
+def run_pending_jobs(app, stop_event=None):
+    """Worker loop: claims and runs jobs until stop_event is set, requeueing stale jobs as it goes."""
+    stop_event = stop_event or _stop_workers
+    poll_interval = app.config.get("INGEST_POLL_INTERVAL_SECONDS", 1.0)
+    requeue_interval = app.config.get("INGEST_REQUEUE_INTERVAL_SECONDS", 60)
+    next_requeue = 0
+
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                # Jobs of a worker that died are picked up without waiting for a restart
+                if time.monotonic() >= next_requeue:
+                    requeue_stale_jobs()
+                    next_requeue = time.monotonic() + requeue_interval
+                job = claim_next_job()
+                if job:
+                    bind_context(f"ingest-{job.id}", sample_rate=app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0))
+                    run_job(job)
+            except Exception:
+                logger.exception("Ingest worker error")
+                db.session.rollback()
+                job = None
+            finally:
+                clear_context()
+                db.session.remove()
+
+        if job is None:
+            _job_available.wait(poll_interval)
+            _job_available.clear()
+
+
+def start_ingest_workers(app, count=None):
+    """
+    Starts `count` (default INGEST_WORKERS) daemon threads in this process. Returns the started threads.
+    Only worker processes call this (`flask ingest-worker`, or app.py's dev server), never the web app on import.
+    """
+    count = app.config.get("INGEST_WORKERS", 0) if count is None else count
+    for i in range(count):
+        thread = threading.Thread(target=run_pending_jobs, args=(app,), name=f"ingest-worker-{i}", daemon=True)
+        thread.start()
+        _worker_threads.append(thread)
+    return _worker_threads[-count:] if count else []
+
+
+def stop_ingest_workers(timeout=None):
+    _stop_workers.set()
+    _job_available.set()
+    for thread in _worker_threads:
+        thread.join(timeout)
+    _worker_threads.clear()
+    _stop_workers.clear()
@@ -0,0 +1,58 @@
+import os
+import threading
+
+from flask import current_app, has_app_context
+from openai import OpenAI
+
+# "openai" talks to api.openai.com; "stub" talks to the bundled chat-completions stand-in (llm_stub/server.py)
+SUPPORTED_BACKENDS = ("openai", "stub")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_setting(name, default=None):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return os.getenv(name, default)
+
+
+def get_llm_model():
+    return get_setting("LLM_MODEL", "gpt-4.1")
+
+
+def get_llm_client():
+    backend = (get_setting("LLM_BACKEND", "openai") or "openai").lower()
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{backend}'. Expected one of {SUPPORTED_BACKENDS}.")
+
+    if backend == "stub":
+        key = (backend, get_setting("LLM_STUB_URL", "http://127.0.0.1:8001/v1"))
+    else:
+        key = (backend, get_setting("LLM_BASE_URL"))
+
+    with _clients_lock:
+        if key not in _clients:
+            if backend == "stub":
+                _clients[key] = OpenAI(base_url=key[1], api_key="stub")
+            elif key[1]:
+                _clients[key] = OpenAI(base_url=key[1], api_key=get_setting("OPENAI_API_KEY"))
+            else:
+                _clients[key] = OpenAI(api_key=get_setting("OPENAI_API_KEY"))
+        return _clients[key]
+
+
+def chat_completion(messages, temperature=0.3, stream=False, timeout=None, client=None, model=None):
+    """
+    Single entry point for chat completions so the backend and model come from config.
+    Pass client/model explicitly when calling from a thread without an app context.
+    """
+    client = client or get_llm_client()
+    kwargs = {"timeout": timeout} if timeout else {}
+    return client.chat.completions.create(
+        model=model or get_llm_model(),
+        messages=messages,
+        temperature=temperature,
+        stream=stream,
+        **kwargs,
+    )
@@ -0,0 +1,232 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils import metrics
+from utils.llm_backend import chat_completion, get_llm_client, get_llm_model, get_setting
+
+# Shared by every request in the process; hedged calls use two slots each
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+
+class LLMUnavailableError(Exception):
+    """The LLM call did not produce a response: breaker open, deadline exceeded or backend error."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` failures within `window_seconds` and rejects calls until
+    `reset_seconds` have passed. Then a single trial call is let through (half-open); its
+    outcome closes the breaker or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, window_seconds=60, reset_seconds=30, name="llm"):
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.reset_seconds = reset_seconds
+        self.name = name
+
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = []
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.publish_state()
+
+    def publish_state(self):
+        metrics.set_gauge(f"{self.name}.breaker.open", 1 if self.state == self.OPEN else 0)
+        metrics.set_gauge(f"{self.name}.breaker.state", self.state)
+
+    def transition(self, state):
+        if self.state != state:
+            self.state = state
+            metrics.increment(f"{self.name}.breaker.{state}")
+            self.publish_state()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.transition(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+
+            return False
+
+    def release(self):
+        """Ends a half-open trial without an outcome (e.g. the caller abandoned a stream)."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.trial_in_flight = False
+            self.failures.clear()
+            self.transition(self.CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            now = time.monotonic()
+            self.trial_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                self.opened_at = now
+                self.transition(self.OPEN)
+                return
+
+            self.failures = [t for t in self.failures if now - t < self.window_seconds]
+            self.failures.append(now)
+            if len(self.failures) >= self.failure_threshold:
+                self.opened_at = now
+                self.failures.clear()
+                self.transition(self.OPEN)
+
+    def stats(self):
+        with self.lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at)), 3)
+            return {
+                "state": self.state,
+                "recent_failures": len(self.failures),
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": retry_in,
+            }
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker():
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                failure_threshold=int(get_setting("LLM_BREAKER_FAILURE_THRESHOLD", 5)),
+                window_seconds=float(get_setting("LLM_BREAKER_WINDOW_SECONDS", 60)),
+                reset_seconds=float(get_setting("LLM_BREAKER_RESET_SECONDS", 30)),
+            )
+        return _breaker
+
+
+def is_llm_available():
+    return get_breaker().state != CircuitBreaker.OPEN
+
+
+def get_llm_resilience_stats():
+    return get_breaker().stats()
+
+
+def hedged_call(fn, deadline, hedge_after=None):
+    """
+    Runs fn() on the shared executor and waits at most `deadline` seconds.
+    If hedge_after is set and the first attempt is still running by then, a second identical
+    attempt is started and whichever finishes first successfully wins.
+    Returns (result, attempts_started). Raises the last error, or TimeoutError.
+    """
+    start = time.monotonic()
+    pending = {_executor.submit(fn)}
+    attempts = 1
+    last_error = None
+
+    while pending:
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+
+        can_hedge = hedge_after and attempts == 1
+        wait_for = min(remaining, max(0.0, hedge_after - (time.monotonic() - start))) if can_hedge else remaining
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is None:
+                return future.result(), attempts
+            last_error = future.exception()
+
+        if can_hedge and pending and time.monotonic() - start >= hedge_after:
+            pending.add(_executor.submit(fn))
+            attempts += 1
+
+    for future in pending:
+        future.cancel()
+    if last_error and not pending:
+        raise last_error
+    raise TimeoutError(f"LLM call exceeded its {deadline}s deadline")
+
+
+def resilient_chat_completion(messages, temperature=0.3, operation="call"):
+    """
+    chat_completion behind the circuit breaker, with a per-call deadline and an optional hedged
+    second request. Raises LLMUnavailableError instead of the underlying error.
+    """
+    breaker = get_breaker()
+    if not breaker.allow():
+        metrics.increment("llm.rejected")
+        raise LLMUnavailableError("LLM temporarily unavailable (circuit open)")
+
+    deadline = float(get_setting("LLM_TIMEOUT_SECONDS", 20))
+    hedge_after = float(get_setting("LLM_HEDGE_AFTER_SECONDS", 0)) or None
+
+    # Resolved here because the executor threads have no app context
+    client = get_llm_client()
+    model = get_llm_model()
+
+    def call():
+        return chat_completion(messages, temperature=temperature, timeout=deadline, client=client, model=model)
+
+    start = time.perf_counter()
+    try:
+        response, attempts = hedged_call(call, deadline, hedge_after)
+    except Exception as e:
+        breaker.record_failure()
+        metrics.increment("llm.timeout" if isinstance(e, TimeoutError) else "llm.error")
+        metrics.record_timing(f"llm.{operation}.failed", time.perf_counter() - start)
+        raise LLMUnavailableError(f"LLM call failed: {e}") from e
+
+    breaker.record_success()
+    if attempts > 1:
+        metrics.increment("llm.hedged")
+    elapsed = time.perf_counter() - start
+    metrics.record_timing("llm.call", elapsed)
+    metrics.record_timing(f"llm.{operation}", elapsed)
+    return response
+
+
+def resilient_chat_stream(messages, temperature=0.3, operation="stream"):
+    """
+    Streaming variant: breaker and deadline only (a stream can't be hedged once it has started
+    sending). Yields chunks; errors surface as LLMUnavailableError.
+    """
+    breaker = get_breaker()
+    if not breaker.allow():
+        metrics.increment("llm.rejected")
+        raise LLMUnavailableError("LLM temporarily unavailable (circuit open)")
+
+    deadline = float(get_setting("LLM_TIMEOUT_SECONDS", 20))
+    start = time.perf_counter()
+    try:
+        for chunk in chat_completion(messages, temperature=temperature, stream=True, timeout=deadline):
+            if time.perf_counter() - start > deadline:
+                raise TimeoutError(f"LLM stream exceeded its {deadline}s deadline")
+            yield chunk
+    except GeneratorExit:
+        breaker.release()
+        raise
+    except Exception as e:
+        breaker.record_failure()
+        metrics.increment("llm.timeout" if isinstance(e, TimeoutError) else "llm.error")
+        raise LLMUnavailableError(f"LLM call failed: {e}") from e
+
+    breaker.record_success()
+    elapsed = time.perf_counter() - start
+    metrics.record_timing("llm.call", elapsed)
+    metrics.record_timing(f"llm.{operation}", elapsed)
@@ -0,0 +1,253 @@
+import re
+
+# Same conversions the LLM prompt asks for
+KG_TO_LBS = 2.20462
+KM_TO_MI = 0.621371
+
+# Mirrors the "Exercise Normalization Guardrails" section of the parse prompt
+EXERCISE_ALIASES = {
+    "pullup": "pull-ups",
+    "pullups": "pull-ups",
+    "pull-up": "pull-ups",
+    "pull up": "pull-ups",
+    "pull ups": "pull-ups",
+    "pushup": "push-ups",
+    "pushups": "push-ups",
+    "push-up": "push-ups",
+    "push up": "push-ups",
+    "push ups": "push-ups",
+    "chinup": "chin-ups",
+    "chinups": "chin-ups",
+    "chin-up": "chin-ups",
+    "chin up": "chin-ups",
+    "chin ups": "chin-ups",
+    "situp": "sit-ups",
+    "situps": "sit-ups",
+    "sit-up": "sit-ups",
+    "sit up": "sit-ups",
+    "sit ups": "sit-ups",
+    "bench": "bench press",
+    "benchpress": "bench press",
+}
+
+SPELLING_FIXES = {
+    "dumbell": "dumbbell",
+    "dumbells": "dumbbells",
+}
+
+CARDIO_VERBS = {
+    "ran": "running",
+    "run": "running",
+    "jogged": "running",
+    "jog": "running",
+    "walked": "walking",
+    "walk": "walking",
+    "swam": "swimming",
+    "swim": "swimming",
+    "biked": "cycling",
+    "bike": "cycling",
+    "cycled": "cycling",
+    "rode": "cycling",
+    "rowed": "rowing",
+    "hiked": "hiking",
+    "hike": "hiking",
+    "running": "running",
+    "jogging": "running",
+    "walking": "walking",
+    "swimming": "swimming",
+    "biking": "cycling",
+    "cycling": "cycling",
+    "rowing": "rowing",
+    "hiking": "hiking",
+}
+
+# Anything that looks like a goal or a date needs the LLM (relative dates, goal schema)
+DEFER_TO_LLM_PATTERN = re.compile(
+    r"\b(want|goal|plan|aim|hope|hoping|target|try|trying|next|by|until|tomorrow|yesterday|today|tonight|"
+    r"last|this|week|month|year|daily|weekly|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)\b|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}"
+)
+
+SEGMENT_SPLIT_PATTERN = re.compile(r"\s*(?:[;\n]|,(?!\d)|\.(?!\d)|\band\b|\bthen\b|\bplus\b)\s*")
+FILLER_PATTERN = re.compile(r"^(?:(?:i|also|did|do|went|finally|just)\s+)+")
+
+NUM = r"\d+(?:\.\d+)?"
+WEIGHT_UNIT = r"lbs?|pounds?|kgs?|kilos?|kilograms?"
+DISTANCE_UNIT = r"mi|miles?|km|kms|kilometers?|kilometres?|k"
+DURATION = r"\d{1,2}:\d{2}(?::\d{2})?|" + NUM + r"\s*(?:minutes?|mins?|hours?|hrs?|h)\b"
+VERBS = "|".join(sorted(CARDIO_VERBS, key=len, reverse=True))
+EXERCISE = r"[a-z][a-z\s\-']*?"
+
+STRENGTH_PATTERNS = [
+    # "bench 3x10 @135", "pullups 4x8", "squat 5x5 at 100kg", "bench 3x10x135"
+    re.compile(
+        rf"^(?P<exercise>{EXERCISE})\s*:?\s+(?P<sets>\d+)\s*[x×]\s*(?P<reps>\d+)"
+        rf"(?:\s*(?:@|at|x|×)\s*(?P<weight>{NUM})\s*(?P<unit>{WEIGHT_UNIT})?)?$"
+    ),
+    # "3 sets of 10 squats at 185 lbs", "4 sets of 8 reps pull-ups"
+    re.compile(
+        rf"^(?P<sets>\d+)\s*sets?\s+of\s+(?P<reps>\d+)\s*(?:reps?\s+(?:of\s+)?)?(?P<exercise>{EXERCISE})"
+        rf"(?:\s+(?:@|at|with)\s*(?P<weight>{NUM})\s*(?P<unit>{WEIGHT_UNIT})?)?$"
+    ),
+]
+
+CARDIO_PATTERNS = [
+    # "ran 3.1mi in 27:30", "swam 1 mile in 40 minutes"
+    re.compile(
+        rf"^(?P<verb>{VERBS})\s+(?:for\s+)?(?P<distance>{NUM})\s*(?P<dunit>{DISTANCE_UNIT})\b"
+        rf"(?:\s+in\s+(?P<duration>{DURATION}))?$"
+    ),
+    # "5k run in 25:00"
+    re.compile(
+        rf"^(?P<distance>{NUM})\s*(?P<dunit>{DISTANCE_UNIT})\s+(?P<verb>{VERBS})\b"
+        rf"(?:\s+in\s+(?P<duration>{DURATION}))?$"
+    ),
+    # "biked for 45 minutes", "walked 1:10:00"
+    re.compile(
+        rf"^(?P<verb>{VERBS})\s+(?:for\s+)?(?P<duration>{DURATION})$"
+    ),
+]
+
+
+def normalize_exercise_name(name):
+    name = " ".join(name.strip().lower().split())
+    for wrong, right in SPELLING_FIXES.items():
+        name = re.sub(rf"\b{wrong}\b", right, name)
+    return EXERCISE_ALIASES.get(name, name)
+
+
+def to_number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def to_lbs(weight, unit):
+    if unit and unit.startswith("k"):
+        return round(weight * KG_TO_LBS, 1)
+    return to_number(weight)
+
+
+def to_miles(distance, unit):
+    if unit and unit.startswith("k"):
+        return round(distance * KM_TO_MI, 2)
+    return to_number(distance)
+
+
+def parse_duration(text, distance=None):
+    """Returns minutes, or None when a clock-style value is ambiguous."""
+    text = text.strip()
+
+    if ":" in text:
+        parts = [int(p) for p in text.split(":")]
+        if len(parts) == 3:
+            return parts[0] * 60 + parts[1] + parts[2] / 60
+
+        minutes = parts[0] + parts[1] / 60
+        if distance:
+            # "10mi in 1:20" is h:mm — nobody runs a sub-3:00 mile
+            if minutes / distance < 3:
+                return parts[0] * 60 + parts[1]
+            return minutes
+        return None
+
+    value = float(re.match(NUM, text).group())
+    if re.search(r"h", text):
+        return value * 60
+    return value
+
+
+def parse_strength_segment(segment):
+    for pattern in STRENGTH_PATTERNS:
+        match = pattern.match(segment)
+        if not match:
+            continue
+
+        exercise = normalize_exercise_name(match.group("exercise"))
+        if not exercise or exercise in CARDIO_VERBS:
+            return None
+
+        sets = int(match.group("sets"))
+        reps = int(match.group("reps"))
+        if sets <= 0 or sets > 20 or reps <= 0:
+            return None
+
+        weight = None
+        if match.group("weight"):
+            weight = to_lbs(float(match.group("weight")), match.group("unit"))
+
+        sets_details = []
+        for i in range(1, sets + 1):
+            set_data = {"set_number": i, "reps": reps}
+            if weight is not None:
+                set_data["weight"] = weight
+            sets_details.append(set_data)
+
+        return {
+            "type": "strength",
+            "exercise": exercise,
+            "sets_details": sets_details,
+        }
+    return None
+
+
+def parse_cardio_segment(segment):
+    for pattern in CARDIO_PATTERNS:
+        match = pattern.match(segment)
+        if not match:
+            continue
+
+        entry = {
+            "type": "cardio",
+            "exercise": CARDIO_VERBS[match.group("verb")],
+        }
+
+        distance = None
+        if "distance" in match.groupdict() and match.group("distance"):
+            distance = to_miles(float(match.group("distance")), match.group("dunit"))
+            entry["distance"] = distance
+
+        if match.group("duration"):
+            duration = parse_duration(match.group("duration"), distance)
+            if duration is None:
+                return None
+            entry["duration"] = to_number(round(duration, 2))
+
+        return entry
+    return None
+
+
+def parse_shorthand(text):
+    """
+    Parses common workout shorthand without the LLM.
+    Returns (structured_response, confidence) where structured_response has the same
+    shape as parse_workout_and_goals output, or (None, 0.0) if nothing was recognized.
+    Confidence is the share of the text covered by recognized segments.
+    """
+    lowered = (text or "").lower().strip()
+    if not lowered:
+        return None, 0.0
+
+    entries = []
+    matched_chars = 0
+    total_chars = 0
+
+    for raw_segment in SEGMENT_SPLIT_PATTERN.split(lowered):
+        segment = FILLER_PATTERN.sub("", raw_segment.strip())
+        if not segment:
+            continue
+
+        total_chars += len(segment)
+        entry = parse_strength_segment(segment) or parse_cardio_segment(segment)
+        if entry:
+            entries.append(entry)
+            matched_chars += len(segment)
+
+    if not entries:
+        return None, 0.0
+
+    structured_response = {"entries": entries, "notes": "", "goals": []}
+
+    if DEFER_TO_LLM_PATTERN.search(lowered):
+        return structured_response, 0.0
+
+    return structured_response, round(matched_chars / total_chars, 3)
@@ -0,0 +1,451 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import or_, func
+
+from models import WorkoutSession, WorkoutEntry, StrengthEntry, CardioEntry, PersonalRecord, ParseStatusEnum
+from models.goal import (
+    Goal, GoalProgress, GoalTypeEnum, ExerciseTypeEnum, MetricEnum, GoalTarget, GoalAccumulator, GoalPeriod, RepeatIntervalEnum,
+)
+from utils.pr_utils import track_prs_for_session, session_pr_keys, recompute_pr_chains, strength_exercise_ids
+from utils.rep_max_utils import rebuild_rep_maxes
+from utils.activity_utils import refresh_activity_days
+from utils.goal_utils import (
+    evaluate_goal, serialize_progress, session_goal_scope, merge_goal_scopes, find_affected_goals,
+    load_sessions_for_goals, sessions_in_goal_window, snapshot_goal_contributions, apply_goal_deltas, goal_fingerprint,
+)
+from utils.openai_utils import clean_entries
+from utils.exercise_catalog import resolve_exercise, get_exercise_name
+from utils.workout_parser import parse_workout_text, stream_parse_workout_text, parse_locally_degraded
+from utils.llm_resilience import LLMUnavailableError, is_llm_available
+from utils.recommendation_cache import invalidate_recommendations
+from init import db
+
+logger = logging.getLogger(__name__)
+
+
+def goal_summary(goal):
+    """Shape of added and repeated goals in log responses."""
+    return {
+        "id": goal.id,
+        "name": goal.name,
+        "description": goal.description,
+        "start_date": goal.start_date.isoformat(),
+        "end_date": goal.end_date.isoformat() if goal.end_date else None,
+        "goal_type": goal.goal_type.value,
+        "repeat_interval": goal.repeat_interval.value if goal.repeat_interval else None,
+        "exercise_type": goal.exercise_type.value if goal.exercise_type else None,
+        "exercise_name": goal.exercise_name,
+        "targets": [
+            {"target_metric": t.metric.value, "target_value": t.value}
+            for t in goal.targets
+        ]
+    }
+
+
+def find_duplicate_goal(fingerprint, session, allow_same_session_duplicate, start_date, recurring):
+    """One probe of the fingerprint index for an existing goal with the same definition."""
+    query = Goal.query.filter(Goal.fingerprint == fingerprint)
+    if not allow_same_session_duplicate:
+        query = query.filter(Goal.session_id != session.id)
+    if recurring:
+        # Restating a recurring goal ("again this week") matches the series that is still running
+        query = query.filter(or_(Goal.end_date == None, Goal.end_date >= start_date))
+    return query.order_by(Goal.id).first()
+
+
+def process_goals_for_session(goals, user_id, session, allow_same_session_duplicate=False):
+    """
+    Stores the parsed goals that are not already defined, returning (added, repeated) summaries.
+    Each goal costs one fingerprint lookup; the new ones are inserted together in one flush.
+    """
+    added_goals = []
+    repeated_goals = []
+    new_goals = {}
+
+    for goal in goals:
+        try:
+            start_date = datetime.strptime(goal["start_date"], "%Y-%m-%d").date()
+            end_date = datetime.strptime(goal["end_date"], "%Y-%m-%d").date() if goal.get("end_date") else None
+            goal_type = GoalTypeEnum(goal["goal_type"])
+            repeat_interval = RepeatIntervalEnum(goal["repeat_interval"]) if goal.get("repeat_interval") else None
+            exercise_type = ExerciseTypeEnum(goal["exercise_type"]) if goal.get("exercise_type") else None
+            exercise_id = resolve_exercise(goal.get("exercise_name"), exercise_type.value if exercise_type else None)
+            exercise_name = get_exercise_name(exercise_id) or goal.get("exercise_name")
+            targets = goal.get("targets", [])
+
+            if not isinstance(targets, list) or not targets:
+                raise ValueError("Goal must include at least one target metric.")
+
+            for target in targets:
+                if not isinstance(target, dict) or "target_metric" not in target or "target_value" not in target:
+                    raise ValueError("Each target must include 'target_metric' and 'target_value'.")
+
+            target_pairs = [(MetricEnum(t["target_metric"]), float(t["target_value"])) for t in targets]
+            fingerprint = goal_fingerprint(
+                user_id, start_date, end_date, goal_type, repeat_interval, exercise_type, exercise_name, target_pairs
+            )
+
+            logger.debug(
+                "Processing goal for user %s: %s to %s, type=%s, exercise_type=%s, exercise=%s, targets=%s, fingerprint=%s",
+                user_id, start_date, end_date, goal_type, exercise_type, exercise_name, targets, fingerprint,
+            )
+
+            if fingerprint in new_goals:
+                continue  # stated twice in the same entry
+
+            duplicate_goal = find_duplicate_goal(
+                fingerprint, session, allow_same_session_duplicate, start_date, recurring=repeat_interval is not None
+            )
+            if duplicate_goal:
+                logger.debug("Goal %s has the same fingerprint, skipping creation", duplicate_goal.id)
+                repeated_goals.append(goal_summary(duplicate_goal))
+                continue
+
+            goal_obj = Goal(
+                user_id=user_id,
+                session_id=session.id,
+                name=goal.get("name", f"{goal_type.value.capitalize()} goal for {exercise_name or 'general'}"),
+                description=goal.get("description", ""),
+                start_date=start_date,
+                end_date=end_date,
+                goal_type=goal_type,
+                repeat_interval=repeat_interval,
+                exercise_type=exercise_type,
+                exercise_name=exercise_name,
+                exercise_id=exercise_id,
+                fingerprint=fingerprint,
+                created_at=datetime.utcnow(),
+            )
+            goal_obj.targets = [GoalTarget(metric=metric, value=value) for metric, value in target_pairs]
+            new_goals[fingerprint] = goal_obj
+
+        except Exception:
+            logger.warning("Error processing goal %s", goal, exc_info=True)
+
+    if new_goals:
+        db.session.add_all(new_goals.values())
+        db.session.flush()
+        added_goals = [goal_summary(g) for g in new_goals.values()]
+
+    return added_goals, repeated_goals
+
+
+def parse_stage(raw_text, stream=False, today_override=None):
+    """Yields ("parse_progress", ...) events when streaming, then ("parse_result", structured_response)."""
+    if not stream:
+        yield "parse_result", parse_workout_text(raw_text, today_override=today_override)
+        return
+
+    for kind, value in stream_parse_workout_text(raw_text, today_override=today_override):
+        if kind == "progress":
+            yield "parse_progress", value
+        else:
+            yield "parse_result", value
+
+
+def evaluate_user_goals(user_id, session, collect_progress=False, previous_scope=None, goal_ids=()):
+    """
+    Re-evaluates the goals `session` can affect after it changed: active goals whose exercise and
+    date window intersect the session (or its pre-edit `previous_scope`), plus `goal_ids`.
+    Each goal only sees the sessions inside its own window. Optionally returns the new progress rows.
+    """
+    last_progress_id = None
+    if collect_progress:
+        last_progress_id = db.session.query(func.max(GoalProgress.id)).scalar() or 0
+
+    scope = merge_goal_scopes([session_goal_scope(session), previous_scope])
+    goals = find_affected_goals(user_id, scope, goal_ids)
+    sessions = load_sessions_for_goals(user_id, goals)
+    for goal in goals:
+        evaluate_goal(goal, sessions_in_goal_window(goal, sessions), session)
+
+    db.session.commit()
+
+    if not collect_progress:
+        return []
+
+    new_progress = (
+        GoalProgress.query.join(Goal, Goal.id == GoalProgress.goal_id)
+        .filter(Goal.user_id == user_id, GoalProgress.id > last_progress_id)
+        .order_by(GoalProgress.id.asc())
+        .all()
+    )
+    return [serialize_progress(p) for p in new_progress]
+
+
+def collect_result(stages):
+    """Runs a stage generator to completion and returns (response_body, status_code) from its final event."""
+    for event, payload in stages:
+        if event in ("done", "error"):
+            body = dict(payload)
+            status_code = body.pop("status_code")
+            return body, status_code
+    raise RuntimeError("Pipeline ended without a result")
+
+
+def iter_log_workout(user_id, raw_text, today_date, session_time, stream=False, today_override=None):
+    """
+    Runs the log pipeline (parse -> entries -> PRs -> goals) for one journal entry, yielding
+    (event, payload) as each stage finishes. The final event is "done" or "error"; its payload
+    is the /api/log-workout response body plus a "status_code" key. `today_override` (YYYY-MM-DD)
+    is the day relative dates in the text resolve against; it defaults to when the parse runs.
+    """
+    try:
+        structured_response = None
+        for event, payload in parse_stage(raw_text, stream, today_override):
+            if event == "parse_progress":
+                yield event, payload
+            else:
+                structured_response = payload
+
+        entries = structured_response.get("entries", [])
+        goals = structured_response.get("goals", [])
+        notes = structured_response.get("notes", "")
+        date_str = structured_response.get("date")
+        parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
+        valid_entries = [e for e in clean_entries(entries) if "exercise" in e]
+    except LLMUnavailableError as e:
+        yield from iter_degraded_log_workout(user_id, raw_text, today_date, session_time, str(e))
+        return
+    except Exception as e:
+        yield "error", {"success": False, "error": str(e), "status_code": 400}
+        return
+
+    yield "parsed", {"entries": valid_entries, "goals": goals, "notes": notes, "date": date_str}
+
+    session = WorkoutSession(user_id=user_id, date=parsed_date or today_date, raw_text=raw_text, notes=notes, time=session_time)
+    db.session.add(session)
+    db.session.commit()
+
+    new_prs = []
+    if valid_entries:
+        entries_added = [WorkoutEntry.from_dict(item, session.id) for item in valid_entries]
+        invalidate_recommendations(user_id, [e.exercise_id for e in entries_added])
+        apply_goal_deltas(user_id, session, {})
+
+    refresh_activity_days(user_id, [session.date])
+    db.session.commit()
+
+    yield "session", {"session_id": session.id, "session_date": session.date.isoformat()}
+
+    if valid_entries:
+        new_prs = track_prs_for_session(session, valid_entries)
+
+    yield "prs", {"new_prs": new_prs}
+
+    added_goals, repeated_goals = process_goals_for_session(goals, user_id, session)
+
+    if added_goals:
+        db.session.commit()
+
+    yield "goals", {"goals_added": len(added_goals), "goals": added_goals, "repeated_goals": repeated_goals}
+
+    progress = evaluate_user_goals(user_id, session, collect_progress=stream, goal_ids=[g["id"] for g in added_goals])
+
+    yield "goal_evaluation", {"progress": progress}
+
+    yield "done", {
+        "success": True,
+        "message": "Workout entry created successfully!" if valid_entries else "Workout session created (notes only)",
+        "session_id": session.id,
+        "session_date": session.date.isoformat(),
+        "raw_text": raw_text,
+        "new_prs": new_prs,
+        "goals_added": len(added_goals),
+        "goals": added_goals,
+        "repeated_goals": repeated_goals,
+        "status_code": 201
+    }
+
+
+def iter_degraded_log_workout(user_id, raw_text, today_date, session_time, reason):
+    """
+    Fallback for iter_log_workout while the LLM is unavailable: stores the raw text with whatever
+    the local parser recognized and marks the session pending, so `flask reparse-pending` can
+    re-run the full parse later. Goals are not extracted until then.
+    """
+    structured_response = parse_locally_degraded(raw_text)
+    valid_entries = [e for e in clean_entries(structured_response.get("entries", [])) if "exercise" in e]
+
+    yield "parsed", {"entries": valid_entries, "goals": [], "notes": "", "date": None, "parse_status": "pending"}
+
+    session = WorkoutSession(
+        user_id=user_id,
+        date=today_date,
+        raw_text=raw_text,
+        notes="",
+        time=session_time,
+        parse_status=ParseStatusEnum.pending,
+    )
+    db.session.add(session)
+    db.session.commit()
+
+    entries_added = [WorkoutEntry.from_dict(item, session.id) for item in valid_entries]
+    invalidate_recommendations(user_id, [e.exercise_id for e in entries_added])
+    apply_goal_deltas(user_id, session, {})
+    refresh_activity_days(user_id, [session.date])
+    db.session.commit()
+
+    yield "session", {"session_id": session.id, "session_date": session.date.isoformat()}
+
+    new_prs = track_prs_for_session(session, valid_entries) if valid_entries else []
+
+    yield "prs", {"new_prs": new_prs}
+
+    progress = evaluate_user_goals(user_id, session, collect_progress=True)
+
+    yield "goal_evaluation", {"progress": progress}
+
+    yield "done", {
+        "success": True,
+        "message": "Workout saved. Full parsing is delayed and will be retried.",
+        "session_id": session.id,
+        "session_date": session.date.isoformat(),
+        "raw_text": raw_text,
+        "parse_status": "pending",
+        "degraded_reason": reason,
+        "new_prs": new_prs,
+        "goals_added": 0,
+        "goals": [],
+        "repeated_goals": [],
+        "status_code": 202
+    }
+
+
+def log_workout_for_user(user_id, raw_text, today_date, session_time, today_override=None):
+    """Returns (response_body, status_code) matching what /api/log-workout responds with."""
+    return collect_result(iter_log_workout(user_id, raw_text, today_date, session_time, today_override=today_override))
+
+
+def iter_edit_workout(user_id, session, raw_text, stream=False, today_override=None):
+    """Edit counterpart of iter_log_workout: re-parses raw_text and rebuilds the session in place."""
+    try:
+        structured_response = None
+        for event, payload in parse_stage(raw_text, stream, today_override):
+            if event == "parse_progress":
+                yield event, payload
+            else:
+                structured_response = payload
+
+        entries = structured_response.get("entries", [])
+        goals = structured_response.get("goals", [])
+        notes = structured_response.get("notes", "")
+        date_str = structured_response.get("date")
+        parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
+        cleaned_entries = clean_entries(entries)
+    except LLMUnavailableError as e:
+        yield "error", {"success": False, "error": str(e), "status_code": 503}
+        return
+    except Exception as e:
+        yield "error", {"success": False, "error": str(e), "status_code": 400}
+        return
+
+    yield "parsed", {"entries": cleaned_entries, "goals": goals, "notes": notes, "date": date_str}
+
+    # PR chains and goals the old entries took part in have to be revisited as well as the new ones
+    previous_date = session.date
+    previous_pr_keys = session_pr_keys(session.id)
+    previous_goal_scope = session_goal_scope(session)
+    previous_goal_contributions = snapshot_goal_contributions(user_id, session)
+
+    entry_ids = [e.id for e in WorkoutEntry.query.filter_by(session_id=session.id).all()]
+    StrengthEntry.query.filter(StrengthEntry.entry_id.in_(entry_ids)).delete(synchronize_session=False)
+    CardioEntry.query.filter(CardioEntry.entry_id.in_(entry_ids)).delete(synchronize_session=False)
+    WorkoutEntry.query.filter(WorkoutEntry.id.in_(entry_ids)).delete(synchronize_session=False)
+
+    # Delete associated goals and their targets
+    goals_to_delete = Goal.query.filter_by(session_id=session.id).all()
+    for goal in goals_to_delete:
+        GoalTarget.query.filter_by(goal_id=goal.id).delete(synchronize_session=False)
+        GoalAccumulator.query.filter_by(goal_id=goal.id).delete(synchronize_session=False)
+        GoalPeriod.query.filter_by(goal_id=goal.id).delete(synchronize_session=False)
+    Goal.query.filter_by(session_id=session.id).delete(synchronize_session=False)
+
+    for item in cleaned_entries:
+        WorkoutEntry.from_dict(item, session.id)
+
+    # Both the removed and the new exercises' histories changed
+    invalidate_recommendations(user_id)
+
+    session.raw_text = raw_text
+    session.notes = notes
+    session.parse_status = ParseStatusEnum.parsed
+    if parsed_date:
+        session.date = parsed_date
+
+    apply_goal_deltas(user_id, session, previous_goal_contributions)
+
+    PersonalRecord.query.filter_by(session_id=session.id).delete(synchronize_session=False)
+    db.session.flush()
+    refresh_activity_days(user_id, [previous_date, session.date])
+
+    yield "session", {"session_id": session.id, "session_date": session.date.isoformat()}
+
+    changed_pr_keys = previous_pr_keys | session_pr_keys(session.id)
+    replayed = recompute_pr_chains(user_id, changed_pr_keys, min(previous_date, session.date))
+    new_prs = [pr for pr in replayed if pr["session_id"] == session.id]
+    rebuild_rep_maxes(user_id, strength_exercise_ids(changed_pr_keys))
+    db.session.commit()
+
+    yield "prs", {"new_prs": new_prs}
+
+    added_goals, repeated_goals = process_goals_for_session(goals, user_id, session, allow_same_session_duplicate=True)
+    if added_goals:
+        db.session.commit()
+
+    yield "goals", {"goals_added": len(added_goals), "goals": added_goals, "repeated_goals": repeated_goals}
+
+    progress = evaluate_user_goals(
+        user_id, session, collect_progress=stream,
+        previous_scope=previous_goal_scope, goal_ids=[g["id"] for g in added_goals],
+    )
+
+    yield "goal_evaluation", {"progress": progress}
+
+    yield "done", {
+        "success": True,
+        "message": "Workout session updated successfully.",
+        "session_id": session.id,
+        "session_date": session.date.isoformat(),
+        "raw_text": raw_text,
+        "new_prs": new_prs,
+        "goals_added": len(added_goals),
+        "goals": added_goals,
+        "repeated_goals": repeated_goals,
+        "status_code": 200
+    }
+
+
+def edit_workout_for_user(user_id, session, raw_text, today_override=None):
+    return collect_result(iter_edit_workout(user_id, session, raw_text, today_override=today_override))
+
+
+def reparse_pending_sessions(limit=None):
+    """
+    Re-runs the full parse for sessions stored while the LLM was unavailable.
+    Stops early if the LLM becomes unavailable again. Returns (reparsed, failed) session ids.
+    """
+    query = WorkoutSession.query.filter_by(parse_status=ParseStatusEnum.pending).order_by(WorkoutSession.id.asc())
+    if limit:
+        query = query.limit(limit)
+
+    reparsed, failed = [], []
+    for session in query.all():
+        if not is_llm_available():
+            break
+
+        # Relative dates ("yesterday") resolve against the day the entry was originally logged
+        body, status_code = edit_workout_for_user(
+            session.user_id, session, session.raw_text, today_override=session.date.isoformat()
+        )
+        if status_code == 503:
+            db.session.rollback()
+            break
+        if status_code >= 400:
+            db.session.rollback()
+            failed.append(session.id)
+            continue
+        reparsed.append(session.id)
+
+    return reparsed, failed
@@ -0,0 +1,145 @@
+import json
+import logging
+import random
+import time
+import uuid
+from contextvars import ContextVar
+
+from flask import g, request
+
+# Structured logging. Modules log through logging.getLogger(__name__) with %-style arguments,
+# so nothing is formatted unless a handler emits the record. Anything more expensive than an
+# argument list (extra queries, array reductions) goes behind debug_enabled(logger).
+_request_id = ContextVar("request_id", default=None)
+_trace_id = ContextVar("trace_id", default=None)
+_sampled = ContextVar("debug_sampled", default=True)
+
+# Attributes every LogRecord has; anything else was passed through `extra` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "trace_id"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+def bind_context(request_id=None, trace_id=None, sample_rate=1.0):
+    """
+    Sets the ids attached to every record logged from this thread or task, and rolls the dice
+    once for debug sampling so a sampled request keeps all of its debug lines.
+    """
+    request_id = request_id or new_id()
+    _request_id.set(request_id)
+    _trace_id.set(trace_id or request_id)
+    _sampled.set(sample_rate >= 1 or random.random() < sample_rate)
+    return request_id
+
+
+def clear_context():
+    _request_id.set(None)
+    _trace_id.set(None)
+    _sampled.set(True)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def debug_enabled(logger):
+    """True only when the logger would emit DEBUG for the current request; guard diagnostics with it."""
+    return logger.isEnabledFor(logging.DEBUG) and _sampled.get()
+
+
+def trace_id_from_header(value):
+    """Trace id of a W3C traceparent header (version-traceid-parentid-flags), or None."""
+    parts = (value or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32:
+        return parts[1]
+    return None
+
+
+class ContextFilter(logging.Filter):
+    """Stamps request/trace ids on records and drops unsampled DEBUG records."""
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and not _sampled.get():
+            return False
+        record.request_id = _request_id.get() or "-"
+        record.trace_id = _trace_id.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "trace_id": getattr(record, "trace_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def parse_levels(spec):
+    """'utils.goal_utils=DEBUG,routes=WARNING' -> {'utils.goal_utils': 'DEBUG', 'routes': 'WARNING'}"""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    """Installs the handler, per-module levels and request id hooks. Safe to call more than once."""
+    handler = logging.StreamHandler()
+    handler.addFilter(ContextFilter())
+    if app.config.get("LOG_FORMAT", "text") == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if getattr(h, "_fitness_handler", False)]:
+        root.removeHandler(existing)
+    handler._fitness_handler = True
+    root.addHandler(handler)
+    root.setLevel(app.config.get("LOG_LEVEL", "INFO").upper())
+
+    for name, level in parse_levels(app.config.get("LOG_LEVELS")).items():
+        logging.getLogger(name).setLevel(level)
+
+    sample_rate = app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0)
+    access_log = logging.getLogger("access")
+
+    @app.before_request
+    def _bind_request_context():
+        g.request_id = bind_context(
+            request.headers.get("X-Request-ID"),
+            trace_id_from_header(request.headers.get("traceparent")),
+            sample_rate,
+        )
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        response.headers["X-Request-ID"] = g.get("request_id") or ""
+        started = g.get("request_started")
+        if started is not None and access_log.isEnabledFor(logging.INFO):
+            access_log.info(
+                "%s %s %s", request.method, request.path, response.status_code,
+                extra={"duration_ms": round((time.perf_counter() - started) * 1000, 2)},
+            )
+        return response
+
+    @app.teardown_request
+    def _clear_request_context(exc):
+        clear_context()
@@ -1,17 +1,20 @@
 import json
 
 import pytz
-from openai import OpenAI
 from datetime import date, datetime
 
-client = OpenAI()
+from utils.llm_resilience import resilient_chat_completion, resilient_chat_stream
+from utils.history_summary import summarize_strength_history, format_strength_summary, summarize_cardio_history, format_cardio_summary
 
+# Bump whenever the parse prompt changes so cached parses from the old prompt are not reused
+PARSE_PROMPT_VERSION = 3
 
-# noinspection PyTypeChecker
-def parse_workout_and_goals(text, today_override=None):
-    today = today_override or datetime.now().date().isoformat()
 
-    prompt = f"""
+PARSE_SYSTEM_MESSAGE = "You are a helpful assistant that formats workouts and goals into strict JSON."
+
+
+def build_parse_prompt(text, today):
+    return f"""
     You are a fitness assistant. A user will describe their workout and goals in natural language.
     Convert it into a strict JSON object that matches the required schema. Use **American units only**.
 
@@ -59,21 +62,25 @@ def parse_workout_and_goals(text, today_override=None):
     - "description": detailed description (optional)
     - "start_date": ISO format string
     - "end_date": optional ISO string (for longer goals)
-    - "goal_type": one of: "single_session" or "aggregate"
+    - "goal_type": one of: "single_session", "aggregate" or "streak"
+    - "repeat_interval": optional, one of: "daily", "weekly", "monthly", "yearly" (recurring goals only)
     - "exercise_type": one of: "strength", "cardio", "general"
     - "exercise_name": optional, e.g. "bench press"
     - "targets": list of objects, each with:
-      - "target_metric": one of: "reps", "sets", "distance", "duration", "weight", "sessions", "pace"
+      - "target_metric": one of: "reps", "sets", "distance", "duration", "weight", "sessions", "pace", "days"
       - "target_value": numeric only (American units)
       - Only include one of "duration" or "pace" per target. If "pace" is used, omit duration and distance.
 
     ### Goal Type Guidelines:
     - If a goal mentions repeating something "daily", "weekly", or similar, assume it means "in one day" or "in one week"
+    - Set `repeat_interval` only when the user wants the goal to recur, e.g. "every week", "each day", "every month". The targets describe one interval, and `end_date` is omitted unless the user gives one
+    - "this week" or "by Friday" is a one-off goal: do NOT set `repeat_interval`
     - If a goal mentions "tomorrow", assume it means "by the end of tomorrow" and ensure an end_date is set
     - Default to `goal_type: "single_session"` unless **one of the following is clearly true**:
       - The user explicitly states a **total or combined amount over time**, using words like “total”, “combined”, “cumulative”, or similar
       - The goal is **general or schedule-based**, such as “do cardio 5 times” or “work out 3 days a week”
     - Use `goal_type: "aggregate"` **only** for cumulative goals across multiple sessions, and **only** when the user clearly communicates this intent through specific language
+    - Use `goal_type: "streak"` with a single "days" target for consecutive-day goals such as “work out 7 days in a row” or “run every day for 2 weeks” (target_value 14). Streaks are tracked per exercise_type, so omit exercise_name
     - Use `exercise_type: "general"` for non-exercise-specific goals such as “stay active every day” or “train 4 times a week”
     - If a user says “run X miles in Y minutes”, convert it into a **pace-based goal** using:  
       `pace = duration / distance` (in minutes per mile).  
@@ -162,6 +169,17 @@ def parse_workout_and_goals(text, today_override=None):
           "targets": [
             {{ "target_metric": "pace", "target_value": 8.0 }}
           ]
+        }},
+        {{
+          "name": "Train 4 times a week",
+          "description": "Work out at least 4 times every week",
+          "start_date": "2024-05-13",
+          "goal_type": "aggregate",
+          "repeat_interval": "weekly",
+          "exercise_type": "general",
+          "targets": [
+            {{ "target_metric": "sessions", "target_value": 4 }}
+          ]
         }}
       ]
     }}
@@ -170,25 +188,56 @@ def parse_workout_and_goals(text, today_override=None):
     {text}
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+
+# noinspection PyTypeChecker
+def parse_workout_and_goals(text, today_override=None):
+    today = today_override or datetime.now().date().isoformat()
+    prompt = build_parse_prompt(text, today)
+
+    response = resilient_chat_completion(
         messages=[
             {
                 "role": "system",
-                "content": "You are a helpful assistant that formats workouts and goals into strict JSON."
+                "content": PARSE_SYSTEM_MESSAGE
             },
             {
                 "role": "user",
                 "content": prompt
             }
         ],
-        temperature=0.3
+        temperature=0.3,
+        operation="parse"
     )
 
     content = response.choices[0].message.content
     return json.loads(content)
 
 
+def stream_parse_workout_and_goals(text, today_override=None):
+    """
+    Streaming variant of parse_workout_and_goals.
+    Yields raw content deltas as they arrive; the caller joins them and json-loads the result.
+    """
+    today = today_override or datetime.now().date().isoformat()
+    prompt = build_parse_prompt(text, today)
+
+    stream = resilient_chat_stream(
+        messages=[
+            {"role": "system", "content": PARSE_SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        operation="parse_stream"
+    )
+
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
 
 
 def clean_entry(entry):
@@ -230,45 +279,18 @@ def clean_entries(entries):
 
 
 
-def recommend_followup_set(exercise_name, sets_details, goal="increase 1RM slightly"):
+def build_followup_set_prompt(exercise_name, sets_details, goal="increase 1RM slightly", formula="epley"):
     """
-    Recommends a follow-up set scheme for a strength exercise using OpenAI.
-    Ensures small progression in either 1RM or total volume (or both).
+    Builds the recommend_followup_set prompt from a fixed-size summary of the history
+    (see utils.history_summary), so its length does not grow with training age.
     """
-    from collections import defaultdict
-    import json
+    summary = summarize_strength_history(sets_details, formula)
+    has_weights = summary["has_weights"]
+    avg_sets = summary["avg_sets_per_session"]
+    total_volume = summary["avg_session_volume"]
+    peak_1rm = summary["best_e1rm"]["value"] if summary["best_e1rm"] else None
 
-    valid_sets = [s for s in sets_details if 'reps' in s and 'set_number' in s and 'session_id' in s]
-    has_weights = any("weight" in s and s["weight"] and s["weight"] > 0 for s in valid_sets)
-
-    session_counts = defaultdict(int)
-    for s in valid_sets:
-        session_counts[s["session_id"]] += 1
-
-    num_sessions = len(session_counts)
-    total_sets = len(valid_sets)
-    avg_sets = round(total_sets / num_sessions) if num_sessions > 0 else total_sets
-
-    if has_weights:
-        total_volume = sum(
-            s["reps"] * s["weight"]
-            for s in valid_sets
-            if isinstance(s.get("weight"), (int, float)) and s["weight"] > 0
-        )
-        peak_1rm = max(
-            s["weight"] / (1.0278 - 0.0278 * s["reps"])  # Epley formula
-            for s in valid_sets
-            if s["reps"] > 0 and s["weight"] > 0
-        )
-    else:
-        total_volume = sum(s["reps"] for s in valid_sets)
-        peak_1rm = None  # Not used
-
-    formatted_sets = "\n".join(
-        f"- Set {s['set_number']} (Session {s['session_id']}): {s['reps']} reps" +
-        (f" at {s['weight']} lbs" if has_weights else "")
-        for s in valid_sets
-    )
+    formatted_sets = format_strength_summary(summary)
 
     guidelines = f"""
 Guidelines:
@@ -314,11 +336,11 @@ Return ONLY strict JSON, exactly in this format:
 }}
 """
 
-    prompt = f"""
+    return f"""
 You are a strength training coach helping an intermediate gym-goer. The user has completed:
 
 Exercise: {exercise_name}
-Performed sets:
+Training history:
 {formatted_sets}
 
 Goal: {goal}
@@ -327,32 +349,37 @@ Goal: {goal}
 Do not include any text outside the JSON block.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+
+def recommend_followup_set(exercise_name, sets_details, goal="increase 1RM slightly", formula="epley"):
+    """
+    Recommends a follow-up set scheme for a strength exercise using OpenAI.
+    Ensures small progression in either 1RM or total volume (or both).
+    """
+    import json
+
+    prompt = build_followup_set_prompt(exercise_name, sets_details, goal, formula)
+
+    response = resilient_chat_completion(
         messages=[
             {"role": "system", "content": "You are a helpful assistant that provides realistic strength training set recommendations."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.3,
+        operation="recommend_set"
     )
 
     content = response.choices[0].message.content
     return json.loads(content)
 
-def recommend_followup_cardio(exercise_name, session_data, goal="improve endurance slightly"):
-    import json
-
+def build_followup_cardio_prompt(exercise_name, session_data, goal="improve endurance slightly"):
+    """Builds the recommend_followup_cardio prompt from a fixed-size summary of the history."""
     # Detect available metrics
     has_distance = any("distance" in s and s["distance"] for s in session_data)
     has_duration = any("duration" in s and s["duration"] for s in session_data)
     has_pace = any("pace" in s and s["pace"] for s in session_data)
 
-    formatted_sessions = "\n".join(
-        f"- Session {s['session_id']} on {s['date']}:"
-        + (f" {s['distance']} miles" if has_distance and s.get("distance") else "")
-        + (f", {s['duration']} min" if has_duration and s.get("duration") else "")
-        + (f", {s['pace']} min/mile" if has_pace and s.get("pace") else "")
-        for s in session_data
+    formatted_sessions = format_cardio_summary(
+        summarize_cardio_history(session_data), has_distance, has_duration, has_pace
     )
 
     guidelines = f"""
@@ -394,24 +421,30 @@ Return valid JSON in this format:
 Only include entries for supported metrics. No text outside the JSON object.
 """
 
-    prompt = f"""
+    return f"""
 You are a cardio coach helping an intermediate user optimize their next training sessions by focusing on individual aspects of their workouts.
 
 Exercise: {exercise_name}
-Past sessions:
+Training history:
 {formatted_sessions}
 
 Goal: {goal}
 {guidelines}
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+
+def recommend_followup_cardio(exercise_name, session_data, goal="improve endurance slightly"):
+    import json
+
+    prompt = build_followup_cardio_prompt(exercise_name, session_data, goal)
+
+    response = resilient_chat_completion(
         messages=[
             {"role": "system", "content": "You are a helpful assistant that gives intelligent cardio training suggestions."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.3,
+        operation="recommend_cardio"
     )
 
     content = response.choices[0].message.content.strip()
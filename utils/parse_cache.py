@@ -0,0 +1,128 @@
+import hashlib
+import json
+import unicodedata
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from init import db
+from models import ParseCacheEntry
+from utils import metrics
+from utils.openai_utils import parse_workout_and_goals, PARSE_PROMPT_VERSION
+
+
+def normalize_text(text):
+    """Collapses whitespace so re-submits that only differ in spacing share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def make_cache_key(text, today, prompt_version=PARSE_PROMPT_VERSION):
+    payload = f"{prompt_version}\x1f{today}\x1f{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_parse(text, today):
+    key = make_cache_key(text, today)
+    entry = ParseCacheEntry.query.filter_by(cache_key=key).first()
+
+    if not entry:
+        metrics.increment("parse_cache.miss")
+        return None
+
+    now = datetime.utcnow()
+    ttl = current_app.config.get("PARSE_CACHE_TTL_SECONDS")
+    if ttl and entry.created_at < now - timedelta(seconds=ttl):
+        db.session.delete(entry)
+        db.session.commit()
+        metrics.increment("parse_cache.expired")
+        metrics.increment("parse_cache.miss")
+        return None
+
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_accessed_at = now
+    db.session.commit()
+
+    metrics.increment("parse_cache.hit")
+    return json.loads(entry.response)
+
+
+def store_parse(text, today, structured_response):
+    entry = ParseCacheEntry(
+        cache_key=make_cache_key(text, today),
+        prompt_version=PARSE_PROMPT_VERSION,
+        reference_date=today,
+        normalized_text=normalize_text(text),
+        response=json.dumps(structured_response),
+    )
+    db.session.add(entry)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request (e.g. a double-submit) stored the same key first
+        db.session.rollback()
+        return
+
+    evict_parse_cache()
+
+
+def evict_parse_cache(max_entries=None):
+    """Drops least recently used rows beyond PARSE_CACHE_MAX_ENTRIES. Returns the number removed."""
+    max_entries = max_entries if max_entries is not None else current_app.config.get("PARSE_CACHE_MAX_ENTRIES")
+    if not max_entries:
+        return 0
+
+    overflow = ParseCacheEntry.query.count() - max_entries
+    if overflow <= 0:
+        return 0
+
+    stale_ids = [
+        row.id for row in
+        db.session.query(ParseCacheEntry.id)
+        .order_by(ParseCacheEntry.last_accessed_at.asc(), ParseCacheEntry.id.asc())
+        .limit(overflow)
+        .all()
+    ]
+    ParseCacheEntry.query.filter(ParseCacheEntry.id.in_(stale_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+    metrics.increment("parse_cache.evicted", len(stale_ids))
+    return len(stale_ids)
+
+
+def cached_parse_workout_and_goals(text, today_override=None):
+    """
+    Drop-in replacement for parse_workout_and_goals that checks the parse_cache table first.
+    The key uses the same "today" value the prompt is built with, so relative dates stay correct.
+    """
+    today = today_override or datetime.now().date().isoformat()
+
+    if not current_app.config.get("PARSE_CACHE_ENABLED", True):
+        with metrics.timed("parse.llm"):
+            return parse_workout_and_goals(text, today_override=today)
+
+    with metrics.timed("parse.cache_lookup"):
+        cached = get_cached_parse(text, today)
+    if cached is not None:
+        return cached
+
+    with metrics.timed("parse.llm"):
+        structured_response = parse_workout_and_goals(text, today_override=today)
+    store_parse(text, today, structured_response)
+    return structured_response
+
+
+def get_parse_cache_stats():
+    counters = metrics.snapshot()["counters"]
+    hits = counters.get("parse_cache.hit", 0)
+    misses = counters.get("parse_cache.miss", 0)
+    lookups = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "expired": counters.get("parse_cache.expired", 0),
+        "evicted": counters.get("parse_cache.evicted", 0),
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+        "entries": ParseCacheEntry.query.count(),
+    }
@@ -1,18 +1,57 @@
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import func
+
 from init import db
-from models import PersonalRecord, WorkoutEntry, StrengthEntry, CardioEntry, WorkoutSession
+from models import PersonalRecord, PRBest, WorkoutEntry, StrengthEntry, CardioEntry, WorkoutSession
+from utils import metrics
+from utils.exercise_catalog import resolve_exercise, get_exercise_name
+from utils.rep_max_utils import track_rep_maxes_for_session, rebuild_rep_maxes
 
-def track_prs_for_session(session, entries):
-    new_prs = []
-    user_id = session.user_id
+# (type, field) -> (value column, source table, extra filters). Mirrors what collect_pr_candidates extracts.
+PR_FIELDS = {
+    ("strength", "weight"): (StrengthEntry.weight, StrengthEntry, [StrengthEntry.weight != None]),
+    ("strength", "reps"): (StrengthEntry.reps, StrengthEntry, [StrengthEntry.reps != None, StrengthEntry.weight == None]),
+    ("cardio", "distance"): (CardioEntry.distance, CardioEntry, [CardioEntry.distance != None]),
+    ("cardio", "duration"): (CardioEntry.duration, CardioEntry, [CardioEntry.duration != None]),
+    ("cardio", "pace"): (CardioEntry.pace, CardioEntry, [CardioEntry.pace != None]),
+}
+
+PR_UNITS = {"weight": "lbs", "reps": "reps", "distance": "mi", "duration": "min", "pace": "min/mi"}
+
+# Lower is better for these fields
+LOWER_IS_BETTER = {"pace"}
+
+
+def is_better(field, value, than):
+    if than is None:
+        return True
+    return value < than if field in LOWER_IS_BETTER else value > than
+
+
+def get_session_datetime(session):
+    return datetime.combine(session.date, session.time or datetime.min.time())
 
-    # Combine date and time into a single datetime object
-    session_date_obj = session.date
-    session_datetime = datetime.combine(session_date_obj, session.time)
+
+def collect_pr_candidates(entries):
+    """
+    Reduces a session's parsed entries to the best value per (exercise_id, type, field).
+    Returns {key: (exercise_name, value)} in entry order.
+    """
+    candidates = {}
+
+    def offer(exercise_id, exercise, type_, field, value):
+        key = (exercise_id, type_, field)
+        if key not in candidates or is_better(field, value, candidates[key][1]):
+            candidates[key] = (exercise, value)
 
     for entry in entries:
-        exercise = entry.get("exercise")
         entry_type = entry.get("type")
+        exercise_id = resolve_exercise(entry.get("exercise"), entry_type)
+        if exercise_id is None:
+            continue
+        exercise = get_exercise_name(exercise_id) or entry.get("exercise")
 
         if entry_type == "strength":
             sets = entry.get("sets_details", [])
@@ -20,168 +59,296 @@ def track_prs_for_session(session, entries):
             reps = [s.get("reps") for s in sets if s.get("reps") is not None]
 
             if weights:
-                max_weight = max(weights)
-                new_pr = update_pr_record(user_id, exercise, "strength", "weight", max_weight, session.id, session_datetime, "lbs")
-                if new_pr:
-                    new_prs.append(new_pr)
-
-            if not weights and reps:
-                max_reps = max(reps)
-                new_pr = update_pr_record(user_id, exercise, "strength", "reps", max_reps, session.id, session_datetime, "reps")
-                if new_pr:
-                    new_prs.append(new_pr)
+                offer(exercise_id, exercise, "strength", "weight", max(weights))
+            elif reps:
+                offer(exercise_id, exercise, "strength", "reps", max(reps))
 
         elif entry_type == "cardio":
-            distance = entry.get("distance")
-            duration = entry.get("duration")
-            pace = entry.get("pace")
+            for field in ("distance", "duration", "pace"):
+                if entry.get(field):
+                    offer(exercise_id, exercise, "cardio", field, entry[field])
 
-            if distance:
-                new_pr = update_pr_record(user_id, exercise, "cardio", "distance", distance, session.id, session_datetime, "mi")
-                if new_pr:
-                    new_prs.append(new_pr)
+    return candidates
 
-            if duration:
-                new_pr = update_pr_record(user_id, exercise, "cardio", "duration", duration, session.id, session_datetime, "min")
-                if new_pr:
-                    new_prs.append(new_pr)
 
-            if pace:
-                new_pr = update_pr_record(user_id, exercise, "cardio", "pace", pace, session.id, session_datetime, "min/mi")
-                if new_pr:
-                    new_prs.append(new_pr)
+def pr_keys(pairs):
+    """Expands (exercise_id, type) pairs into every (exercise_id, type, field) PR key they can hold."""
+    return {
+        (exercise_id, type_, field)
+        for exercise_id, type_ in pairs if exercise_id is not None
+        for (pr_type, field) in PR_FIELDS if pr_type == type_
+    }
 
-    db.session.commit()
-    return new_prs
 
+def session_pr_keys(session_id):
+    """PR keys touched by a stored session's entries."""
+    pairs = db.session.query(WorkoutEntry.exercise_id, WorkoutEntry.type).filter(WorkoutEntry.session_id == session_id).distinct()
+    return pr_keys(pairs.all())
 
-from datetime import datetime
-from init import db
-from models import PersonalRecord, WorkoutEntry, StrengthEntry, CardioEntry, WorkoutSession
 
-def update_pr_record(user_id, exercise, type_, field, current_value, current_session_id, session_datetime, units):
-    previous_sessions = (
-        db.session.query(WorkoutSession.id)
-        .filter(WorkoutSession.user_id == user_id)
-        .all()
-    )
+def strength_exercise_ids(keys):
+    return {exercise_id for exercise_id, type_, _ in keys if type_ == "strength"}
 
-    session_id_map = {}
-    for sid, in previous_sessions:
-        s = db.session.query(WorkoutSession).get(sid)
-        if not s or not s.date:
-            continue
-        try:
-            session_date = s.date
-            if s.time:
-                s_datetime = datetime.combine(session_date, s.time)
-                if s_datetime < session_datetime:
-                    session_id_map[sid] = s_datetime
-            else:
-                # Compare by date only if time is missing
-                if session_date < session_datetime.date():
-                    session_id_map[sid] = datetime.combine(session_date, datetime.min.time())
-        except Exception:
-            continue
 
-    if not session_id_map:
-        # No prior session → automatically a PR
-        db.session.add(PersonalRecord(
-            user_id=user_id,
-            exercise=exercise,
-            type=type_,
-            field=field,
-            value=current_value,
-            units=units,
-            session_id=current_session_id,
-            datetime=session_datetime
-        ))
-        return {
-            "exercise": exercise,
-            "type": type_,
-            "field": field,
-            "value": current_value,
-            "units": units,
-            "session_id": current_session_id
-        }
+def group_keys_by_field(keys):
+    exercise_ids_by_field = defaultdict(set)
+    for exercise_id, type_, field in keys:
+        exercise_ids_by_field[(type_, field)].add(exercise_id)
+    return exercise_ids_by_field
+
+
+def historical_bests(user_id, keys, exclude_session_id=None, before_date=None):
+    """
+    Best value per key straight from the entry tables, as {key: (value, session_id, datetime)}.
+    Runs one windowed query per (type, field) present in keys, however many exercises there are.
+    `before_date` restricts it to sessions dated strictly earlier than that day.
+    """
+    results = {}
+    for (type_, field), exercise_ids in group_keys_by_field(keys).items():
+        column, table, filters = PR_FIELDS[(type_, field)]
+        order = column.asc() if field in LOWER_IS_BETTER else column.desc()
+        rank = func.row_number().over(
+            partition_by=WorkoutEntry.exercise_id,
+            order_by=(order, WorkoutSession.date.asc(), WorkoutSession.id.asc()),
+        ).label("rank")
 
-    # Build comparison query
-    if type_ == "strength":
-        if field == "weight":
-            query = db.session.query(StrengthEntry.weight, WorkoutEntry.session_id).join(
-                WorkoutEntry, StrengthEntry.entry_id == WorkoutEntry.id
-            ).filter(
-                WorkoutEntry.exercise == exercise,
-                StrengthEntry.weight != None,
-                WorkoutEntry.session_id.in_(session_id_map.keys())
+        query = (
+            db.session.query(
+                WorkoutEntry.exercise_id.label("exercise_id"),
+                column.label("value"),
+                WorkoutSession.id.label("session_id"),
+                WorkoutSession.date.label("date"),
+                WorkoutSession.time.label("time"),
+                rank,
             )
-        elif field == "reps":
-            query = db.session.query(StrengthEntry.reps, WorkoutEntry.session_id).join(
-                WorkoutEntry, StrengthEntry.entry_id == WorkoutEntry.id
-            ).filter(
-                WorkoutEntry.exercise == exercise,
-                StrengthEntry.reps != None,
-                StrengthEntry.weight == None,
-                WorkoutEntry.session_id.in_(session_id_map.keys())
+            .select_from(table)
+            .join(WorkoutEntry, table.entry_id == WorkoutEntry.id)
+            .join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id)
+            .filter(WorkoutSession.user_id == user_id, WorkoutEntry.exercise_id.in_(exercise_ids), *filters)
+        )
+        if exclude_session_id is not None:
+            query = query.filter(WorkoutSession.id != exclude_session_id)
+        if before_date is not None:
+            query = query.filter(WorkoutSession.date < before_date)
+
+        ranked = query.subquery()
+        for row in db.session.query(ranked).filter(ranked.c.rank == 1).all():
+            results[(row.exercise_id, type_, field)] = (
+                row.value, row.session_id, datetime.combine(row.date, row.time or datetime.min.time())
             )
-        else:
-            return None
-    elif type_ == "cardio":
-        if field == "distance":
-            query = db.session.query(CardioEntry.distance, WorkoutEntry.session_id).join(
-                WorkoutEntry, CardioEntry.entry_id == WorkoutEntry.id
-            ).filter(
-                WorkoutEntry.exercise == exercise,
-                CardioEntry.distance != None,
-                WorkoutEntry.session_id.in_(session_id_map.keys())
+
+    return results
+
+
+def session_values_since(user_id, keys, from_date):
+    """
+    Each session's best value per key for sessions dated from_date onward, as
+    {key: [(datetime, session_id, value), ...]} oldest first.
+    One grouped range scan per (type, field) over the (user_id, date) session index.
+    """
+    chains = defaultdict(list)
+    for (type_, field), exercise_ids in group_keys_by_field(keys).items():
+        column, table, filters = PR_FIELDS[(type_, field)]
+        best = func.min(column) if field in LOWER_IS_BETTER else func.max(column)
+
+        rows = (
+            db.session.query(
+                WorkoutEntry.exercise_id.label("exercise_id"),
+                WorkoutSession.id.label("session_id"),
+                WorkoutSession.date.label("date"),
+                WorkoutSession.time.label("time"),
+                best.label("value"),
             )
-        elif field == "duration":
-            query = db.session.query(CardioEntry.duration, WorkoutEntry.session_id).join(
-                WorkoutEntry, CardioEntry.entry_id == WorkoutEntry.id
-            ).filter(
-                WorkoutEntry.exercise == exercise,
-                CardioEntry.duration != None,
-                WorkoutEntry.session_id.in_(session_id_map.keys())
+            .select_from(table)
+            .join(WorkoutEntry, table.entry_id == WorkoutEntry.id)
+            .join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id)
+            .filter(
+                WorkoutSession.user_id == user_id,
+                WorkoutSession.date >= from_date,
+                WorkoutEntry.exercise_id.in_(exercise_ids),
+                *filters,
             )
-        elif field == "pace":
-            query = db.session.query(CardioEntry.pace, WorkoutEntry.session_id).join(
-                WorkoutEntry, CardioEntry.entry_id == WorkoutEntry.id
-            ).filter(
-                WorkoutEntry.exercise == exercise,
-                CardioEntry.pace != None,
-                WorkoutEntry.session_id.in_(session_id_map.keys())
+            .group_by(WorkoutEntry.exercise_id, WorkoutSession.id, WorkoutSession.date, WorkoutSession.time)
+            .all()
+        )
+        for row in rows:
+            chains[(row.exercise_id, type_, field)].append(
+                (datetime.combine(row.date, row.time or datetime.min.time()), row.session_id, row.value)
             )
-        else:
-            return None
-    else:
-        return None
 
-    all_previous_values = query.all()
+    for chain in chains.values():
+        chain.sort()
+    return chains
 
-    if all_previous_values:
-        if field == "pace":
-            is_better = all(current_value < v for v, _ in all_previous_values if v is not None)
-        else:
-            is_better = all(current_value > v for v, _ in all_previous_values if v is not None)
-
-        if not is_better:
-            return None
-
-    db.session.add(PersonalRecord(
-        user_id=user_id,
-        exercise=exercise,
-        type=type_,
-        field=field,
-        value=current_value,
-        units=units,
-        session_id=current_session_id,
-        datetime=session_datetime
-    ))
-    return {
-        "exercise": exercise,
-        "type": type_,
-        "field": field,
-        "value": current_value,
-        "units": units,
-        "session_id": current_session_id
+
+def recompute_pr_chains(user_id, keys, from_date):
+    """
+    Rebuilds the PR chain of each key from `from_date` forward after a session on that day
+    was inserted, edited or deleted. PRs dated earlier stand; everything from that day on is
+    replayed against the best value held before it, and pr_bests ends up on the final holder.
+    Does not commit. Returns the PRs now on record from from_date on, oldest first.
+    """
+    keys = set(keys)
+    if not keys:
+        return []
+    user_id = int(user_id)
+
+    prior = historical_bests(user_id, keys, before_date=from_date)
+    chains = session_values_since(user_id, keys, from_date)
+
+    since = datetime.combine(from_date, datetime.min.time())
+    for (type_, field), exercise_ids in group_keys_by_field(keys).items():
+        PersonalRecord.query.filter(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_id.in_(exercise_ids),
+            PersonalRecord.type == type_,
+            PersonalRecord.field == field,
+            PersonalRecord.datetime >= since,
+        ).delete(synchronize_session=False)
+        PRBest.query.filter(
+            PRBest.user_id == user_id,
+            PRBest.exercise_id.in_(exercise_ids),
+            PRBest.type == type_,
+            PRBest.field == field,
+        ).delete(synchronize_session=False)
+
+    prs = []
+    pr_rows = []
+    best_rows = []
+    for key in keys:
+        exercise_id, type_, field = key
+        holder = prior.get(key)  # (value, session_id, datetime)
+
+        for session_datetime, session_id, value in chains.get(key, []):
+            if holder is not None and not is_better(field, value, holder[0]):
+                continue
+            holder = (value, session_id, session_datetime)
+            pr = {
+                "exercise": get_exercise_name(exercise_id),
+                "type": type_,
+                "field": field,
+                "value": value,
+                "units": PR_UNITS[field],
+                "session_id": session_id
+            }
+            prs.append((session_datetime, pr))
+            pr_rows.append({**pr, "exercise_id": exercise_id, "user_id": user_id, "datetime": session_datetime})
+
+        if holder is not None:
+            best_rows.append({
+                "user_id": user_id, "exercise_id": exercise_id, "type": type_, "field": field,
+                "value": holder[0], "units": PR_UNITS[field], "session_id": holder[1], "datetime": holder[2],
+            })
+
+    if pr_rows:
+        db.session.execute(PersonalRecord.__table__.insert(), pr_rows)
+    if best_rows:
+        db.session.execute(PRBest.__table__.insert(), best_rows)
+
+    metrics.increment("pr.chain_recompute")
+    metrics.increment("pr.chain_recompute.keys", len(keys))
+    return [pr for _, pr in sorted(prs, key=lambda p: p[0])]
+
+
+def track_prs_for_session(session, entries):
+    """
+    Detects and stores every PR in a session in one pass:
+    one pr_bests lookup for all keys, a seeding query per field only for keys never seen before
+    and one bulk insert of the PRs. Backdated keys, where the current best comes from a later
+    session, have their chains replayed from this session's date so later PRs it beats are dropped.
+    """
+    user_id = session.user_id
+    session_datetime = get_session_datetime(session)
+
+    candidates = collect_pr_candidates(entries)
+    if not candidates:
+        db.session.commit()
+        return []
+
+    exercise_ids = {exercise_id for exercise_id, _, _ in candidates}
+    bests = {
+        (b.exercise_id, b.type, b.field): b
+        for b in PRBest.query.filter(PRBest.user_id == user_id, PRBest.exercise_id.in_(exercise_ids)).all()
     }
+
+    # Keys with history that predates pr_bests
+    unseen = [key for key in candidates if key not in bests]
+    seeded = historical_bests(user_id, unseen, exclude_session_id=session.id)
+
+    def holder_datetime(key):
+        if key in bests:
+            return bests[key].datetime
+        return seeded[key][2] if key in seeded else None
+
+    backdated = {key for key in candidates if holder_datetime(key) is not None and holder_datetime(key) > session_datetime}
+
+    for key, (value, holder_id, seeded_datetime) in seeded.items():
+        if key in backdated:
+            continue
+        bests[key] = PRBest(
+            user_id=user_id, exercise_id=key[0], type=key[1], field=key[2],
+            value=value, units=PR_UNITS[key[2]], session_id=holder_id, datetime=seeded_datetime,
+        )
+        db.session.add(bests[key])
+
+    new_prs = []
+    pr_rows = []
+    for key, (exercise, value) in candidates.items():
+        if key in backdated:
+            continue
+        exercise_id, type_, field = key
+        best = bests.get(key)
+
+        if best is None:
+            db.session.add(PRBest(
+                user_id=user_id, exercise_id=exercise_id, type=type_, field=field,
+                value=value, units=PR_UNITS[field], session_id=session.id, datetime=session_datetime,
+            ))
+        elif is_better(field, value, best.value):
+            best.value = value
+            best.session_id = session.id
+            best.datetime = session_datetime
+        else:
+            continue
+
+        new_pr = {
+            "exercise": exercise,
+            "type": type_,
+            "field": field,
+            "value": value,
+            "units": PR_UNITS[field],
+            "session_id": session.id
+        }
+        new_prs.append(new_pr)
+        pr_rows.append({**new_pr, "exercise_id": exercise_id, "user_id": user_id, "datetime": session_datetime})
+
+    if pr_rows:
+        db.session.execute(PersonalRecord.__table__.insert(), pr_rows)
+
+    track_rep_maxes_for_session(session, entries)
+
+    if backdated:
+        db.session.flush()
+        replayed = recompute_pr_chains(user_id, backdated, session.date)
+        new_prs.extend(pr for pr in replayed if pr["session_id"] == session.id)
+
+    db.session.commit()
+    return new_prs
+
+
+def rebuild_prs_for_user(user_id):
+    """Drops and replays every PR chain and rep-max ladder for one user from their first session. Commits."""
+    PersonalRecord.query.filter(PersonalRecord.user_id == user_id).delete(synchronize_session=False)
+    PRBest.query.filter(PRBest.user_id == user_id).delete(synchronize_session=False)
+    pairs = (
+        db.session.query(WorkoutEntry.exercise_id, WorkoutEntry.type)
+        .join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id)
+        .filter(WorkoutSession.user_id == user_id)
+        .distinct()
+        .all()
+    )
+    keys = pr_keys(pairs)
+    prs = recompute_pr_chains(user_id, keys, date.min)
+    rebuild_rep_maxes(user_id, strength_exercise_ids(keys))
+    db.session.commit()
+    return len(prs)
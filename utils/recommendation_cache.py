@@ -0,0 +1,101 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app, request
+from sqlalchemy.exc import IntegrityError
+
+from init import db
+from models import RecommendationCacheEntry
+from utils import metrics
+from utils.exercise_catalog import lookup_exercise_id
+
+
+def fingerprint_rows(rows):
+    """Stable hash of the history rows a recommendation is computed from."""
+    payload = json.dumps(rows, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_recommendation_key(user_id, kind, exercise_name, goal, rows):
+    date_filters = f"{request.args.get('start_date') or ''}..{request.args.get('end_date') or ''}"
+    formula = (request.args.get("formula") or "epley").lower()
+    payload = "\x1f".join([
+        str(user_id), kind, (exercise_name or "").strip().lower(), goal or "", date_filters, formula, fingerprint_rows(rows),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_recommendation(key):
+    entry = RecommendationCacheEntry.query.filter_by(cache_key=key).first()
+    if not entry:
+        metrics.increment("recommendation_cache.miss")
+        return None
+
+    now = datetime.utcnow()
+    ttl = current_app.config.get("RECOMMENDATION_CACHE_TTL_SECONDS")
+    if ttl and entry.created_at < now - timedelta(seconds=ttl):
+        db.session.delete(entry)
+        db.session.commit()
+        metrics.increment("recommendation_cache.expired")
+        metrics.increment("recommendation_cache.miss")
+        return None
+
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_accessed_at = now
+    db.session.commit()
+
+    metrics.increment("recommendation_cache.hit")
+    return json.loads(entry.response)
+
+
+def store_recommendation(key, user_id, kind, exercise_name, response):
+    db.session.add(RecommendationCacheEntry(
+        cache_key=key,
+        user_id=int(user_id),
+        exercise_id=lookup_exercise_id(exercise_name),
+        kind=kind,
+        response=json.dumps(response),
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+
+
+def cached_recommendation(user_id, kind, exercise_name, goal, rows, compute):
+    """
+    Returns compute() for this user's history, reusing a stored answer when the same request was
+    made against identical rows. Any change to the rows changes the key, so stale answers are never served.
+    """
+    if not current_app.config.get("RECOMMENDATION_CACHE_ENABLED", True):
+        return compute()
+
+    key = make_recommendation_key(user_id, kind, exercise_name, goal, rows)
+    with metrics.timed("recommendation_cache.lookup"):
+        cached = get_cached_recommendation(key)
+    if cached is not None:
+        return cached
+
+    with metrics.timed(f"recommendation.{kind}"):
+        response = compute()
+    store_recommendation(key, user_id, kind, exercise_name, response)
+    return response
+
+
+def invalidate_recommendations(user_id, exercise_ids=None):
+    """
+    Drops cached recommendations for a user after their history changed, either for the given
+    exercise ids or all of them. Does not commit; callers commit with their own write.
+    """
+    query = RecommendationCacheEntry.query.filter(RecommendationCacheEntry.user_id == int(user_id))
+    if exercise_ids is not None:
+        exercise_ids = [i for i in exercise_ids if i is not None]
+        if not exercise_ids:
+            return 0
+        query = query.filter(RecommendationCacheEntry.exercise_id.in_(exercise_ids))
+
+    removed = query.delete(synchronize_session=False)
+    if removed:
+        metrics.increment("recommendation_cache.invalidated", removed)
+    return removed
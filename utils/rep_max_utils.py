@@ -0,0 +1,158 @@
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+
+from init import db
+from models import RepMax, EstimatedOneRepMax, WorkoutEntry, StrengthEntry, WorkoutSession
+from utils.exercise_catalog import resolve_exercise
+from utils.exercise_data_utils import estimate_1rm, ONE_RM_FORMULAS
+
+
+def ladder_size():
+    return current_app.config.get("REP_MAX_LADDER_SIZE", 12)
+
+
+def is_heavier(value, when, current_value, current_when):
+    # Ties go to whoever got there first
+    return value > current_value or (value == current_value and when < current_when)
+
+
+def collect_loaded_sets(entries):
+    """Loaded strength sets of a session's parsed entries, as {exercise_id: {reps: heaviest weight}}."""
+    loaded = {}
+    for entry in entries:
+        if entry.get("type") != "strength":
+            continue
+        exercise_id = resolve_exercise(entry.get("exercise"), "strength")
+        if exercise_id is None:
+            continue
+        for s in entry.get("sets_details", []):
+            reps, weight = s.get("reps"), s.get("weight")
+            if not reps or not weight or reps <= 0 or weight <= 0:
+                continue
+            by_reps = loaded.setdefault(exercise_id, {})
+            by_reps[int(reps)] = max(by_reps.get(int(reps), 0), weight)
+    return loaded
+
+
+def offer_set(rungs, estimates, user_id, exercise_id, reps, weight, session_id, when, size):
+    """Offers one set to every rung it covers (1..reps) and to every 1RM formula, updating holders in place."""
+    for rung in range(1, min(reps, size) + 1):
+        current = rungs.get((exercise_id, rung))
+        if current is None:
+            current = rungs[(exercise_id, rung)] = RepMax(user_id=user_id, exercise_id=exercise_id, reps=rung)
+            db.session.add(current)
+        elif not is_heavier(weight, when, current.weight, current.datetime):
+            continue
+        current.weight = weight
+        current.set_reps = reps
+        current.session_id = session_id
+        current.datetime = when
+
+    for formula in ONE_RM_FORMULAS:
+        value = estimate_1rm(reps, weight, formula)
+        if value is None:
+            continue
+        current = estimates.get((exercise_id, formula))
+        if current is None:
+            current = estimates[(exercise_id, formula)] = EstimatedOneRepMax(user_id=user_id, exercise_id=exercise_id, formula=formula)
+            db.session.add(current)
+        elif not is_heavier(value, when, current.value, current.datetime):
+            continue
+        current.value = value
+        current.reps = reps
+        current.weight = weight
+        current.session_id = session_id
+        current.datetime = when
+
+
+def load_rep_maxes(user_id, exercise_ids):
+    rungs = {
+        (r.exercise_id, r.reps): r
+        for r in RepMax.query.filter(RepMax.user_id == user_id, RepMax.exercise_id.in_(exercise_ids)).all()
+    }
+    estimates = {
+        (e.exercise_id, e.formula): e
+        for e in EstimatedOneRepMax.query.filter(
+            EstimatedOneRepMax.user_id == user_id, EstimatedOneRepMax.exercise_id.in_(exercise_ids)
+        ).all()
+    }
+    return rungs, estimates
+
+
+def track_rep_maxes_for_session(session, entries):
+    """
+    Folds a newly stored session's loaded sets into the ladder and the per-formula 1RM bests.
+    Maxima do not depend on order, so backdated sessions go through here too. Does not commit.
+    """
+    loaded = collect_loaded_sets(entries)
+    if not loaded:
+        return
+
+    user_id = int(session.user_id)
+    when = datetime.combine(session.date, session.time or datetime.min.time())
+    rungs, estimates = load_rep_maxes(user_id, loaded.keys())
+
+    size = ladder_size()
+    for exercise_id, by_reps in loaded.items():
+        for reps, weight in by_reps.items():
+            offer_set(rungs, estimates, user_id, exercise_id, reps, weight, session.id, when, size)
+
+
+def rebuild_rep_maxes(user_id, exercise_ids):
+    """
+    Recomputes the ladders of exercises whose sets were edited or removed. Only the heaviest
+    set per (exercise, rep count) can hold a rung or a 1RM best, so that is all it reads.
+    Does not commit.
+    """
+    exercise_ids = {exercise_id for exercise_id in exercise_ids if exercise_id is not None}
+    if not exercise_ids:
+        return
+    user_id = int(user_id)
+
+    RepMax.query.filter(RepMax.user_id == user_id, RepMax.exercise_id.in_(exercise_ids)).delete(synchronize_session=False)
+    EstimatedOneRepMax.query.filter(
+        EstimatedOneRepMax.user_id == user_id, EstimatedOneRepMax.exercise_id.in_(exercise_ids)
+    ).delete(synchronize_session=False)
+
+    rank = func.row_number().over(
+        partition_by=(WorkoutEntry.exercise_id, StrengthEntry.reps),
+        order_by=(StrengthEntry.weight.desc(), WorkoutSession.date.asc(), WorkoutSession.id.asc()),
+    ).label("rank")
+    ranked = (
+        db.session.query(
+            WorkoutEntry.exercise_id.label("exercise_id"),
+            StrengthEntry.reps.label("reps"),
+            StrengthEntry.weight.label("weight"),
+            WorkoutSession.id.label("session_id"),
+            WorkoutSession.date.label("date"),
+            WorkoutSession.time.label("time"),
+            rank,
+        )
+        .select_from(StrengthEntry)
+        .join(WorkoutEntry, StrengthEntry.entry_id == WorkoutEntry.id)
+        .join(WorkoutSession, WorkoutEntry.session_id == WorkoutSession.id)
+        .filter(
+            WorkoutSession.user_id == user_id,
+            WorkoutEntry.exercise_id.in_(exercise_ids),
+            StrengthEntry.reps > 0,
+            StrengthEntry.weight > 0,
+        )
+        .subquery()
+    )
+
+    rungs, estimates = {}, {}
+    size = ladder_size()
+    for row in db.session.query(ranked).filter(ranked.c.rank == 1).all():
+        when = datetime.combine(row.date, row.time or datetime.min.time())
+        offer_set(rungs, estimates, user_id, row.exercise_id, int(row.reps), row.weight, row.session_id, when, size)
+
+
+def get_rep_max_ladder(user_id, exercise_id):
+    """The stored ladder and 1RM bests for one exercise, as served by the rep-maxes endpoint."""
+    rungs, estimates = load_rep_maxes(user_id, [exercise_id])
+    return {
+        "ladder": [rung.to_dict() for _, rung in sorted(rungs.items())],
+        "estimated_1rm": {formula: estimate.to_dict() for (_, formula), estimate in estimates.items()},
+    }
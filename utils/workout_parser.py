@@ -0,0 +1,95 @@
+import json
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from utils import metrics
+from utils.local_parser import parse_shorthand
+from utils.openai_utils import stream_parse_workout_and_goals
+from utils.parse_cache import cached_parse_workout_and_goals, get_cached_parse, store_parse
+
+# Throttle for "progress" events while the LLM response is streaming in
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+
+def parse_locally(text):
+    """Returns the local shorthand parse if it is confident enough to skip the LLM, else None."""
+    if not current_app.config.get("LOCAL_PARSER_ENABLED", True):
+        return None
+
+    start = time.perf_counter()
+    structured_response, confidence = parse_shorthand(text)
+    metrics.record_timing("parse.local", time.perf_counter() - start)
+
+    if structured_response and confidence >= current_app.config.get("LOCAL_PARSER_MIN_CONFIDENCE", 0.95):
+        metrics.increment("parse.path.local")
+        return structured_response
+    return None
+
+
+def parse_locally_degraded(text):
+    """Best-effort local parse used while the LLM is unavailable. Any recognized entries are kept."""
+    structured_response, _ = parse_shorthand(text)
+    metrics.increment("parse.path.degraded")
+    return structured_response or {"entries": [], "notes": "", "goals": []}
+
+
+def parse_workout_text(text, today_override=None):
+    """
+    Parses a journal entry into the parse_workout_and_goals response shape.
+    Tries the local shorthand parser first and only falls back to the cached LLM parse
+    when the local parse is not confident enough.
+    """
+    structured_response = parse_locally(text)
+    if structured_response:
+        return structured_response
+
+    start = time.perf_counter()
+    structured_response = cached_parse_workout_and_goals(text, today_override=today_override)
+    metrics.record_timing("parse.fallback", time.perf_counter() - start)
+    metrics.increment("parse.path.fallback")
+    return structured_response
+
+
+def stream_parse_workout_text(text, today_override=None):
+    """
+    Streaming counterpart of parse_workout_text.
+    Yields ("progress", {...}) while the LLM is generating and finally ("result", structured_response).
+    """
+    structured_response = parse_locally(text)
+    if structured_response:
+        yield "result", structured_response
+        return
+
+    today = today_override or datetime.now().date().isoformat()
+    cache_enabled = current_app.config.get("PARSE_CACHE_ENABLED", True)
+
+    if cache_enabled:
+        cached = get_cached_parse(text, today)
+        if cached is not None:
+            metrics.increment("parse.path.fallback")
+            yield "result", cached
+            return
+
+    start = time.perf_counter()
+    last_progress = start
+    chunks = []
+    received = 0
+    for delta in stream_parse_workout_and_goals(text, today_override=today):
+        chunks.append(delta)
+        received += len(delta)
+
+        now = time.perf_counter()
+        if now - last_progress >= PROGRESS_INTERVAL_SECONDS:
+            last_progress = now
+            yield "progress", {"characters": received}
+
+    structured_response = json.loads("".join(chunks))
+    metrics.record_timing("parse.llm", time.perf_counter() - start)
+    metrics.increment("parse.path.fallback")
+
+    if cache_enabled:
+        store_parse(text, today, structured_response)
+
+    yield "result", structured_response